@@ -2,16 +2,33 @@
 
 from flask import Flask
 # Import instances from our new extensions file
-from app.extensions import scheduler, redis_client
+from app.extensions import scheduler, redis_client, event_bus
 from app.routes import bp
+from app.leader import LeaderLease
 import redis # <--- ADD THIS LINE to handle the exception type
 import os
+import time
 
-def create_app():
+# Process roles: 'all' serves requests and runs the scheduler in one process, 'web' only
+# serves requests from Redis, 'worker' only runs the fetch and scoring jobs (worker.py)
+ROLES = ('all', 'web', 'worker')
+# With leader election on, only the process holding the Redis lease runs the jobs
+LEADER_ELECTION = os.getenv('ROWCAST_LEADER_ELECTION', '1') == '1'
+
+def create_app(role=None):
     """
     Application factory: creates and configures the Flask app.
+    `role` defaults to the ROWCAST_ROLE environment variable ('all' when unset).
     """
+    started = time.monotonic()
+    role = role or os.getenv('ROWCAST_ROLE', 'all')
+    if role not in ROLES:
+        raise Exception(f"Unknown ROWCAST_ROLE '{role}' (expected one of {', '.join(ROLES)})")
+
     app = Flask(__name__)
+    app.config['ROWCAST_ROLE'] = role
+    # Cold-start timing, reported by /api/status
+    app.config['ROWCAST_STARTED_AT'] = started
     
     # Configuration for development vs production
     env = os.getenv('FLASK_ENV', 'development')
@@ -37,17 +54,29 @@ def create_app():
         raise Exception(error_message)
 
     # --- Register Blueprints ---
-    app.register_blueprint(bp)
+    if role != 'worker':
+        app.register_blueprint(bp)
 
     # --- Initialize Scheduler and Add Jobs ---
+    # Web-only processes just read what the worker stores in Redis
+    if role != 'web':
+        start_scheduler(app)
+
+    app.config['ROWCAST_READY_IN'] = round(time.monotonic() - started, 3)
+    print(f"STARTUP: {role} app ready in {app.config['ROWCAST_READY_IN']:.2f}s.")
+    return app
+
+def start_scheduler(app):
+    """Starts the APScheduler with the fetch jobs and event-driven scoring, then queues a warm-up refresh."""
     # Import tasks here, inside the factory, to ensure the app context is available
     # and to avoid circular imports.
     with app.app_context():
-        from app.tasks import update_weather_data_job, update_water_data_job, update_forecast_scores_job, update_short_term_forecast_job, update_noaa_stageflow_job, update_extended_weather_data_job, update_extended_forecast_scores_job
+        from app.tasks import update_weather_data_job, update_short_term_weather_job, update_water_data_job, update_noaa_stageflow_job, run_refresh_cycle, scoring_pipeline
 
         if not scheduler.running:
             scheduler.init_app(app) # Initialize scheduler with the app
-            scheduler.start()
+            # Standbys keep the jobs paused until they win the leader lease
+            scheduler.start(paused=LEADER_ELECTION)
 
         # Clear existing jobs to prevent duplicates during reloads
         scheduler.remove_all_jobs()
@@ -57,25 +86,19 @@ def create_app():
             id='Update Weather Data',
             func=update_weather_data_job,
             trigger='interval',
-            minutes=10  # Reduced frequency for API rate limiting
+            minutes=10  # One Open-Meteo call feeds current, 24h, 7-day and 15-minute views
         )
         scheduler.add_job(
-            id='Update Water Data',
-            func=update_water_data_job,
+            id='Update Short-term Weather',
+            func=update_short_term_weather_job,
             trigger='interval',
-            minutes=15  # Reduced frequency for API rate limiting
+            minutes=5  # Update 15-minute forecast more frequently (a small 15-minute-only request)
         )
         scheduler.add_job(
-            id='Update Forecast Scores',
-            func=update_forecast_scores_job,
-            trigger='interval',
-            minutes=10  # Calculate forecast scores after data updates
-        )
-        scheduler.add_job(
-            id='Update Short-term Forecast',
-            func=update_short_term_forecast_job,
+            id='Update Water Data',
+            func=update_water_data_job,
             trigger='interval',
-            minutes=5  # Update 15-minute forecast more frequently
+            minutes=15  # Reduced frequency for API rate limiting
         )
         scheduler.add_job(
             id='Update NOAA Stageflow Data',
@@ -83,25 +106,27 @@ def create_app():
             trigger='interval',
             minutes=30  # NOAA data updates less frequently
         )
-        scheduler.add_job(
-            id='Update Extended Weather Data',
-            func=update_extended_weather_data_job,
-            trigger='interval',
-            minutes=60  # Extended weather data updates hourly
-        )
-        scheduler.add_job(
-            id='Update Extended Forecast Scores',
-            func=update_extended_forecast_scores_job,
-            trigger='interval',
-            minutes=30  # Calculate extended forecast scores after NOAA updates
-        )
-        # Run initial data fetch and forecasting immediately
-        update_weather_data_job()
-        update_water_data_job()
-        update_noaa_stageflow_job()
-        update_extended_weather_data_job()
-        update_forecast_scores_job()
-        update_extended_forecast_scores_job()
-        update_short_term_forecast_job()
+        # Scoring jobs have no fixed interval: each fetch job publishes a data_updated
+        # event and the pipeline rescores the jobs that read that data (debounced)
+        scoring_pipeline.attach(event_bus)
+
+        def warm_up():
+            # Catch up in the background so startup never waits on the upstreams; routes serve
+            # whatever Redis already holds (with its age) until the refresh lands. Sources
+            # written within their max age by a previous run are not fetched again.
+            scheduler.add_job(id='Initial Refresh Cycle', func=run_refresh_cycle, kwargs={'skip_fresh': True},
+                              trigger='date', replace_existing=True)
+
+        if not LEADER_ELECTION:
+            warm_up()
+            return
+
+        def on_elected():
+            scheduler.resume()
+            warm_up()
 
-    return app
\ No newline at end of file
+        lease = LeaderLease(redis_client, on_elected=on_elected, on_demoted=scheduler.pause)
+        app.extensions['rowcast_leader_lease'] = lease
+        lease.start()
+        if not lease.is_leader:
+            print("SCHEDULER: Another process holds the leader lease; standing by.")
\ No newline at end of file
@@ -0,0 +1,75 @@
+# app/alerts.py
+import hashlib
+import json
+import logging
+
+from app.timeseries import to_epoch
+
+logger = logging.getLogger(__name__)
+
+
+def alert_id(alert):
+    """The NWS alert ID, or a digest of the alert for ones parsed without it."""
+    if alert.get('id'):
+        return alert['id']
+    digest = hashlib.blake2b(json.dumps(alert, sort_keys=True).encode(), digest_size=8).hexdigest()
+    return f'alert-{digest}'
+
+
+def alert_table(alerts):
+    """
+    The active alerts keyed by ID, as stored once per weather document. Accepts the list
+    fetch_weather_alerts returns (or an existing table).
+    """
+    if isinstance(alerts, dict):
+        return alerts
+    table = {}
+    for alert in alerts or []:
+        key = alert_id(alert)
+        table[key] = {**alert, 'id': key}
+    return table
+
+
+def _bound(timestamp, default):
+    if not timestamp:
+        return default
+    try:
+        return to_epoch(timestamp)
+    except ValueError:
+        logger.warning(f"Ignoring bad alert time {timestamp!r}")
+        return default
+
+
+def alert_ids_at(times, alerts, step):
+    """
+    For each of `times` (epoch seconds), the IDs of the alerts (a list or alert_table) in
+    effect at some point of the `step` seconds starting then. An alert without onset
+    applies from now on, one without expiry until the end of the forecast.
+    """
+    windows = [(key, _bound(alert.get('onset'), float('-inf')), _bound(alert.get('expires'), float('inf')))
+               for key, alert in alert_table(alerts).items()]
+    if not windows:
+        return [[] for _ in times]
+    return [[key for key, onset, expires in windows if onset < start + step and expires > start] for start in times]
+
+
+def attach_alert_ids(rows, alerts, step):
+    """Sets each row's 'weatherAlertIds' to alert_ids_at its timestamp."""
+    times = [to_epoch(row['timestamp']) for row in rows] if alerts else [None] * len(rows)
+    for row, ids in zip(rows, alert_ids_at(times, alerts, step)):
+        row['weatherAlertIds'] = ids
+    return rows
+
+
+def resolve_alerts(ids, table, resolved=None):
+    """
+    The alert dicts for `ids` (unknown IDs are skipped). Pass a dict as `resolved` to reuse
+    one list per distinct set of IDs, as the batch scorer scores each list once.
+    """
+    key = tuple(ids or ())
+    if resolved is not None and key in resolved:
+        return resolved[key]
+    alerts = [table[i] for i in key if i in (table or {})]
+    if resolved is not None:
+        resolved[key] = alerts
+    return alerts
@@ -0,0 +1,63 @@
+# app/bodies.py
+import gzip
+import json
+import logging
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip and identity bodies are stored
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Documents the routes return whole; the jobs store them as ready-to-send response bodies
+SERVED_KEYS = (
+    'weather_data', 'extended_weather_data', 'water_data', 'noaa_stageflow_data',
+    'complete_extended',
+)
+# Score arrays the routes return whole too, but stored in column form (see app.columnar):
+# only their compressed bodies are kept, identity responses are rebuilt from the columns
+COLUMN_SERVED_KEYS = ('forecast_scores', 'extended_forecast_scores', 'short_term_forecast')
+# Best first; 'identity' is always stored for SERVED_KEYS
+ENCODINGS = (('br',) if brotli is not None else ()) + ('gzip', 'identity')
+
+
+def body_key(key, encoding):
+    # Served documents are stored as serialize() output, so the document is its own identity
+    # body (COLUMN_SERVED_KEYS have none)
+    return key if encoding == 'identity' else f'{key}:body:{encoding}'
+
+
+def serialize(document):
+    """The JSON bytes jsonify would send (sorted keys, compact separators), minus its newline."""
+    return json.dumps(document, sort_keys=True, separators=(',', ':')).encode()
+
+
+def encode_bodies(document):
+    """Returns {encoding: body bytes} for every encoding in ENCODINGS."""
+    body = serialize(document)
+    bodies = {'identity': body, 'gzip': gzip.compress(body, compresslevel=9)}
+    if brotli is not None:
+        # Bodies are built once per write, so spend the CPU on a smaller transfer
+        bodies['br'] = brotli.compress(body, quality=9)
+    return bodies
+
+
+def store_bodies(pipe, key, document):
+    """
+    Queues the compressed bodies of `document` on `pipe`, next to the document itself (the
+    identity body). Empty documents get no body (the routes answer 404 for those), so any
+    old one is removed.
+    """
+    bodies = encode_bodies(document) if document else {}
+    for encoding in ('br', 'gzip'):
+        if encoding in bodies:
+            pipe.set(body_key(key, encoding), bodies[encoding])
+        else:
+            # Also drops a 'br' body left by a process that had brotli installed
+            pipe.delete(body_key(key, encoding))
+
+
+def accepted_encodings(accept_encodings):
+    """Encodings from ENCODINGS the client accepts, best first (a werkzeug Accept, e.g. request.accept_encodings)."""
+    return [encoding for encoding in ENCODINGS if encoding == 'identity' or accept_encodings[encoding] > 0]
@@ -0,0 +1,159 @@
+# app/cache.py
+
+import hashlib
+import json
+import logging
+import threading
+import time
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+
+class TwoTierCache:
+    """
+    Read-through cache with an in-process tier in front of Redis.
+
+    Values are stored as JSON in Redis with a TTL so every process shares them, and
+    the decoded object is kept locally until the same TTL runs out. If Redis is
+    unreachable the cache degrades to the local tier plus the loader.
+    """
+
+    def __init__(self, redis_client, prefix='cache'):
+        self.redis = redis_client
+        self.prefix = prefix
+        self._local = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    def _redis_key(self, key):
+        return f"{self.prefix}:{key}"
+
+    def get(self, key):
+        """Returns the cached value for `key`, or None on a miss in both tiers."""
+        now = time.time()
+        with self._lock:
+            entry = self._local.get(key)
+        if entry and entry[0] > now:
+            return entry[1]
+
+        try:
+            redis_key = self._redis_key(key)
+            pipe = self.redis.pipeline()
+            pipe.get(redis_key)
+            pipe.pttl(redis_key)
+            raw, ttl_ms = pipe.execute()
+        except redis.exceptions.RedisError as e:
+            logger.warning(f"CACHE: Redis unavailable for {key}: {e}")
+            return None
+        if raw is None:
+            return None
+
+        value = json.loads(raw)
+        expires_at = now + ttl_ms / 1000 if ttl_ms and ttl_ms > 0 else now
+        with self._lock:
+            self._local[key] = (expires_at, value)
+        return value
+
+    def set(self, key, value, ttl):
+        """Stores `value` in both tiers for `ttl` seconds."""
+        with self._lock:
+            self._local[key] = (time.time() + ttl, value)
+        try:
+            self.redis.set(self._redis_key(key), json.dumps(value), ex=int(ttl))
+        except redis.exceptions.RedisError as e:
+            logger.warning(f"CACHE: Could not store {key} in Redis: {e}")
+
+    def get_or_load(self, key, ttl, loader):
+        """Returns the cached value for `key`, calling `loader()` and caching its result on a miss."""
+        value = self.get(key)
+        if value is not None:
+            return value
+        # Only one caller per process loads a missing key; concurrent callers wait and reuse it
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        with load_lock:
+            value = self.get(key)
+            if value is None:
+                value = loader()
+                self.set(key, value, ttl)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._local.pop(key, None)
+        try:
+            self.redis.delete(self._redis_key(key))
+        except redis.exceptions.RedisError as e:
+            logger.warning(f"CACHE: Could not invalidate {key} in Redis: {e}")
+
+
+# Redis hash of data key -> write counter; every job write bumps the keys it wrote
+GENERATIONS_KEY = 'rowcast:generations'
+# Redis hash of data key -> digest of its stored JSON, used for ETags
+ETAGS_KEY = 'rowcast:etags'
+
+
+def content_tag(text):
+    """Short digest of a stored document's JSON text."""
+    return hashlib.blake2b(text.encode(), digest_size=12).hexdigest()
+
+
+def bump_generations(redis_client, keys):
+    """Marks `keys` as rewritten. Call on the pipeline that writes them so both land together."""
+    for key in keys:
+        redis_client.hincrby(GENERATIONS_KEY, key, 1)
+
+
+class DocumentCache:
+    """
+    Read-through cache of decoded JSON documents for the route handlers.
+
+    Each process keeps the decoded document next to the generation it was read at. A lookup
+    costs one HMGET of the generations; only keys whose generation moved since (because a
+    job in any process rewrote them) are fetched and decoded again. Keys that were never
+    given a generation are read from Redis every time.
+
+    Cached documents are shared between requests and must not be modified.
+    """
+
+    def __init__(self, redis_client):
+        self.redis = redis_client
+        self._local = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self.get_many([key])[key]
+
+    def get_many(self, keys):
+        """Returns {key: decoded document or None} for `keys`."""
+        keys = list(keys)
+        generations = self.redis.hmget(GENERATIONS_KEY, keys)
+        documents, misses = {}, []
+        with self._lock:
+            for key, generation in zip(keys, generations):
+                entry = self._local.get(key)
+                if generation is not None and entry is not None and entry[0] == generation:
+                    documents[key] = entry[1]
+                else:
+                    misses.append((key, generation))
+        if not misses:
+            return documents
+
+        # A write landing between the two reads leaves an older generation next to the newer
+        # document, which only costs one extra reload on the next request
+        values = self.redis.mget([key for key, _ in misses])
+        for (key, generation), raw in zip(misses, values):
+            document = json.loads(raw) if raw else None
+            documents[key] = document
+            with self._lock:
+                if generation is not None and document is not None:
+                    self._local[key] = (generation, document)
+                else:
+                    self._local.pop(key, None)
+        return documents
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
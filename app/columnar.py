@@ -0,0 +1,280 @@
+# app/columnar.py
+
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+
+from app.utils import fmt, deg_to_cardinal
+from app.timeseries import to_epoch
+
+NAN = float('nan')
+
+# Output field -> Open-Meteo variable, for the hourly and 15-minute blocks
+HOURLY_FIELDS = {
+    'windSpeed': 'wind_speed_10m',
+    'windGust': 'wind_gusts_10m',
+    'windDirDeg': 'wind_direction_10m',
+    'apparentTemp': 'apparent_temperature',
+    'uvIndex': 'uv_index',
+    'precipitation': 'precipitation',
+    'currentTemp': 'temperature_2m',
+    'visibility': 'visibility',
+    'precipitationProbability': 'precipitation_probability',
+    'lightningPotential': 'lightning_potential',
+}
+MINUTELY_15_FIELDS = {
+    'windSpeed': 'wind_speed_10m',
+    'windGust': 'wind_gusts_10m',
+    'windDirDeg': 'wind_direction_10m',
+    'apparentTemp': 'apparent_temperature',
+    'precipitation': 'precipitation',
+    'currentTemp': 'temperature_2m',
+    'visibility': 'visibility',
+    'precipitationProbability': 'precipitation_probability',
+}
+# Open-Meteo sends these as integers; keep them integers when rows are built
+INTEGER_FIELDS = {'windDirDeg', 'precipitationProbability'}
+
+
+@lru_cache(maxsize=1024)
+def wind_dir_label(deg):
+    """Formats a wind direction like the current-conditions view: 'SSW (200°)'."""
+    return f"{deg_to_cardinal(deg)} ({fmt(deg, 0, '°')})" if deg is not None else "N/A"
+
+
+class ForecastColumns:
+    """
+    Open-Meteo's parallel arrays kept as typed columns.
+
+    Each variable is stored once as an array('d') with NaN for missing values, so
+    consumers like the batch scorer can work on whole columns. Values Open-Meteo does
+    not send (alert IDs, constants) are added as plain lists. Row dicts are only built
+    when something asks for them, which the jobs only do to write the row document.
+    """
+
+    def __init__(self, times, columns, missing=None):
+        self.times = times
+        self.columns = columns
+        # Names of columns holding at least one NaN (missing value)
+        self.missing = set(columns) if missing is None else missing
+        self._epochs = None
+
+    @classmethod
+    def from_open_meteo(cls, block, fields=HOURLY_FIELDS, limit=None):
+        """Builds columns from an Open-Meteo `hourly` / `minutely_15` block."""
+        times = list(block.get('time', []))
+        if limit is not None:
+            times = times[:limit]
+        n = len(times)
+        columns = {}
+        missing = set()
+        for name, source in fields.items():
+            values = (block.get(source) or [])[:n]
+            if len(values) < n or None in values:
+                missing.add(name)
+                column = array('d', [NAN if v is None else v for v in values])
+                column.extend([NAN] * (n - len(column)))
+            else:
+                column = array('d', values)
+            columns[name] = column
+        return cls(times, columns, missing)
+
+    def __len__(self):
+        return len(self.times)
+
+    def column(self, name):
+        return self.columns[name]
+
+    def epochs(self):
+        """The row times as epoch seconds (parsed once)."""
+        if self._epochs is None:
+            self._epochs = [to_epoch(t) for t in self.times]
+        return self._epochs
+
+    def add(self, name, values):
+        """Adds a column of plain values (one per row), kept as given."""
+        if len(values) != len(self.times):
+            raise ValueError(f"Column '{name}' has {len(values)} values, expected {len(self.times)}")
+        self.columns[name] = list(values)
+        return self
+
+    def head(self, stop):
+        """The first `stop` rows, sharing nothing mutable with this object."""
+        head = ForecastColumns(self.times[:stop], {name: column[:stop] for name, column in self.columns.items()}, set(self.missing))
+        if self._epochs is not None:
+            head._epochs = self._epochs[:stop]
+        return head
+
+    def values(self, name, start=0, stop=None):
+        """Returns a column slice as Python values, with None where data is missing."""
+        column = self.columns[name][start:stop]
+        if isinstance(column, list):
+            return column
+        if name not in self.missing:
+            return list(map(int, column)) if name in INTEGER_FIELDS else column.tolist()
+        # v != v is the NaN test
+        if name in INTEGER_FIELDS:
+            return [None if v != v else int(v) for v in column]
+        return [None if v != v else v for v in column]
+
+    def _named_values(self, start=0, stop=None):
+        """(name, values) for every output field in row order; wind direction is rendered as the 'windDir' label."""
+        names = [name for name in self.columns if name != 'windDirDeg' and not isinstance(self.columns[name], list)]
+        named = [(name, self.values(name, start, stop)) for name in names]
+        if 'windDirDeg' in self.columns:
+            named.append(('windDir', [wind_dir_label(deg) for deg in self.values('windDirDeg', start, stop)]))
+        else:
+            named.append(('windDir', ["N/A"] * len(self.times[start:stop])))
+        named.extend((name, column[start:stop]) for name, column in self.columns.items() if isinstance(column, list))
+        return named
+
+    def rows(self, start=0, stop=None, extra=None):
+        """
+        Builds forecast row dicts for `times[start:stop]`. Wind direction is rendered as
+        the 'windDir' label; `extra` is merged into every row.
+        """
+        named = self._named_values(start, stop)
+        keys = ['timestamp', *(name for name, _ in named)]
+        extra = extra or {}
+        return [dict(zip(keys, values), **extra) for values in zip(self.times[start:stop], *(values for _, values in named))]
+
+    def document(self):
+        """The columns_document of rows(), built straight from the columns."""
+        order = sorted(range(len(self.times)), key=self.epochs().__getitem__)
+        columns = {'timestamp': self.times, **dict(self._named_values())}
+        if order != list(range(len(order))):
+            columns = {name: [values[i] for i in order] for name, values in columns.items()}
+            return {'times': [self.epochs()[i] for i in order], 'columns': columns, 'groups': {}}
+        return {'times': list(self.epochs()), 'columns': {name: list(values) for name, values in columns.items()}, 'groups': {}}
+
+
+# Stored documents whose forecast rows also get a column form for sliced responses
+# (see columns_document), with where the rows are inside the document. None means the
+# whole document is rows, as for the score arrays: those are stored in column form only.
+COLUMN_SOURCES = {
+    'weather_data': 'forecast',
+    'extended_weather_data': 'forecast',
+    'noaa_stageflow_data': 'forecast',
+    'short_term_weather_data': 'forecast',
+    'forecast_scores': None,
+    'short_term_forecast': None,
+    'extended_forecast_scores': None,
+}
+
+
+def columns_key(key):
+    """The key holding the column form of `key`'s rows (the key itself when it holds nothing else)."""
+    return key if COLUMN_SOURCES.get(key, '') is None else f'{key}_columns'
+
+
+def source_rows(key, document):
+    """The forecast rows COLUMN_SOURCES names for `key` in `document`."""
+    path = COLUMN_SOURCES[key]
+    rows = document if path is None else (document or {}).get(path)
+    return rows or []
+
+
+def as_columns(rows):
+    """The columns_document of forecast rows given as a list, a ForecastColumns or already as one."""
+    if isinstance(rows, ForecastColumns):
+        return rows.document()
+    if isinstance(rows, dict):
+        return rows
+    return columns_document(rows)
+
+
+def as_rows(rows):
+    """Forecast rows given as a list, a ForecastColumns or a columns_document, as a list of dicts (None stays None)."""
+    if isinstance(rows, ForecastColumns):
+        return rows.rows()
+    if isinstance(rows, dict):
+        return select(rows)
+    return rows
+
+
+def row_document(key, document):
+    """`document` as stored under `key`, with the forecast rows COLUMN_SOURCES names as row dicts."""
+    path = COLUMN_SOURCES.get(key)
+    if path is None or not document or path not in document:
+        return document
+    return {**document, path: as_rows(document[path])}
+
+
+def columns_document(rows):
+    """
+    Column form of forecast rows, sorted by time, as stored next to the row document:
+    {'times': [epoch...], 'columns': {name: [values]}, 'groups': {name: parent}}.
+    Values of a nested dict such as a score's 'conditions' get their own columns, listed
+    in 'groups' so select() can nest them again. Missing values are stored as None.
+    """
+    timed = sorted((to_epoch(row['timestamp']), i) for i, row in enumerate(rows) if row.get('timestamp'))
+    ordered = [rows[i] for _, i in timed]
+    names, groups = {}, {}
+    for row in ordered:
+        for field, value in row.items():
+            if isinstance(value, dict):
+                for leaf in value:
+                    names.setdefault((field, leaf), leaf)
+            else:
+                names.setdefault((None, field), field)
+    columns = {}
+    for (group, leaf), name in names.items():
+        if group is None:
+            columns[name] = [row.get(leaf) for row in ordered]
+            continue
+        # A nested name shadowing a top-level one is qualified with its parent
+        if (None, leaf) in names:
+            name = f'{group}.{leaf}'
+        columns[name] = [(row.get(group) or {}).get(leaf) for row in ordered]
+        groups[name] = group
+    return {'times': [t for t, _ in timed], 'columns': columns, 'groups': groups}
+
+
+def select(document, fields=None, start=None, end=None, step=None):
+    """
+    Rows rebuilt from a columns_document: only `fields` (plus 'timestamp'; a group name
+    such as 'conditions' selects all its columns), only times within [start, end] epoch
+    seconds, and with `step` seconds, at most one row per step. Raises ValueError for
+    unknown fields.
+    """
+    times, columns, groups = document['times'], document['columns'], document['groups']
+    if fields:
+        names = ['timestamp']
+        unknown = []
+        for field in fields:
+            matches = [field] if field in columns else [name for name, group in groups.items() if group == field]
+            if not matches:
+                unknown.append(field)
+            names.extend(name for name in matches if name not in names)
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(columns)}")
+    else:
+        names = list(columns)
+
+    lo = 0 if start is None else bisect_left(times, start)
+    hi = len(times) if end is None else bisect_right(times, end)
+    picks = range(lo, hi)
+    if step:
+        picks, due = [], None
+        for i in range(lo, hi):
+            if due is None or times[i] >= due:
+                picks.append(i)
+                due = times[i] + step
+
+    return rows_at(document, picks, names)
+
+
+def rows_at(document, positions, names=None):
+    """Rows rebuilt from a columns_document at `positions`, with all its columns or just `names`."""
+    columns, groups = document['columns'], document['groups']
+    layout = [(name, groups.get(name), name.rsplit('.', 1)[-1], columns[name]) for name in (names or columns) if name in columns]
+    rows = []
+    for i in positions:
+        row = {}
+        for name, group, leaf, column in layout:
+            if group is None:
+                row[name] = column[i]
+            else:
+                row.setdefault(group, {})[leaf] = column[i]
+        rows.append(row)
+    return rows
@@ -0,0 +1,216 @@
+# app/events.py
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+# Published whenever a job stores new data; the message lists the Redis keys it wrote
+DATA_UPDATED = 'data_updated'
+EVENT_CHANNEL = os.getenv('ROWCAST_EVENT_CHANNEL', 'rowcast:events')
+# Seconds to wait for more updates before running the scoring jobs they trigger
+SCORING_DEBOUNCE = float(os.getenv('ROWCAST_SCORING_DEBOUNCE', 5))
+# /api/stream: concurrent clients per web process (each holds a gunicorn thread), seconds
+# between keep-alive comments, and seconds before a stream is closed for the client to reconnect
+STREAM_MAX_CLIENTS = int(os.getenv('ROWCAST_STREAM_MAX_CLIENTS', 12))
+STREAM_HEARTBEAT = float(os.getenv('ROWCAST_STREAM_HEARTBEAT', 15))
+STREAM_MAX_AGE = float(os.getenv('ROWCAST_STREAM_MAX_AGE', 600))
+
+
+class EventBus:
+    """
+    In-process publish/subscribe for data events. Every message is also published on a
+    Redis pub/sub channel so other processes (web workers, stream clients) see it.
+    """
+
+    def __init__(self, redis_client=None, channel=EVENT_CHANNEL):
+        self.redis_client = redis_client
+        self.channel = channel
+        self._subscribers = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def subscribe(self, event, handler):
+        with self._lock:
+            if handler not in self._subscribers[event]:
+                self._subscribers[event].append(handler)
+
+    def unsubscribe(self, event, handler):
+        with self._lock:
+            if handler in self._subscribers[event]:
+                self._subscribers[event].remove(handler)
+
+    def publish(self, event, **payload):
+        """Calls each subscriber with the message, then publishes it to Redis."""
+        published = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        message = {'event': event, 'publishedAt': published, **payload}
+        with self._lock:
+            handlers = list(self._subscribers[event])
+        for handler in handlers:
+            try:
+                handler(message)
+            except Exception:
+                logger.exception(f"Event handler failed for '{event}'")
+        if self.redis_client is not None:
+            try:
+                self.redis_client.publish(self.channel, json.dumps(message))
+            except Exception as e:
+                logger.warning(f"Could not publish '{event}' to Redis: {e}")
+        return message
+
+
+class ScoringPipeline:
+    """
+    Runs the scoring jobs whose inputs changed. `jobs` maps a scheduler job id to
+    (func, input_keys); a data_updated event for any input key schedules that job as a
+    one-off APScheduler run `debounce` seconds out, replacing one already pending, so a
+    burst of updates is scored once.
+    """
+
+    def __init__(self, scheduler, jobs, debounce=SCORING_DEBOUNCE):
+        self.scheduler = scheduler
+        self.jobs = jobs
+        self.debounce = debounce
+        self._run_locks = {job_id: threading.Lock() for job_id in jobs}
+        self._held = None
+        self._lock = threading.Lock()
+
+    def attach(self, event_bus):
+        event_bus.subscribe(DATA_UPDATED, self.on_data_updated)
+
+    def dependents(self, keys):
+        """Job ids that read any of `keys`, in `jobs` order."""
+        keys = set(keys)
+        return [job_id for job_id, (_, inputs) in self.jobs.items() if keys.intersection(inputs)]
+
+    def on_data_updated(self, message):
+        job_ids = self.dependents(message.get('keys', []))
+        if not job_ids:
+            return
+        with self._lock:
+            if self._held is not None:
+                self._held.update(job_ids)
+                return
+        self.schedule(job_ids)
+
+    def schedule(self, job_ids):
+        run_date = datetime.now() + timedelta(seconds=self.debounce)
+        for job_id in job_ids:
+            self.scheduler.add_job(
+                id=job_id,
+                func=self.run,
+                args=[job_id],
+                trigger='date',
+                run_date=run_date,
+                replace_existing=True,
+                # A run may still be going when the next one fires; run() serializes them
+                max_instances=3,
+            )
+
+    def run(self, job_id, context=None):
+        """Runs one scoring job; runs of the same job never overlap."""
+        func, _ = self.jobs[job_id]
+        with self._run_locks[job_id]:
+            if context is None:
+                func()
+            else:
+                func(context)
+
+    def run_now(self, job_ids, context=None):
+        for job_id in self.jobs:
+            if job_id in job_ids:
+                self.run(job_id, context)
+
+    @contextmanager
+    def hold(self):
+        """
+        Collects the job ids triggered inside the block instead of scheduling them, so a
+        caller that scores right after its fetches (the refresh cycle) can run them itself.
+        """
+        with self._lock:
+            self._held = set()
+        triggered = self._held
+        try:
+            yield triggered
+        finally:
+            with self._lock:
+                self._held = None
+
+
+class EventStream:
+    """
+    Fans the Redis event channel out to this process's stream clients. However many
+    clients are connected, the process holds one pub/sub subscription, opened by a
+    listener thread when the first client connects and dropped after the last leaves.
+    """
+
+    def __init__(self, redis_client, channel=EVENT_CHANNEL, max_clients=STREAM_MAX_CLIENTS):
+        self.redis_client = redis_client
+        self.channel = channel
+        self.max_clients = max_clients
+        self._clients = set()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def connect(self):
+        """Returns a queue that receives every event message, or None when max_clients are connected."""
+        with self._lock:
+            if len(self._clients) >= self.max_clients:
+                return None
+            client = queue.Queue(maxsize=100)
+            self._clients.add(client)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._listen, name='rowcast-event-stream', daemon=True)
+                self._thread.start()
+            return client
+
+    def disconnect(self, client):
+        with self._lock:
+            self._clients.discard(client)
+
+    def clients(self):
+        with self._lock:
+            return len(self._clients)
+
+    def broadcast(self, message):
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            try:
+                client.put_nowait(message)
+            except queue.Full:
+                # A client this far behind refetches everything when it reconnects
+                pass
+
+    def _idle(self):
+        """True, and the listener marked as stopped, once no client is left."""
+        with self._lock:
+            if self._clients:
+                return False
+            self._thread = None
+            return True
+
+    def _listen(self):
+        while not self._idle():
+            pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self.channel)
+                while not self._idle():
+                    raw = pubsub.get_message(timeout=1.0)
+                    if raw is None or raw.get('type') != 'message':
+                        continue
+                    try:
+                        self.broadcast(json.loads(raw['data']))
+                    except ValueError:
+                        logger.warning(f"Ignoring malformed event on '{self.channel}'")
+                return
+            except Exception as e:
+                logger.warning(f"Event stream subscription to '{self.channel}' failed, retrying: {e}")
+                time.sleep(1)
+            finally:
+                pubsub.close()
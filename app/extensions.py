@@ -2,8 +2,21 @@
 
 from flask_apscheduler import APScheduler
 import redis
+from app.http_client import HTTPClient
+from app.events import EventBus, EventStream
+from app.cache import DocumentCache
 
 # --- Initialize Extensions ---
 # Create the extension instances here, but don't initialize them with the app yet.
 redis_client = redis.Redis(host='localhost', port=6379, db=0, decode_responses=True)
-scheduler = APScheduler()
\ No newline at end of file
+# Same server, raw bytes: pre-encoded response bodies (app.bodies)
+redis_binary = redis.Redis(host='localhost', port=6379, db=0)
+scheduler = APScheduler()
+# Shared keep-alive HTTP pools for every upstream fetcher
+http_client = HTTPClient.from_env()
+# Data-updated events: in-process subscribers plus Redis pub/sub
+event_bus = EventBus(redis_client)
+# The same events fanned out to this web process's /api/stream clients
+event_stream = EventStream(redis_client)
+# Decoded documents for the routes, invalidated by the jobs' generation bumps
+document_cache = DocumentCache(redis_client)
\ No newline at end of file
@@ -0,0 +1,51 @@
+# app/fanout.py
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
+
+# Overall deadline (seconds) for one fetcher's upstream calls and for a full refresh cycle
+FETCH_DEADLINE = float(os.getenv('ROWCAST_FETCH_DEADLINE', 40))
+CYCLE_DEADLINE = float(os.getenv('ROWCAST_CYCLE_DEADLINE', 90))
+
+
+def fan_out(calls, deadline=FETCH_DEADLINE):
+    """
+    Run independent zero-argument callables at the same time under one overall deadline.
+
+    `calls` maps a name to a callable. Returns `(results, errors)`: `results` maps the
+    name of every call that finished to its return value, `errors` maps the name of every
+    call that raised to its exception. Calls still running when the deadline passes are
+    reported as `TimeoutError` and left to finish in the background, so the caller always
+    gets whatever partial results are ready.
+    """
+    if not calls:
+        return {}, {}
+
+    started = time.monotonic()
+    # A pool per fan-out keeps nested fan-outs (a cycle of jobs whose fetchers fan out
+    # again) from starving each other of workers.
+    executor = ThreadPoolExecutor(max_workers=len(calls), thread_name_prefix='fanout')
+    try:
+        futures = {name: executor.submit(call) for name, call in calls.items()}
+        wait(futures.values(), timeout=deadline)
+    finally:
+        executor.shutdown(wait=False)
+
+    results, errors = {}, {}
+    for name, future in futures.items():
+        if not future.done():
+            errors[name] = TimeoutError(f"{name} did not finish within {deadline:.0f}s")
+            logger.warning(f"FANOUT: {name} timed out after {deadline:.0f}s; continuing with partial results")
+            continue
+        exc = future.exception()
+        if exc is not None:
+            errors[name] = exc
+        else:
+            results[name] = future.result()
+
+    logger.info(f"FANOUT: {len(results)}/{len(calls)} calls finished in {time.monotonic() - started:.2f}s")
+    return results, errors
@@ -3,9 +3,14 @@
 import requests
 import json
 import os
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import logging
-from app.utils import fmt, deg_to_cardinal
+from app.columnar import ForecastColumns, HOURLY_FIELDS, MINUTELY_15_FIELDS, wind_dir_label
+from app.alerts import alert_table, alert_ids_at
+from app.extensions import http_client, redis_client
+from app.cache import TwoTierCache
+from app.fanout import fan_out
+from app.timeseries import to_epoch, epoch_to_iso_z, time_grid, interpolate_series
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -13,169 +18,268 @@ logger = logging.getLogger(__name__)
 
 # The file cache logic has been removed and is now handled by Redis.
 
-def fetch_weather_data():
-    """Fetches current and forecast weather data from the Open-Meteo API."""
-    logger.info("FETCHER: Calling Open-Meteo API...")
+# NWS lookups shared by every process: the points-to-zone mapping almost never
+# changes, and one alert fetch per refresh cycle is enough for every weather view.
+nws_cache = TwoTierCache(redis_client, prefix='nws')
+NWS_POINTS_TTL = int(os.getenv('ROWCAST_NWS_POINTS_TTL', 7 * 24 * 3600))
+NWS_ALERTS_TTL = int(os.getenv('ROWCAST_NWS_ALERTS_TTL', 5 * 60))
+NWS_ALERTS_LAST_TTL = 24 * 3600
+
+# USGS parameter codes and the water fields they feed
+USGS_PARAMETERS = {'00060': 'discharge', '00065': 'gaugeHeight', '00010': 'waterTemp'}
+# Samples kept per series; matches the last-24-values window used for trend extrapolation
+USGS_HISTORY_LENGTH = int(os.getenv('ROWCAST_USGS_HISTORY_LENGTH', 24))
+# Minutes between USGS instantaneous values at the site
+USGS_SAMPLE_MINUTES = 15
+
+def _get_json(url, **kwargs):
+    """GET a URL through the shared HTTP client and decode the JSON body."""
+    response = http_client.get(url, **kwargs)
+    response.raise_for_status()
+    return response.json()
+
+MINUTELY_15_PARAMS = ("temperature_2m,apparent_temperature,wind_speed_10m,"
+                      "wind_direction_10m,wind_gusts_10m,precipitation,precipitation_probability,visibility")
+
+def fetch_open_meteo_bundle():
+    """
+    Fetches current, hourly (7 days) and 15-minute weather from a single Open-Meteo request.
+    The 24-hour, 7-day and short-term views are all sliced from this one payload.
+    """
+    logger.info("FETCHER: Calling Open-Meteo API (current, hourly and 15-minute)...")
     lat, lon = 39.8682, -75.5916
+    
+    # NOAA typically provides ~5-7 days, so we request 7 days to cover its forecast
+    forecast_days = 7
+    
     url = (
         f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}"
         "&current=temperature_2m,apparent_temperature,wind_speed_10m,"  
         "wind_direction_10m,wind_gusts_10m,precipitation,uv_index,visibility"
         "&hourly=temperature_2m,apparent_temperature,wind_speed_10m,"
         "wind_direction_10m,wind_gusts_10m,precipitation,uv_index,visibility,precipitation_probability,lightning_potential"
+        f"&minutely_15={MINUTELY_15_PARAMS}"
         "&windspeed_unit=mph&temperature_unit=fahrenheit"
-        "&timezone=America/New_York&forecast_days=2"
+        f"&timezone=America/New_York&forecast_days={forecast_days}&forecast_minutely_15=12"
     )
     
-    try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Failed to fetch weather data: {e}")
-        raise Exception(f"Weather API request failed: {e}")
-    except json.JSONDecodeError as e:
+    # Fetch the forecast and the NWS alerts at the same time
+    results, errors = fan_out({
+        'forecast': lambda: _get_json(url),
+        'alerts': lambda: fetch_weather_alerts(lat, lon),
+    })
+    e = errors.get('forecast')
+    if isinstance(e, json.JSONDecodeError):
         logger.error(f"Failed to parse weather data JSON: {e}")
         raise Exception(f"Weather API returned invalid JSON: {e}")
-    
-    # Fetch weather alerts from NWS API
-    alerts = fetch_weather_alerts(lat, lon)
+    elif e is not None:
+        logger.error(f"Failed to fetch weather data: {e}")
+        raise Exception(f"Weather API request failed: {e}")
+    data = results['forecast']
+    alerts = results.get('alerts', [])
+    # Stored once per document; forecast hours reference them by ID
+    alerts_by_id = alert_table(alerts)
     
     try:
-        # Current weather data
-        current = data.get("current", {})
-        deg = current.get('wind_direction_10m')
-        wind_dir = f"{deg_to_cardinal(deg)} ({fmt(deg, 0, '°')})" if deg is not None else "N/A"
-        current_weather = {
-            'windSpeed': current.get('wind_speed_10m'),
-            'windGust': current.get('wind_gusts_10m'),
-            'windDir': wind_dir,
-            'apparentTemp': current.get('apparent_temperature'),
-            'uvIndex': current.get('uv_index'),
-            'precipitation': current.get('precipitation'),
-            'currentTemp': current.get('temperature_2m'),
-            'visibility': current.get('visibility'),
-            'timestamp': current.get('time'),
-            'weatherAlerts': alerts  # Add active alerts
-        }
-        
-        # Hourly forecast data (next 24 hours)
-        hourly = data.get("hourly", {})
-        times = hourly.get('time', [])
-        forecast = []
-        
-        # Get next 24 hours of data
-        for i in range(min(24, len(times))):
-            deg_forecast = hourly.get('wind_direction_10m', [])[i] if i < len(hourly.get('wind_direction_10m', [])) else None
-            wind_dir_forecast = f"{deg_to_cardinal(deg_forecast)} ({fmt(deg_forecast, 0, '°')})" if deg_forecast is not None else "N/A"
-            
-            forecast_hour = {
-                'timestamp': times[i],
-                'windSpeed': hourly.get('wind_speed_10m', [])[i] if i < len(hourly.get('wind_speed_10m', [])) else None,
-                'windGust': hourly.get('wind_gusts_10m', [])[i] if i < len(hourly.get('wind_gusts_10m', [])) else None,
-                'windDir': wind_dir_forecast,
-                'apparentTemp': hourly.get('apparent_temperature', [])[i] if i < len(hourly.get('apparent_temperature', [])) else None,
-                'uvIndex': hourly.get('uv_index', [])[i] if i < len(hourly.get('uv_index', [])) else None,
-                'precipitation': hourly.get('precipitation', [])[i] if i < len(hourly.get('precipitation', [])) else None,
-                'currentTemp': hourly.get('temperature_2m', [])[i] if i < len(hourly.get('temperature_2m', [])) else None,
-                'visibility': hourly.get('visibility', [])[i] if i < len(hourly.get('visibility', [])) else None,
-                'precipitationProbability': hourly.get('precipitation_probability', [])[i] if i < len(hourly.get('precipitation_probability', [])) else None,
-                'lightningPotential': hourly.get('lightning_potential', [])[i] if i < len(hourly.get('lightning_potential', [])) else None,
-                'weatherAlerts': alerts  # Include alerts for each forecast hour
-            }
-            forecast.append(forecast_hour)
+        current_weather = build_current_weather(data.get("current", {}), list(alerts_by_id.values()))
+        hourly_forecast = build_hourly_forecast(data.get("hourly", {}), alerts_by_id)
+        short_term_forecast = build_short_term_forecast(data.get("minutely_15", {}))
         
-        logger.info(f"Successfully fetched weather data with {len(forecast)} forecast hours and {len(alerts)} active alerts")
+        logger.info(f"Successfully fetched weather data with {len(hourly_forecast)} forecast hours, {len(short_term_forecast)} 15-minute intervals and {len(alerts)} active alerts")
         return {
-            'current': current_weather,
-            'forecast': forecast,
-            'alerts': alerts
+            # Next 24 hours
+            'weather': {
+                'current': current_weather,
+                'forecast': hourly_forecast.head(24),
+                'alerts': alerts_by_id
+            },
+            # Every available hour
+            'extended': {
+                'current': current_weather,
+                'forecast': hourly_forecast,
+                'alerts': alerts_by_id,
+                'forecastDays': forecast_days
+            },
+            # Next 3 hours at 15-minute resolution
+            'shortTerm': {
+                'forecast': short_term_forecast,
+                'interval': '15min',
+                'duration': '3hours'
+            }
         }
     except Exception as e:
         logger.error(f"Failed to process weather data: {e}")
         raise Exception(f"Weather data processing failed: {e}")
 
-def fetch_weather_alerts(lat, lon):
-    """Fetch active weather alerts from NWS API for the given coordinates."""
+def fetch_open_meteo_short_term():
+    """
+    Fetches only the next 3 hours at 15-minute resolution, for refreshing the short-term
+    view between bundle fetches. The response is a few hundred bytes.
+    """
+    logger.info("FETCHER: Calling Open-Meteo API (15-minute only)...")
+    lat, lon = 39.8682, -75.5916
+    url = (
+        f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}"
+        f"&minutely_15={MINUTELY_15_PARAMS}"
+        "&windspeed_unit=mph&temperature_unit=fahrenheit"
+        "&timezone=America/New_York&forecast_minutely_15=12"
+    )
     try:
-        # Get the NWS grid point for the coordinates
-        grid_url = f"https://api.weather.gov/points/{lat},{lon}"
-        grid_response = requests.get(grid_url, timeout=10)
+        data = _get_json(url)
+    except Exception as e:
+        logger.error(f"Failed to fetch 15-minute weather data: {e}")
+        raise Exception(f"Weather API request failed: {e}")
+    return {
+        'forecast': build_short_term_forecast(data.get("minutely_15", {})),
+        'interval': '15min',
+        'duration': '3hours'
+    }
+
+def build_current_weather(current, alerts):
+    """Builds the current conditions dict from Open-Meteo's `current` block."""
+    return {
+        'windSpeed': current.get('wind_speed_10m'),
+        'windGust': current.get('wind_gusts_10m'),
+        'windDir': wind_dir_label(current.get('wind_direction_10m')),
+        'apparentTemp': current.get('apparent_temperature'),
+        'uvIndex': current.get('uv_index'),
+        'precipitation': current.get('precipitation'),
+        'currentTemp': current.get('temperature_2m'),
+        'visibility': current.get('visibility'),
+        'timestamp': current.get('time'),
+        'weatherAlerts': alerts  # Add active alerts
+    }
+
+def build_hourly_forecast(hourly, alerts):
+    """
+    Builds hourly forecast columns from Open-Meteo's `hourly` block. Each hour lists the
+    IDs of the alerts (an alert_table) in effect during it.
+    """
+    columns = ForecastColumns.from_open_meteo(hourly, HOURLY_FIELDS)
+    return columns.add('weatherAlertIds', alert_ids_at(columns.epochs(), alerts, 3600))
+
+def build_short_term_forecast(minutely):
+    """Builds 15-minute columns (next 3 hours) from Open-Meteo's `minutely_15` block."""
+    # Process next 3 hours (12 x 15-minute intervals)
+    columns = ForecastColumns.from_open_meteo(minutely, MINUTELY_15_FIELDS, limit=12)
+    n = len(columns)
+    # Current water values are filled in when the intervals are scored
+    columns.add('discharge', [None] * n).add('waterTemp', [None] * n).add('gaugeHeight', [None] * n)
+    columns.add('uvIndex', [0] * n)  # UV not available in 15-min data, default to 0 for short term
+    columns.add('lightningPotential', [0] * n)  # Lightning not available in 15-min data
+    return columns.add('weatherAlertIds', [[] for _ in range(n)])
+
+def with_rows(view):
+    """A bundle view with its forecast columns built into rows."""
+    return {**view, 'forecast': view['forecast'].rows()}
+
+def fetch_weather_data():
+    """Fetches current and next-24-hour forecast weather data from the Open-Meteo API."""
+    return with_rows(fetch_open_meteo_bundle()['weather'])
+
+def fetch_nws_point(lat, lon):
+    """
+    Returns the NWS forecast zone and county for the given coordinates (cached for a week).
+    Raises if the lookup names no forecast zone, so a bad answer is retried next time.
+    """
+    def load():
+        grid_response = http_client.get(f"https://api.weather.gov/points/{lat},{lon}", timeout=10)
         grid_response.raise_for_status()
         grid_data = grid_response.json()
-        
+        point = {
+            'zone': (grid_data.get('properties', {}).get('forecastZone') or '').split('/')[-1],
+            'county': (grid_data.get('properties', {}).get('county') or '').split('/')[-1]
+        }
+        if not point['zone']:
+            raise ValueError(f"NWS point lookup for {lat},{lon} returned no forecast zone")
+        return point
+    
+    return nws_cache.get_or_load(f"points:{lat},{lon}", NWS_POINTS_TTL, load)
+
+def fetch_weather_alerts(lat, lon):
+    """Fetch active weather alerts from NWS API for the given coordinates."""
+    try:
         # Get the zone and county for alerts
-        zone = grid_data.get('properties', {}).get('forecastZone', '').split('/')[-1]
-        county = grid_data.get('properties', {}).get('county', '').split('/')[-1]
+        point = fetch_nws_point(lat, lon)
+        zone = point.get('zone')
         
-        alerts = []
-        
-        # Fetch zone-based alerts
-        if zone:
-            zone_alerts_url = f"https://api.weather.gov/alerts/active/zone/{zone}"
-            try:
-                zone_response = requests.get(zone_alerts_url, timeout=10)
-                zone_response.raise_for_status()
-                zone_data = zone_response.json()
-                
-                for feature in zone_data.get('features', []):
-                    props = feature.get('properties', {})
-                    alert = {
-                        'type': props.get('event'),
-                        'severity': props.get('severity'),
-                        'urgency': props.get('urgency'),
-                        'certainty': props.get('certainty'),
-                        'headline': props.get('headline'),
-                        'description': props.get('description'),
-                        'instruction': props.get('instruction'),
-                        'onset': props.get('onset'),
-                        'expires': props.get('expires')
-                    }
-                    alerts.append(alert)
-            except Exception as e:
-                logger.warning(f"Failed to fetch zone alerts: {e}")
+        if not zone:
+            return []
         
-        return alerts
+        # Every caller in the same refresh cycle shares one zone alert fetch
+        return nws_cache.get_or_load(f"alerts:{zone}", NWS_ALERTS_TTL, lambda: fetch_zone_alerts(zone))
         
     except Exception as e:
         logger.warning(f"Failed to fetch weather alerts: {e}")
         return []
 
+def fetch_zone_alerts(zone):
+    """Fetch active alerts for a single NWS forecast zone, reusing the last parse on 304 Not Modified."""
+    zone_alerts_url = f"https://api.weather.gov/alerts/active/zone/{zone}"
+    last_alerts = nws_cache.get(f"alerts_last:{zone}")
+    zone_response = http_client.get_conditional(zone_alerts_url, use_validators=last_alerts is not None, timeout=10)
+    if zone_response.status_code == 304:
+        logger.info(f"NWS alerts for zone {zone} unchanged (304 Not Modified)")
+        return last_alerts
+    zone_response.raise_for_status()
+    zone_data = zone_response.json()
+    
+    alerts = []
+    for feature in zone_data.get('features', []):
+        props = feature.get('properties', {})
+        alert = {
+            'id': props.get('id') or feature.get('id'),
+            'type': props.get('event'),
+            'severity': props.get('severity'),
+            'urgency': props.get('urgency'),
+            'certainty': props.get('certainty'),
+            'headline': props.get('headline'),
+            'description': props.get('description'),
+            'instruction': props.get('instruction'),
+            'onset': props.get('onset'),
+            'expires': props.get('expires')
+        }
+        alerts.append(alert)
+    
+    # Keep the parsed alerts around for as long as a 304 could refer to them
+    nws_cache.set(f"alerts_last:{zone}", alerts, NWS_ALERTS_LAST_TTL)
+    http_client.remember_validators(zone_alerts_url, zone_response)
+    return alerts
+
 def fetch_water_data_with_history():
     """Fetches current and historical water data from the USGS API for trend analysis."""
     logger.info("FETCHER: Calling USGS Water Services API with historical data...")
     site_id = "01474500"
     params = "00010,00065,00060"
     
-    try:
-        # Get current data
-        current_url = f"https://waterservices.usgs.gov/nwis/iv/?sites={site_id}&parameterCd={params}&format=json"
-        current_response = requests.get(current_url, timeout=30)
-        current_response.raise_for_status()
-        current_data = current_response.json()
-        
-        # Get historical data (last 7 days for trend analysis)
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=7)
-        start_str = start_date.strftime('%Y-%m-%d')
-        end_str = end_date.strftime('%Y-%m-%d')
-        
-        historical_url = f"https://waterservices.usgs.gov/nwis/iv/?sites={site_id}&parameterCd={params}&startDT={start_str}&endDT={end_str}&format=json"
-        
-        historical_data = None
-        try:
-            historical_response = requests.get(historical_url, timeout=30)
-            historical_response.raise_for_status()
-            historical_data = historical_response.json()
-        except requests.exceptions.RequestException as e:
-            logger.warning(f"Failed to fetch historical water data: {e}")
-            
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Failed to fetch current water data: {e}")
-        raise Exception(f"Water API request failed: {e}")
-    except json.JSONDecodeError as e:
+    # Current data
+    current_url = f"https://waterservices.usgs.gov/nwis/iv/?sites={site_id}&parameterCd={params}&format=json"
+    
+    # Historical data (last 7 days for trend analysis)
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=7)
+    start_str = start_date.strftime('%Y-%m-%d')
+    end_str = end_date.strftime('%Y-%m-%d')
+    
+    historical_url = f"https://waterservices.usgs.gov/nwis/iv/?sites={site_id}&parameterCd={params}&startDT={start_str}&endDT={end_str}&format=json"
+    
+    # Both windows are independent, so request them at the same time
+    results, errors = fan_out({
+        'current': lambda: _get_json(current_url),
+        'historical': lambda: _get_json(historical_url),
+    })
+    e = errors.get('current')
+    if isinstance(e, json.JSONDecodeError):
         logger.error(f"Failed to parse water data JSON: {e}")
         raise Exception(f"Water API returned invalid JSON: {e}")
+    elif e is not None:
+        logger.error(f"Failed to fetch current water data: {e}")
+        raise Exception(f"Water API request failed: {e}")
+    current_data = results['current']
+    
+    historical_data = results.get('historical')
+    if 'historical' in errors:
+        logger.warning(f"Failed to fetch historical water data: {errors['historical']}")
     
     try:
         # Process current data
@@ -232,6 +336,117 @@ def fetch_water_data_with_history():
         logger.error(f"Failed to process water data: {e}")
         raise Exception(f"Water data processing failed: {e}")
 
+def _usgs_value(field, raw):
+    """Converts a raw USGS value string into the unit the water fields use."""
+    if field == 'waterTemp':
+        return float(raw) * 1.8 + 32
+    if field == 'discharge':
+        return int(float(raw))
+    return float(raw)
+
+def _usgs_series_field(series):
+    """Maps a USGS timeSeries entry to its water field by parameter code (name as fallback)."""
+    try:
+        code = series['variable']['variableCode'][0]['value']
+        if code in USGS_PARAMETERS:
+            return code
+    except (IndexError, KeyError, TypeError):
+        pass
+    name = series.get('variable', {}).get('variableName', '').lower()
+    if 'gage height' in name:
+        return '00065'
+    if 'temperature' in name:
+        return '00010'
+    if 'discharge' in name or 'flow' in name:
+        return '00060'
+    return None
+
+def fetch_water_data_incremental():
+    """
+    Fetches only the USGS samples newer than the last ingested ones and appends them to
+    bounded per-series ring buffers in Redis. Returns the same current/historical shape as
+    fetch_water_data_with_history, built from the buffers.
+    """
+    logger.info("FETCHER: Calling USGS Water Services API for new samples...")
+    site_id = "01474500"
+    params = ",".join(USGS_PARAMETERS)
+    key_prefix = f"usgs:{site_id}"
+    
+    last_seen = dict(zip(USGS_PARAMETERS, redis_client.mget([f"{key_prefix}:{code}:last" for code in USGS_PARAMETERS])))
+    
+    # Ask only for the window since the oldest series' last sample, but never for more than
+    # the buffers hold: anything older is trimmed right away, and one stalled (or new) series
+    # must not turn every run into a full pull for all of them
+    minutes = USGS_HISTORY_LENGTH * USGS_SAMPLE_MINUTES
+    if all(last_seen.values()):
+        oldest = min(datetime.fromisoformat(ts) for ts in last_seen.values())
+        behind = int((datetime.now(timezone.utc) - oldest).total_seconds() // 60) + USGS_SAMPLE_MINUTES
+        minutes = min(minutes, max(behind, USGS_SAMPLE_MINUTES))
+    period = f"PT{minutes}M"
+    
+    url = f"https://waterservices.usgs.gov/nwis/iv/?sites={site_id}&parameterCd={params}&period={period}&format=json"
+    try:
+        response = http_client.get(url)
+        response.raise_for_status()
+        data = response.json()
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Failed to fetch water data: {e}")
+        raise Exception(f"Water API request failed: {e}")
+    except json.JSONDecodeError as e:
+        logger.error(f"Failed to parse water data JSON: {e}")
+        raise Exception(f"Water API returned invalid JSON: {e}")
+    
+    try:
+        pipe = redis_client.pipeline()
+        appended = 0
+        for series in data.get('value', {}).get('timeSeries', []):
+            code = _usgs_series_field(series)
+            if code is None:
+                continue
+            field = USGS_PARAMETERS[code]
+            last_dt = datetime.fromisoformat(last_seen[code]) if last_seen[code] else None
+            
+            new_entries = []
+            try:
+                for val_entry in series['values'][0]['value']:
+                    entry_dt = datetime.fromisoformat(val_entry['dateTime'])
+                    if last_dt is not None and entry_dt <= last_dt:
+                        continue
+                    new_entries.append({
+                        'timestamp': val_entry['dateTime'],
+                        'value': _usgs_value(field, val_entry['value'])
+                    })
+            except (IndexError, KeyError, ValueError):
+                logger.warning(f"Could not parse new samples for {field}")
+                continue
+            
+            if new_entries:
+                pipe.rpush(f"{key_prefix}:{code}:series", *[json.dumps(entry) for entry in new_entries])
+                pipe.ltrim(f"{key_prefix}:{code}:series", -USGS_HISTORY_LENGTH, -1)
+                pipe.set(f"{key_prefix}:{code}:last", new_entries[-1]['timestamp'])
+                appended += len(new_entries)
+        
+        for code in USGS_PARAMETERS:
+            pipe.lrange(f"{key_prefix}:{code}:series", 0, -1)
+        buffers = pipe.execute()[-len(USGS_PARAMETERS):]
+        
+        current_out = {'gaugeHeight': None, 'waterTemp': None, 'discharge': None}
+        historical_out = {'gaugeHeight': [], 'waterTemp': [], 'discharge': []}
+        for code, raw_entries in zip(USGS_PARAMETERS, buffers):
+            field = USGS_PARAMETERS[code]
+            historical_out[field] = [json.loads(raw) for raw in raw_entries]
+            if historical_out[field]:
+                current_out[field] = historical_out[field][-1]['value']
+        
+        logger.info(f"Successfully ingested {appended} new water samples ({len(response.content)} bytes, period={period})")
+        return {
+            'current': current_out,
+            'historical': historical_out
+        }
+    except Exception as e:
+        logger.error(f"Failed to process water data: {e}")
+        raise Exception(f"Water data processing failed: {e}")
+
 def predict_water_data(historical_data):
     """Simple trend-based prediction for water data."""
     try:
@@ -288,7 +503,7 @@ def fetch_water_data():
     
     try:
         url = f"https://waterservices.usgs.gov/nwis/iv/?sites={site_id}&parameterCd={params}&format=json"
-        response = requests.get(url, timeout=30)
+        response = http_client.get(url)
         response.raise_for_status()
         data = response.json()
     except requests.exceptions.RequestException as e:
@@ -323,81 +538,34 @@ def fetch_water_data():
 
 def fetch_short_term_forecast():
     """Fetches 15-minute interval weather data for the next 3 hours."""
-    logger.info("FETCHER: Calling Open-Meteo API for 15-minute forecast...")
-    lat, lon = 39.8682, -75.5916
-    url = (
-        f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}"
-        "&minutely_15=temperature_2m,apparent_temperature,wind_speed_10m,"
-        "wind_direction_10m,wind_gusts_10m,precipitation,precipitation_probability,visibility"
-        "&windspeed_unit=mph&temperature_unit=fahrenheit"
-        "&timezone=America/New_York&forecast_hours=3"
-    )
+    short_term = with_rows(fetch_open_meteo_bundle()['shortTerm'])
     
-    try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Failed to fetch 15-minute forecast data: {e}")
-        raise Exception(f"15-minute forecast API request failed: {e}")
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse 15-minute forecast JSON: {e}")
-        raise Exception(f"15-minute forecast API returned invalid JSON: {e}")
-    
-    try:
-        # Get current water data for the short-term projections
-        from app.extensions import redis_client
-        water_data_str = redis_client.get('water_data')
-        water_data = json.loads(water_data_str) if water_data_str else {}
-        current_water = water_data.get('current', {})
-        
-        # 15-minute forecast data
-        minutely = data.get("minutely_15", {})
-        times = minutely.get('time', [])
-        forecast = []
-        
-        # Process next 3 hours (12 x 15-minute intervals)
-        for i in range(min(12, len(times))):
-            deg_forecast = minutely.get('wind_direction_10m', [])[i] if i < len(minutely.get('wind_direction_10m', [])) else None
-            wind_dir_forecast = f"{deg_to_cardinal(deg_forecast)} ({fmt(deg_forecast, 0, '°')})" if deg_forecast is not None else "N/A"
-            
-            forecast_interval = {
-                'timestamp': times[i],
-                'windSpeed': minutely.get('wind_speed_10m', [])[i] if i < len(minutely.get('wind_speed_10m', [])) else None,
-                'windGust': minutely.get('wind_gusts_10m', [])[i] if i < len(minutely.get('wind_gusts_10m', [])) else None,
-                'windDir': wind_dir_forecast,
-                'apparentTemp': minutely.get('apparent_temperature', [])[i] if i < len(minutely.get('apparent_temperature', [])) else None,
-                'precipitation': minutely.get('precipitation', [])[i] if i < len(minutely.get('precipitation', [])) else None,
-                'currentTemp': minutely.get('temperature_2m', [])[i] if i < len(minutely.get('temperature_2m', [])) else None,
-                'visibility': minutely.get('visibility', [])[i] if i < len(minutely.get('visibility', [])) else None,
-                'precipitationProbability': minutely.get('precipitation_probability', [])[i] if i < len(minutely.get('precipitation_probability', [])) else None,
-                # Use current water values for short-term forecast
-                'discharge': current_water.get('discharge'),
-                'waterTemp': current_water.get('waterTemp'),
-                'gaugeHeight': current_water.get('gaugeHeight'),
-                'uvIndex': 0,  # UV not available in 15-min data, default to 0 for short term
-                'lightningPotential': 0,  # Lightning not available in 15-min data
-                'weatherAlerts': []  # Use current alerts
-            }
-            forecast.append(forecast_interval)
-        
-        logger.info(f"Successfully fetched 15-minute forecast data with {len(forecast)} intervals")
-        return {
-            'forecast': forecast,
-            'interval': '15min',
-            'duration': '3hours'
-        }
-    except Exception as e:
-        logger.error(f"Failed to process 15-minute forecast data: {e}")
-        raise Exception(f"15-minute forecast data processing failed: {e}")
+    # Get current water data for the short-term projections
+    water_data_str = redis_client.get('water_data')
+    water_data = json.loads(water_data_str) if water_data_str else {}
+    current_water = water_data.get('current', {})
+    for interval in short_term['forecast']:
+        interval['discharge'] = current_water.get('discharge')
+        interval['waterTemp'] = current_water.get('waterTemp')
+        interval['gaugeHeight'] = current_water.get('gaugeHeight')
+    return short_term
+
+NOAA_STAGEFLOW_URL = "https://api.water.noaa.gov/nwps/v1/gauges/padp1/stageflow"
 
-def fetch_noaa_stageflow_forecast():
-    """Fetches stage and flow forecast data from NOAA NWPS API with interpolation for hourly intervals."""
+def fetch_noaa_stageflow_forecast(conditional=False, resolution_minutes=60):
+    """
+    Fetches stage and flow forecast data from NOAA NWPS API, interpolated to `resolution_minutes`
+    intervals (hourly by default). With `conditional=True` the request carries the validators
+    from the previous fetch, and None is returned when NOAA answers 304 Not Modified (no new
+    forecast has been issued).
+    """
     logger.info("FETCHER: Calling NOAA NWPS API for stageflow forecast...")
     
     try:
-        url = "https://api.water.noaa.gov/nwps/v1/gauges/padp1/stageflow"
-        response = requests.get(url, timeout=30)
+        response = http_client.get_conditional(NOAA_STAGEFLOW_URL, use_validators=conditional)
+        if response.status_code == 304:
+            logger.info("NOAA stageflow forecast unchanged since last fetch (304 Not Modified)")
+            return None
         response.raise_for_status()
         data = response.json()
         
@@ -424,36 +592,33 @@ def fetch_noaa_stageflow_forecast():
                 'generatedTime': latest.get('generatedTime')
             }
         
-        # Process forecast data and interpolate to hourly intervals
+        # Process forecast data and interpolate to the output resolution (hourly by default)
         hourly_forecast = []
         
         if forecast_data and len(forecast_data) >= 2:
-            # Sort forecast data by timestamp
+            # Sort forecast data by timestamp and parse each validTime once
             sorted_forecast = sorted(forecast_data, key=lambda x: x.get('validTime', ''))
+            point_times = [to_epoch(point['validTime']) for point in sorted_forecast]
             
-            # Get the time range for interpolation
-            start_time = datetime.fromisoformat(sorted_forecast[0]['validTime'].replace('Z', '+00:00'))
-            end_time = datetime.fromisoformat(sorted_forecast[-1]['validTime'].replace('Z', '+00:00'))
+            # Output timestamps from the first forecast hour to the last forecast point
+            targets = time_grid(point_times[0], point_times[-1], resolution_minutes * 60)
+            interpolated = interpolate_series(point_times, {
+                'stage': [point.get('primary') for point in sorted_forecast],
+                'flow': [point.get('secondary') for point in sorted_forecast]
+            }, targets)
             
-            # Generate hourly timestamps from start to end
-            current_hour = start_time.replace(minute=0, second=0, microsecond=0)
-            
-            while current_hour <= end_time:
-                # Find the two forecast points that bracket this hour
-                interpolated_values = interpolate_forecast_values(sorted_forecast, current_hour)
-                
-                if interpolated_values:
-                    hourly_forecast.append({
-                        'timestamp': current_hour.isoformat().replace('+00:00', 'Z'),
-                        'gaugeHeight': interpolated_values['stage'],
-                        'discharge': interpolated_values['flow'] * 1000 if interpolated_values['flow'] else None,  # Convert kcfs to cfs
-                        'source': 'noaa_nwps_interpolated'
-                    })
-                
-                current_hour += timedelta(hours=1)
+            for target, stage, flow in zip(targets, interpolated['stage'], interpolated['flow']):
+                hourly_forecast.append({
+                    'timestamp': epoch_to_iso_z(target),
+                    'gaugeHeight': stage,
+                    'discharge': flow * 1000 if flow else None,  # Convert kcfs to cfs
+                    'source': 'noaa_nwps_interpolated'
+                })
         
         logger.info(f"Successfully processed NOAA stageflow data: {len(observed_data)} observed points, {len(forecast_data)} forecast points, {len(hourly_forecast)} interpolated hours")
         
+        # Only a forecast that parsed may be answered with a 304 next time
+        http_client.remember_validators(NOAA_STAGEFLOW_URL, response)
         return {
             'current': current_observed,
             'observed': observed_data[-24:] if len(observed_data) >= 24 else observed_data,  # Last 24 observations
@@ -475,161 +640,23 @@ def fetch_noaa_stageflow_forecast():
         raise Exception(f"NOAA stageflow data processing failed: {e}")
 
 def interpolate_forecast_values(forecast_data, target_time):
-    """Interpolate stage and flow values for a specific time between forecast points."""
+    """Interpolate stage and flow values for a specific time between sorted forecast points."""
     try:
-        # Find the two points that bracket the target time
-        before_point = None
-        after_point = None
-        
-        target_timestamp = target_time.timestamp()
-        
-        for i, point in enumerate(forecast_data):
-            point_time = datetime.fromisoformat(point['validTime'].replace('Z', '+00:00')).timestamp()
-            
-            if point_time <= target_timestamp:
-                before_point = point
-            elif point_time > target_timestamp and after_point is None:
-                after_point = point
-                break
-        
-        # If we can't find suitable points, return None
-        if not before_point or not after_point:
-            # If target is before all points, use first point
-            if not before_point and after_point:
-                return {
-                    'stage': after_point.get('primary'),
-                    'flow': after_point.get('secondary')
-                }
-            # If target is after all points, use last point
-            elif before_point and not after_point:
-                return {
-                    'stage': before_point.get('primary'),
-                    'flow': before_point.get('secondary')
-                }
+        point_times = [to_epoch(point['validTime']) for point in forecast_data]
+        if not point_times:
             return None
-        
-        # Linear interpolation
-        before_timestamp = datetime.fromisoformat(before_point['validTime'].replace('Z', '+00:00')).timestamp()
-        after_timestamp = datetime.fromisoformat(after_point['validTime'].replace('Z', '+00:00')).timestamp()
-        
-        # Avoid division by zero
-        time_diff = after_timestamp - before_timestamp
-        if time_diff == 0:
-            return {
-                'stage': before_point.get('primary'),
-                'flow': before_point.get('secondary')
-            }
-        
-        # Calculate interpolation factor
-        factor = (target_timestamp - before_timestamp) / time_diff
-        
-        # Interpolate stage (primary)
-        before_stage = before_point.get('primary')
-        after_stage = after_point.get('primary')
-        interpolated_stage = None
-        if before_stage is not None and after_stage is not None:
-            interpolated_stage = before_stage + factor * (after_stage - before_stage)
-        
-        # Interpolate flow (secondary)
-        before_flow = before_point.get('secondary')
-        after_flow = after_point.get('secondary')
-        interpolated_flow = None
-        if before_flow is not None and after_flow is not None:
-            interpolated_flow = before_flow + factor * (after_flow - before_flow)
-        
+        interpolated = interpolate_series(point_times, {
+            'stage': [point.get('primary') for point in forecast_data],
+            'flow': [point.get('secondary') for point in forecast_data]
+        }, [target_time.timestamp()])
         return {
-            'stage': interpolated_stage,
-            'flow': interpolated_flow
+            'stage': interpolated['stage'][0],
+            'flow': interpolated['flow'][0]
         }
-        
     except Exception as e:
         logger.warning(f"Failed to interpolate forecast values: {e}")
         return None
 
 def fetch_extended_weather_forecast():
-    """Fetches extended weather forecast to match NOAA stageflow forecast duration."""
-    logger.info("FETCHER: Calling Open-Meteo API for extended forecast...")
-    lat, lon = 39.8682, -75.5916
-    
-    # Determine how many days we need based on NOAA forecast
-    # NOAA typically provides ~5-7 days, so we'll request 7 days to be safe
-    forecast_days = 7
-    
-    url = (
-        f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}"
-        "&current=temperature_2m,apparent_temperature,wind_speed_10m,"  
-        "wind_direction_10m,wind_gusts_10m,precipitation,uv_index,visibility"
-        "&hourly=temperature_2m,apparent_temperature,wind_speed_10m,"
-        "wind_direction_10m,wind_gusts_10m,precipitation,uv_index,visibility,precipitation_probability,lightning_potential"
-        "&windspeed_unit=mph&temperature_unit=fahrenheit"
-        f"&timezone=America/New_York&forecast_days={forecast_days}"
-    )
-    
-    try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Failed to fetch extended weather data: {e}")
-        raise Exception(f"Extended weather API request failed: {e}")
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse extended weather data JSON: {e}")
-        raise Exception(f"Extended weather API returned invalid JSON: {e}")
-    
-    # Fetch weather alerts from NWS API
-    alerts = fetch_weather_alerts(lat, lon)
-    
-    try:
-        # Current weather data
-        current = data.get("current", {})
-        deg = current.get('wind_direction_10m')
-        wind_dir = f"{deg_to_cardinal(deg)} ({fmt(deg, 0, '°')})" if deg is not None else "N/A"
-        current_weather = {
-            'windSpeed': current.get('wind_speed_10m'),
-            'windGust': current.get('wind_gusts_10m'),
-            'windDir': wind_dir,
-            'apparentTemp': current.get('apparent_temperature'),
-            'uvIndex': current.get('uv_index'),
-            'precipitation': current.get('precipitation'),
-            'currentTemp': current.get('temperature_2m'),
-            'visibility': current.get('visibility'),
-            'timestamp': current.get('time'),
-            'weatherAlerts': alerts
-        }
-        
-        # Extended hourly forecast data
-        hourly = data.get("hourly", {})
-        times = hourly.get('time', [])
-        forecast = []
-        
-        # Process all available forecast hours
-        for i in range(len(times)):
-            deg_forecast = hourly.get('wind_direction_10m', [])[i] if i < len(hourly.get('wind_direction_10m', [])) else None
-            wind_dir_forecast = f"{deg_to_cardinal(deg_forecast)} ({fmt(deg_forecast, 0, '°')})" if deg_forecast is not None else "N/A"
-            
-            forecast_hour = {
-                'timestamp': times[i],
-                'windSpeed': hourly.get('wind_speed_10m', [])[i] if i < len(hourly.get('wind_speed_10m', [])) else None,
-                'windGust': hourly.get('wind_gusts_10m', [])[i] if i < len(hourly.get('wind_gusts_10m', [])) else None,
-                'windDir': wind_dir_forecast,
-                'apparentTemp': hourly.get('apparent_temperature', [])[i] if i < len(hourly.get('apparent_temperature', [])) else None,
-                'uvIndex': hourly.get('uv_index', [])[i] if i < len(hourly.get('uv_index', [])) else None,
-                'precipitation': hourly.get('precipitation', [])[i] if i < len(hourly.get('precipitation', [])) else None,
-                'currentTemp': hourly.get('temperature_2m', [])[i] if i < len(hourly.get('temperature_2m', [])) else None,
-                'visibility': hourly.get('visibility', [])[i] if i < len(hourly.get('visibility', [])) else None,
-                'precipitationProbability': hourly.get('precipitation_probability', [])[i] if i < len(hourly.get('precipitation_probability', [])) else None,
-                'lightningPotential': hourly.get('lightning_potential', [])[i] if i < len(hourly.get('lightning_potential', [])) else None,
-                'weatherAlerts': alerts
-            }
-            forecast.append(forecast_hour)
-        
-        logger.info(f"Successfully fetched extended weather data with {len(forecast)} forecast hours and {len(alerts)} active alerts")
-        return {
-            'current': current_weather,
-            'forecast': forecast,
-            'alerts': alerts,
-            'forecastDays': forecast_days
-        }
-    except Exception as e:
-        logger.error(f"Failed to process extended weather data: {e}")
-        raise Exception(f"Extended weather data processing failed: {e}")
\ No newline at end of file
+    """Fetches extended weather forecast (7 days) to match NOAA stageflow forecast duration."""
+    return with_rows(fetch_open_meteo_bundle()['extended'])
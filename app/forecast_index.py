@@ -0,0 +1,80 @@
+# app/forecast_index.py
+from bisect import bisect_left
+from datetime import datetime
+
+from app.timeseries import LOCAL_TZ
+
+# Score arrays searched by time, finest resolution first, with their spacing in seconds
+HORIZONS = (
+    ('short_term_forecast', 900),
+    ('forecast_scores', 3600),
+    ('extended_forecast_scores', 3600),
+)
+
+
+def locate(documents, target):
+    """
+    Finds `target` (epoch seconds) in the finest horizon whose range, padded by half a
+    step, covers it; when none does, falls back to the nearest point of any horizon.
+
+    `documents` maps score key -> the scores' columns_document (or None), whose sorted
+    'times' are bisected directly. Returns (score_key, before, after, factor) with row
+    positions in that document: `after` is None for a single match, otherwise the target
+    lies `factor` of the way from `before` to `after`. Returns None if every document is
+    empty. Each horizon costs one bisection.
+    """
+    fallback = None
+    for score_key, step in HORIZONS:
+        document = documents.get(score_key)
+        if not document or not document['times']:
+            continue
+        times = document['times']
+        i = bisect_left(times, target)
+        if times[0] - step / 2 <= target <= times[-1] + step / 2:
+            if i < len(times) and times[i] == target:
+                return score_key, i, None, 0.0
+            if 0 < i < len(times):
+                factor = (target - times[i - 1]) / (times[i] - times[i - 1])
+                return score_key, i - 1, i, factor
+            edge = 0 if i == 0 else len(times) - 1
+            return score_key, edge, None, 0.0
+
+        edge = 0 if i == 0 else len(times) - 1
+        distance = abs(times[edge] - target)
+        if fallback is None or distance < fallback[0]:
+            fallback = (distance, score_key, edge)
+    if fallback is None:
+        return None
+    return fallback[1], fallback[2], None, 0.0
+
+
+def _lerp(lo, hi, factor):
+    if isinstance(lo, bool) or isinstance(hi, bool) or not isinstance(lo, (int, float)) or not isinstance(hi, (int, float)):
+        return lo if factor <= 0.5 else hi
+    return round(lo + factor * (hi - lo), 2)
+
+
+def nearest_entry(entries, before, after, factor):
+    """The entry nearest the located time (ties go to the earlier one)."""
+    return entries[before] if after is None or factor <= 0.5 else entries[after]
+
+
+def interpolate_entry(entries, before, after, factor, target):
+    """
+    Linearly interpolates the score and numeric conditions between two neighbouring
+    entries; other values come from the nearer one. A single match is returned as is.
+    """
+    if after is None:
+        return entries[before]
+    lo, hi = entries[before], entries[after]
+    nearer = nearest_entry(entries, before, after, factor)
+    conditions = {}
+    for name in set(lo.get('conditions') or {}) | set(hi.get('conditions') or {}):
+        conditions[name] = _lerp((lo.get('conditions') or {}).get(name), (hi.get('conditions') or {}).get(name), factor)
+    return {
+        **nearer,
+        'timestamp': datetime.fromtimestamp(target, LOCAL_TZ).strftime('%Y-%m-%dT%H:%M'),
+        'score': _lerp(lo.get('score'), hi.get('score'), factor),
+        'conditions': conditions,
+        'interpolated': True,
+    }
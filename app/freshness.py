@@ -0,0 +1,130 @@
+# app/freshness.py
+import logging
+import time
+from datetime import datetime
+
+import pytz
+
+from app.scoring import WEATHER_KEY, EXTENDED_WEATHER_KEY, SHORT_TERM_WEATHER_KEY, WATER_KEY, NOAA_STAGEFLOW_KEY, SCORE_KEYS, SCORE_INPUTS, COMPLETE_EXTENDED_KEY, COMPLETE_EXTENDED_INPUTS
+from app.events import SCORING_DEBOUNCE
+
+logger = logging.getLogger(__name__)
+
+# Documents built from other stored documents, with the keys they are built from
+DERIVED_INPUTS = {**SCORE_INPUTS, COMPLETE_EXTENDED_KEY: COMPLETE_EXTENDED_INPUTS}
+
+# Redis hash of data key -> epoch seconds it was last written
+UPDATED_AT_KEY = 'rowcast:updated_at'
+# Redis hash of fetched key -> epoch seconds its source last confirmed it unchanged (HTTP 304).
+# Kept apart from UPDATED_AT_KEY so derived documents built from the key are not outdated by it.
+CHECKED_AT_KEY = 'rowcast:checked_at'
+
+# Seconds each key stays fresh: its fetch job's interval (see start_scheduler). Scores
+# are rewritten after every update of their weather, so they follow its interval.
+MAX_AGE = {
+    WEATHER_KEY: 600,
+    EXTENDED_WEATHER_KEY: 600,
+    SHORT_TERM_WEATHER_KEY: 300,
+    WATER_KEY: 900,
+    NOAA_STAGEFLOW_KEY: 1800,
+    **{key: 600 for key in SCORE_KEYS},
+    'short_term_forecast': 300,
+}
+
+
+def mark_updated(redis_client, keys, at=None):
+    """Records `keys` as written at `at` (default now). Works on a pipeline too."""
+    at = time.time() if at is None else at
+    return redis_client.hset(UPDATED_AT_KEY, mapping={key: at for key in keys})
+
+
+def mark_checked(redis_client, keys, at=None):
+    """Records the stored `keys` as confirmed current by their source at `at` (default now)."""
+    at = time.time() if at is None else at
+    return redis_client.hset(CHECKED_AT_KEY, mapping={key: at for key in keys})
+
+
+def updated_at(redis_client):
+    """Returns {key: epoch seconds} for every key with a recorded write."""
+    return parse_stamps(redis_client.hgetall(UPDATED_AT_KEY))
+
+
+def checked_at(redis_client):
+    """Returns {key: epoch seconds} for every key its source last confirmed unchanged."""
+    return parse_stamps(redis_client.hgetall(CHECKED_AT_KEY))
+
+
+def parse_stamps(raw):
+    """Decodes the UPDATED_AT_KEY or CHECKED_AT_KEY hash as read from Redis."""
+    stamps = {}
+    for key, value in (raw or {}).items():
+        try:
+            stamps[key] = float(value)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring bad updated-at stamp for '{key}': {value!r}")
+    return stamps
+
+
+def is_fresh(stamps, keys, now=None, checked=None):
+    """True when every key in `keys` was written, or confirmed unchanged (`checked`), within its MAX_AGE."""
+    now = time.time() if now is None else now
+    checked = checked or {}
+    return all(key in stamps and now - max(stamps[key], checked.get(key, 0)) < MAX_AGE.get(key, 600) for key in keys)
+
+
+def freshness_report(stamps, keys=None, now=None):
+    """
+    Per-key staleness for API responses: when each key was written, how old it is and
+    whether it is past its MAX_AGE. Keys never written report updatedAt None and stale.
+    """
+    now = time.time() if now is None else now
+    report = {}
+    for key in keys or MAX_AGE:
+        stamp = stamps.get(key)
+        if stamp is None:
+            report[key] = {'updatedAt': None, 'ageSeconds': None, 'stale': True}
+            continue
+        age = max(now - stamp, 0)
+        report[key] = {
+            'updatedAt': datetime.fromtimestamp(stamp, pytz.utc).isoformat(),
+            'ageSeconds': round(age),
+            'stale': age >= MAX_AGE.get(key, 600),
+        }
+    return report
+
+
+def updated_report(stamps, keys=None):
+    """
+    When each key was written, without the ages and staleness of freshness_report, for
+    documents that are stored or cached and would carry them out of date.
+    """
+    return {key: {'updatedAt': report['updatedAt']} for key, report in freshness_report(stamps, keys).items()}
+
+
+def refresh_due(stamps, key, checked=None):
+    """
+    Epoch seconds by which `key` is expected to be rewritten, or None if it never was.
+    Fetched data is due one fetch interval after it was written or, if later, after its
+    source last confirmed it unchanged (`checked`). Derived documents (scores, the complete
+    snapshot) are due a debounce after the first of their inputs, or right away while a
+    rebuild for an input that was rewritten since is pending.
+    """
+    stamp = stamps.get(key)
+    if stamp is None:
+        return None
+    inputs = DERIVED_INPUTS.get(key)
+    if inputs is None:
+        return max(stamp, (checked or {}).get(key, stamp)) + MAX_AGE.get(key, 600)
+    due = [refresh_due(stamps, input_key, checked) for input_key in inputs]
+    if None in due or any(stamps[input_key] > stamp for input_key in inputs):
+        return stamp
+    return min(due) + SCORING_DEBOUNCE
+
+
+def seconds_until_refresh(stamps, keys, now=None, checked=None):
+    """Whole seconds until the first of `keys` is due to change (0 if unknown or overdue)."""
+    now = time.time() if now is None else now
+    due = [refresh_due(stamps, key, checked) for key in keys]
+    if not due or None in due:
+        return 0
+    return max(int(min(due) - now), 0)
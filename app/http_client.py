@@ -0,0 +1,180 @@
+# app/http_client.py
+
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class HTTPClient:
+    """
+    Shared HTTP client for every upstream fetcher.
+
+    Wraps a single requests.Session whose adapters keep a keep-alive pool per
+    host, so repeated calls to Open-Meteo, api.weather.gov, USGS and NOAA reuse
+    their TCP/TLS connections instead of paying a handshake on every job run.
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=4, connect_timeout=5.0,
+                 read_timeout=30.0, host_pool_sizes=None):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.default_timeout = (connect_timeout, read_timeout)
+        self._lock = threading.Lock()
+        self._host_stats = {}
+        # url -> {'etag': ..., 'last_modified': ...} from the last 200 response
+        self._validators = {}
+
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': 'RowCast API (rowcast-api)'})
+        self._default_adapter = self._make_adapter(pool_maxsize)
+        self.session.mount('https://', self._default_adapter)
+        self.session.mount('http://', self._default_adapter)
+
+        # Hosts that need a bigger (or smaller) pool get their own adapter
+        self._host_adapters = {}
+        for host, maxsize in (host_pool_sizes or {}).items():
+            adapter = self._make_adapter(maxsize)
+            self._host_adapters[host] = adapter
+            self.session.mount(f"https://{host}/", adapter)
+            self.session.mount(f"http://{host}/", adapter)
+
+    @classmethod
+    def from_env(cls):
+        """Build a client configured from ROWCAST_HTTP_* environment variables."""
+        host_pool_sizes = {}
+        # Format: "api.weather.gov=8,waterservices.usgs.gov=2"
+        for item in os.getenv('ROWCAST_HTTP_HOST_POOL_SIZES', '').split(','):
+            host, _, size = item.partition('=')
+            if host.strip() and size.strip().isdigit():
+                host_pool_sizes[host.strip()] = int(size)
+        return cls(
+            pool_connections=_env_int('ROWCAST_HTTP_POOL_CONNECTIONS', 10),
+            pool_maxsize=_env_int('ROWCAST_HTTP_POOL_MAXSIZE', 4),
+            connect_timeout=_env_float('ROWCAST_HTTP_CONNECT_TIMEOUT', 5.0),
+            read_timeout=_env_float('ROWCAST_HTTP_READ_TIMEOUT', 30.0),
+            host_pool_sizes=host_pool_sizes,
+        )
+
+    def _make_adapter(self, maxsize):
+        return HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=maxsize)
+
+    def request(self, method, url, timeout=None, **kwargs):
+        """Send a request through the pooled session and record per-host stats."""
+        host = urlsplit(url).netloc
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, url, timeout=timeout or self.default_timeout, **kwargs)
+        except requests.exceptions.RequestException:
+            self._record(host, time.perf_counter() - started, failed=True)
+            raise
+        self._record(host, time.perf_counter() - started, failed=False)
+        return response
+
+    def get(self, url, timeout=None, **kwargs):
+        return self.request('GET', url, timeout=timeout, **kwargs)
+
+    def get_conditional(self, url, use_validators=True, timeout=None, **kwargs):
+        """
+        GET `url`, sending If-None-Match / If-Modified-Since from the validators stored
+        for it. A 304 response means the body the caller stored last time is still
+        current; pass `use_validators=False` when the caller no longer has that body.
+
+        Validators of a 200 are not kept until the caller has parsed and stored the body
+        and calls remember_validators(), so a failure in between never turns into a 304
+        for data the caller does not have.
+        """
+        headers = dict(kwargs.pop('headers', None) or {})
+        with self._lock:
+            validators = self._validators.get(url) if use_validators else None
+        if validators:
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+
+        response = self.get(url, timeout=timeout, headers=headers, **kwargs)
+
+        if response.status_code == 304:
+            with self._lock:
+                self._host_stats[urlsplit(url).netloc]['notModified'] += 1
+        return response
+
+    def remember_validators(self, url, response):
+        """Keeps the ETag / Last-Modified of a processed 200 `response` for the next get_conditional."""
+        if not response.ok or response.status_code == 304:
+            return
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        with self._lock:
+            if etag or last_modified:
+                self._validators[url] = {'etag': etag, 'last_modified': last_modified}
+            else:
+                self._validators.pop(url, None)
+
+    def forget_validators(self, url):
+        with self._lock:
+            self._validators.pop(url, None)
+
+    def _record(self, host, elapsed, failed):
+        with self._lock:
+            stats = self._host_stats.setdefault(host, {'requests': 0, 'failures': 0, 'notModified': 0, 'totalSeconds': 0.0})
+            stats['requests'] += 1
+            stats['totalSeconds'] += elapsed
+            if failed:
+                stats['failures'] += 1
+
+    def _pool_counters(self):
+        """Read new-connection counts straight from the urllib3 pools, keyed by host."""
+        counters = {}
+        adapters = [self._default_adapter, *self._host_adapters.values()]
+        for adapter in adapters:
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                host = pool.host if pool.port in (None, 80, 443) else f"{pool.host}:{pool.port}"
+                entry = counters.setdefault(host, {'connections': 0, 'poolRequests': 0})
+                entry['connections'] += pool.num_connections
+                entry['poolRequests'] += pool.num_requests
+        return counters
+
+    def stats(self):
+        """Per-host request counts, latency and connection reuse."""
+        counters = self._pool_counters()
+        with self._lock:
+            snapshot = {host: dict(values) for host, values in self._host_stats.items()}
+        out = {}
+        for host, values in snapshot.items():
+            pool = counters.get(host, {'connections': 0, 'poolRequests': 0})
+            requests_made = values['requests']
+            out[host] = {
+                'requests': requests_made,
+                'failures': values['failures'],
+                'notModified': values['notModified'],
+                'avgLatencyMs': round(values['totalSeconds'] / requests_made * 1000, 2) if requests_made else None,
+                'newConnections': pool['connections'],
+                'reusedConnections': max(0, pool['poolRequests'] - pool['connections']),
+            }
+        return out
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,115 @@
+# app/leader.py
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+LEADER_KEY = os.getenv('ROWCAST_LEADER_KEY', 'rowcast:scheduler:leader')
+# Seconds a lease lasts without a heartbeat; standbys take over within about this long
+LEADER_TTL = float(os.getenv('ROWCAST_LEADER_TTL', 15))
+
+# Extend / delete the lease only while we still hold it (compare-and-set in one step)
+RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class LeaderLease:
+    """
+    Leader election on an expiring Redis key. Whoever sets the key (SET NX PX) is leader
+    and renews it every ttl/3 from a heartbeat thread; the others retry on the same beat
+    and take over once the key expires or is released.
+
+    `on_elected` and `on_demoted` run on the heartbeat thread and should return quickly.
+    """
+
+    def __init__(self, redis_client, key=LEADER_KEY, ttl=LEADER_TTL, identity=None,
+                 on_elected=None, on_demoted=None):
+        self.redis_client = redis_client
+        self.key = key
+        self.ttl = ttl
+        self.identity = identity or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.is_leader = False
+        # Monotonic time our lease is known to last until
+        self._valid_until = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def ttl_ms(self):
+        return int(self.ttl * 1000)
+
+    def tick(self):
+        """One heartbeat: renew the lease if we hold it, otherwise try to take it."""
+        started = time.monotonic()
+        try:
+            if self.is_leader:
+                held = bool(self.redis_client.eval(RENEW_SCRIPT, 1, self.key, self.identity, self.ttl_ms))
+            else:
+                held = bool(self.redis_client.set(self.key, self.identity, nx=True, px=self.ttl_ms))
+        except Exception as e:
+            # Without Redis we can't tell whether someone else took over, so keep leading
+            # only while the last lease we got is certain to be ours
+            logger.warning(f"Leader lease heartbeat failed: {e}")
+            if self.is_leader and time.monotonic() >= self._valid_until:
+                self._demote("lease could not be renewed before it expired")
+            return self.is_leader
+
+        if held:
+            self._valid_until = started + self.ttl
+            if not self.is_leader:
+                self._elect()
+        elif self.is_leader:
+            self._demote("lease was taken over")
+        return self.is_leader
+
+    def start(self):
+        """Makes a first attempt right away, then heartbeats every ttl/3."""
+        self._stop.clear()
+        self.tick()
+        self._thread = threading.Thread(target=self._run, name='rowcast-leader-lease', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the heartbeat and releases the lease so a standby can take over at once."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.ttl)
+            self._thread = None
+        if self.is_leader:
+            try:
+                self.redis_client.eval(RELEASE_SCRIPT, 1, self.key, self.identity)
+            except Exception as e:
+                logger.warning(f"Could not release leader lease: {e}")
+            self._demote("stopped")
+
+    def _run(self):
+        while not self._stop.wait(self.ttl / 3):
+            self.tick()
+
+    def _elect(self):
+        self.is_leader = True
+        print(f"SCHEDULER: {self.identity} elected leader.")
+        if self.on_elected:
+            self.on_elected()
+
+    def _demote(self, reason):
+        self.is_leader = False
+        print(f"SCHEDULER: {self.identity} is no longer leader ({reason}).")
+        if self.on_demoted:
+            self.on_demoted()
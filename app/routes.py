@@ -1,12 +1,24 @@
 # app/routes.py
 
-from flask import Blueprint, jsonify, request, render_template
+from flask import Blueprint, Response, jsonify, request, render_template, current_app, make_response
 import json
+import queue
+import time
+from functools import wraps
 from datetime import datetime, timedelta
 import pytz
 # Import the redis_client instance from the extensions file
-from app.extensions import redis_client
+from app.extensions import redis_client, redis_binary, document_cache, event_stream
+from app.events import STREAM_HEARTBEAT, STREAM_MAX_AGE
 from app.rowcast import compute_rowcast, merge_params
+from app.freshness import updated_at, freshness_report, updated_report, parse_stamps, seconds_until_refresh, UPDATED_AT_KEY, CHECKED_AT_KEY
+from app.bodies import accepted_encodings, body_key, SERVED_KEYS
+from app.cache import content_tag, ETAGS_KEY
+from app.scoring import COMPLETE_EXTENDED_KEY, COMPLETE_EXTENDED_INPUTS
+from app.snapshots import build_complete_extended
+from app.forecast_index import HORIZONS, locate, nearest_entry, interpolate_entry
+from app.columnar import COLUMN_SOURCES, columns_key, as_columns, as_rows, source_rows, select, rows_at
+from app.timeseries import to_epoch
 
 # EST timezone
 EST = pytz.timezone('America/New_York')
@@ -15,39 +27,190 @@ EST = pytz.timezone('America/New_York')
 bp = Blueprint("api", __name__)
 
 def get_data_from_redis(key):
-    """Helper function to get and decode data from Redis."""
-    data_str = redis_client.get(key)
-    if data_str:
-        return json.loads(data_str)
+    """Helper function to get and decode data from Redis (decoded once per write, see DocumentCache)."""
+    return document_cache.get(key)
+
+def get_many_from_redis(*keys):
+    """Like get_data_from_redis for several keys, with a single generation check."""
+    documents = document_cache.get_many(keys)
+    return [documents[key] for key in keys]
+
+def get_rows_from_redis(key):
+    """The rows of a score array, which the jobs store in column form (see app.columnar), or None."""
+    return as_rows(get_data_from_redis(key))
+
+EMPTY_BODIES = (b'[]', b'{}', b'null')
+
+def stored_body(key):
+    """
+    Response with the body the jobs stored for `key`, in the best encoding the client
+    accepts, or None when there is none (nothing stored yet, or stored empty).
+    """
+    # Usually the first GET hits; the rest only run if a writer lacked that encoding
+    for encoding in accepted_encodings(request.accept_encodings):
+        if encoding == 'identity' and key not in SERVED_KEYS:
+            # Column-form documents are not stored ready to send
+            return None
+        body = redis_binary.get(body_key(key, encoding))
+        if body in EMPTY_BODIES:
+            # The identity body is the document itself; empty ones answer 404
+            return None
+        if body is not None:
+            response = Response(body, mimetype='application/json')
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+            response.vary.add('Accept-Encoding')
+            return response
     return None
 
-def find_forecast_by_time(forecast_data, target_time):
-    """Helper function to find forecast data for a specific time."""
-    if not forecast_data:
-        return None
-    
-    target_dt = datetime.fromisoformat(target_time.replace('Z', '+00:00'))
-    
-    closest_forecast = None
-    min_diff = float('inf')
-    
-    for forecast in forecast_data:
-        forecast_dt = datetime.fromisoformat(forecast['timestamp'].replace('Z', '+00:00'))
-        diff = abs((target_dt - forecast_dt).total_seconds())
-        if diff < min_diff:
-            min_diff = diff
-            closest_forecast = forecast
-    
-    return closest_forecast
+def conditional(*keys):
+    """
+    Decorator for routes whose response depends only on the stored documents `keys`.
+    Tags 200 responses with a weak ETag of those documents and answers a matching
+    If-None-Match with a bodiless 304; both carry a Cache-Control max-age running until
+    the first of the documents is due to be rewritten (see freshness.refresh_due).
+    Responses to a window relative to now (?from=6h) change with the clock rather than
+    the documents, so they get neither and must revalidate.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if relative_window():
+                response = make_response(view(*args, **kwargs))
+                response.cache_control.no_cache = True
+                return response
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.hmget(ETAGS_KEY, keys)
+            pipe.hgetall(UPDATED_AT_KEY)
+            pipe.hgetall(CHECKED_AT_KEY)
+            tags, stamps, checked = pipe.execute()
+            etag = None
+            if None not in tags:
+                etag = tags[0] if len(tags) == 1 else content_tag('|'.join(tags))
+
+            if etag is not None and request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or etag is None:
+                    return response
+            response.set_etag(etag, weak=True)
+            max_age = seconds_until_refresh(parse_stamps(stamps), keys, checked=parse_stamps(checked))
+            if max_age > 0:
+                response.cache_control.public = True
+                response.cache_control.max_age = max_age
+            else:
+                response.cache_control.no_cache = True
+            # Same stored data, different bytes per encoding (see stored_body)
+            response.vary.add('Accept-Encoding')
+            return response
+        return wrapper
+    return decorator
+
+@bp.after_app_request
+def record_first_response(response):
+    """Logs how long after create_app() started the first successful response went out."""
+    config = current_app.config
+    if response.status_code == 200 and 'ROWCAST_STARTED_AT' in config and 'ROWCAST_FIRST_200_IN' not in config:
+        config['ROWCAST_FIRST_200_IN'] = round(time.monotonic() - config['ROWCAST_STARTED_AT'], 3)
+        print(f"STARTUP: First 200 response ({request.path}) {config['ROWCAST_FIRST_200_IN']:.2f}s after startup.")
+    return response
+
+def find_forecasts(targets, interpolate=False):
+    """
+    Forecast entries for each of `targets` (epoch seconds) from the finest score horizon
+    covering it, found by bisecting the times of the stored score columns, and optionally
+    interpolated between neighbours; only the rows found are rebuilt. Every target is
+    answered from one read of the scores. Returns None if no scores are stored.
+    """
+    keys = [key for key, _ in HORIZONS]
+    documents = document_cache.get_many(keys)
+    # Score arrays stored as rows before the column form are converted on read
+    columns = {key: as_columns(document) if document else None for key, document in documents.items()}
+    found = []
+    for target in targets:
+        match = locate(columns, target)
+        if match is None:
+            return None
+        score_key, before, after, factor = match
+        positions = [before] if after is None else [before, after]
+        entries = dict(zip(positions, rows_at(columns[score_key], positions)))
+        if interpolate:
+            found.append(interpolate_entry(entries, before, after, factor, target))
+        else:
+            found.append(nearest_entry(entries, before, after, factor))
+    return found
+
+def find_forecast(target, interpolate=False):
+    """Like find_forecasts for a single target; returns the entry or None."""
+    found = find_forecasts([target], interpolate)
+    return found[0] if found else None
+
+def wants_interpolation():
+    return request.args.get('interpolate', '').lower() in ('1', 'true', 'yes')
+
+DURATION_UNITS = {'m': 60, 'h': 3600, 'd': 86400}
+
+def parse_duration(text):
+    """Seconds in a duration like '30m', '2h' or '1d'; raises ValueError otherwise."""
+    if not text or text[-1] not in DURATION_UNITS:
+        raise ValueError(f"Invalid duration '{text}'. Use format like '2h', '30m', '1d'")
+    return int(text[:-1]) * DURATION_UNITS[text[-1]]
+
+def parse_time(text, now=None):
+    """Epoch seconds for an ISO-8601 timestamp (local unless it carries an offset) or an offset from now like '6h'."""
+    if text[-1:] in DURATION_UNITS:
+        return (time.time() if now is None else now) + parse_duration(text)
+    return to_epoch(text)
+
+def relative_window():
+    """Whether ?from= or ?to= is an offset from now like '6h' (see parse_time)."""
+    return any(request.args.get(arg, '')[-1:] in DURATION_UNITS for arg in ('from', 'to'))
+
+def wants_slice():
+    return any(arg in request.args for arg in ('fields', 'from', 'to', 'step'))
+
+def sliced_response(key, missing, default_fields=None, whole=False):
+    """
+    Forecast rows of `key` narrowed by the request's ?fields=, ?from=, ?to= and ?step=,
+    rebuilt from the column document the jobs store next to it. With `whole` the rows
+    replace the forecast inside the full document.
+    """
+    try:
+        fields = [field.strip() for field in request.args.get('fields', '').split(',') if field.strip()] or default_fields
+        start = parse_time(request.args['from']) if request.args.get('from') else None
+        end = parse_time(request.args['to']) if request.args.get('to') else None
+        step = parse_duration(request.args['step']) if request.args.get('step') else None
+    except ValueError as e:
+        return jsonify({"error": f"Invalid slice parameter: {str(e)}"}), 400
+
+    document, columns = get_many_from_redis(key, columns_key(key))
+    if document and not (isinstance(columns, dict) and 'times' in columns):
+        # Stored before column documents existed
+        columns = as_columns(source_rows(key, document))
+    if not document or not columns or not columns['times']:
+        return jsonify({"error": missing}), 404
+    try:
+        rows = select(columns, fields, start, end, step)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if whole:
+        return jsonify({**document, COLUMN_SOURCES[key]: rows})
+    return jsonify(rows)
 
 @bp.route("/api/weather")
+@conditional('weather_data')
 def weather():
+    response = stored_body('weather_data')
+    if response is not None:
+        return response
     data = get_data_from_redis('weather_data')
     if data:
         return jsonify(data)
     return jsonify({"error": "Weather data not available yet."}), 404
 
 @bp.route("/api/weather/current")
+@conditional('weather_data')
 def current_weather():
     data = get_data_from_redis('weather_data')
     if data and 'current' in data:
@@ -55,20 +218,28 @@ def current_weather():
     return jsonify({"error": "Current weather data not available yet."}), 404
 
 @bp.route("/api/weather/forecast")
+@conditional('weather_data')
 def weather_forecast():
+    if wants_slice():
+        return sliced_response('weather_data', "Weather forecast data not available yet.")
     data = get_data_from_redis('weather_data')
     if data and 'forecast' in data:
         return jsonify(data['forecast'])
     return jsonify({"error": "Weather forecast data not available yet."}), 404
 
 @bp.route("/api/water")
+@conditional('water_data')
 def water():
+    response = stored_body('water_data')
+    if response is not None:
+        return response
     data = get_data_from_redis('water_data')
     if data:
         return jsonify(data)
     return jsonify({"error": "Water data not available yet."}), 404
 
 @bp.route("/api/water/current")
+@conditional('water_data')
 def current_water():
     data = get_data_from_redis('water_data')
     if data and 'current' in data:
@@ -76,6 +247,7 @@ def current_water():
     return jsonify({"error": "Current water data not available yet."}), 404
 
 @bp.route("/api/water/predictions")
+@conditional('water_data')
 def water_predictions():
     data = get_data_from_redis('water_data')
     if data and 'predictions' in data:
@@ -83,10 +255,10 @@ def water_predictions():
     return jsonify({"error": "Water prediction data not available yet."}), 404
 
 @bp.route("/api/rowcast")
+@conditional('weather_data', 'water_data')
 def rowcast():
     # Always fetch the latest data from Redis
-    weather_data = get_data_from_redis('weather_data')
-    water_data = get_data_from_redis('water_data')
+    weather_data, water_data = get_many_from_redis('weather_data', 'water_data')
     
     if not weather_data or not water_data:
         return jsonify({"error": "Data not available yet, please try again shortly."}), 404
@@ -103,19 +275,23 @@ def rowcast():
     return jsonify({ "rowcastScore": score, "params": params })
 
 @bp.route("/api/rowcast/forecast")
+@conditional('forecast_scores')
 def rowcast_forecast():
-    forecast_scores = get_data_from_redis('forecast_scores')
+    if wants_slice():
+        return sliced_response('forecast_scores', "Forecast scores not available yet.")
+    response = stored_body('forecast_scores')
+    if response is not None:
+        return response
+    forecast_scores = get_rows_from_redis('forecast_scores')
     if forecast_scores:
         return jsonify(forecast_scores)
     return jsonify({"error": "Forecast scores not available yet."}), 404
 
 @bp.route("/api/rowcast/forecast/simple")
+@conditional('forecast_scores')
 def rowcast_forecast_simple():
     """Get simplified rowcast forecast with just timestamps and scores"""
-    simple_scores = get_data_from_redis('forecast_scores_simple')
-    if simple_scores:
-        return jsonify(simple_scores)
-    return jsonify({"error": "Simple forecast scores not available yet."}), 404
+    return sliced_response('forecast_scores', "Simple forecast scores not available yet.", default_fields=['score', 'noaaDataUsed'])
 
 @bp.route("/api/rowcast/forecast/<time_offset>")
 def rowcast_forecast_offset(time_offset):
@@ -123,58 +299,77 @@ def rowcast_forecast_offset(time_offset):
     try:
         # Parse time offset using EST timezone
         now_est = datetime.now(EST)
-        if time_offset.endswith('h'):
-            hours = int(time_offset[:-1])
-            target_time = now_est + timedelta(hours=hours)
-        elif time_offset.endswith('m'):
-            minutes = int(time_offset[:-1])
-            target_time = now_est + timedelta(minutes=minutes)
-        elif time_offset.endswith('d'):
-            days = int(time_offset[:-1])
-            target_time = now_est + timedelta(days=days)
-        else:
-            return jsonify({"error": "Invalid time format. Use format like '2h', '30m', '1d'"}), 400
-        
-        forecast_scores = get_data_from_redis('forecast_scores')
-        if not forecast_scores:
-            return jsonify({"error": "Forecast scores not available yet."}), 404
+        target_time = now_est + timedelta(seconds=parse_duration(time_offset))
         
-        # Find closest forecast to target time
-        closest_forecast = find_forecast_by_time(forecast_scores, target_time.isoformat())
+        # Closest forecast (15-minute, 24-hour or 7-day, whichever is finest there)
+        closest_forecast = find_forecast(target_time.timestamp(), wants_interpolation())
         
         if closest_forecast:
             return jsonify(closest_forecast)
         else:
-            return jsonify({"error": "No forecast data available for requested time"}), 404
+            return jsonify({"error": "Forecast scores not available yet."}), 404
             
     except ValueError:
         return jsonify({"error": "Invalid time format. Use format like '2h', '30m', '1d'"}), 400
 
 @bp.route("/api/rowcast/at/<timestamp>")
+@conditional('short_term_forecast', 'forecast_scores', 'extended_forecast_scores')
 def rowcast_at_time(timestamp):
-    """Get rowcast score for a specific timestamp"""
+    """Get rowcast score for a specific timestamp (local time unless it carries an offset)"""
     try:
-        forecast_scores = get_data_from_redis('forecast_scores')
-        if not forecast_scores:
-            return jsonify({"error": "Forecast scores not available yet."}), 404
-        
-        # Find closest forecast to specified timestamp
-        closest_forecast = find_forecast_by_time(forecast_scores, timestamp)
-        
-        if closest_forecast:
-            return jsonify(closest_forecast)
-        else:
-            return jsonify({"error": "No forecast data available for requested time"}), 404
-            
+        target = to_epoch(timestamp)
     except Exception as e:
         return jsonify({"error": f"Invalid timestamp format: {str(e)}"}), 400
+    
+    # Closest forecast (15-minute, 24-hour or 7-day, whichever is finest there)
+    closest_forecast = find_forecast(target, wants_interpolation())
+    
+    if closest_forecast:
+        return jsonify(closest_forecast)
+    else:
+        return jsonify({"error": "Forecast scores not available yet."}), 404
+
+MAX_BATCH_TIMES = 500
+
+@bp.route("/api/rowcast/at", methods=["POST"])
+def rowcast_at_times():
+    """
+    Get rowcast scores for a batch of times: {"times": [...], "conditions": false, "interpolate": false}.
+    Each time is a timestamp (as for /api/rowcast/at/<timestamp>) or an offset from now like '2h'.
+    """
+    body = request.get_json(silent=True)
+    times = body.get('times') if isinstance(body, dict) else None
+    if not isinstance(times, list) or not times:
+        return jsonify({"error": "Send a JSON object with a non-empty 'times' list."}), 400
+    if len(times) > MAX_BATCH_TIMES:
+        return jsonify({"error": f"At most {MAX_BATCH_TIMES} times per request."}), 400
+
+    # Offsets in one batch are all measured from the same moment
+    now = time.time()
+    targets, invalid = [], []
+    for text in times:
+        try:
+            targets.append(parse_time(text, now))
+        except (TypeError, ValueError):
+            invalid.append(text)
+    if invalid:
+        return jsonify({"error": "Invalid times. Use timestamps like '2025-07-01T16:00' or offsets like '2h'.", "invalid": invalid}), 400
+
+    found = find_forecasts(targets, bool(body.get('interpolate')) or wants_interpolation())
+    if found is None:
+        return jsonify({"error": "Forecast scores not available yet."}), 404
+    with_conditions = bool(body.get('conditions'))
+    return jsonify([
+        {'time': text, **(entry if with_conditions else {k: v for k, v in entry.items() if k != 'conditions'})}
+        for text, entry in zip(times, found)
+    ])
 
 @bp.route("/api/complete")
+@conditional('weather_data', 'water_data', 'forecast_scores')
 def complete_data():
     """Get all current data, forecasts, and scores in one response"""
-    weather_data = get_data_from_redis('weather_data')
-    water_data = get_data_from_redis('water_data')
-    forecast_scores = get_data_from_redis('forecast_scores')
+    weather_data, water_data, forecast_scores = get_many_from_redis('weather_data', 'water_data', 'forecast_scores')
+    forecast_scores = as_rows(forecast_scores)
     
     # Calculate current rowcast score
     current_score = None
@@ -195,36 +390,48 @@ def complete_data():
             "water": water_data.get('predictions') if water_data else None,
             "rowcastScores": forecast_scores
         },
-        "lastUpdated": datetime.now().isoformat()
+        # When each stored document was written; ages would be out of date in a cached copy
+        "dataFreshness": updated_report(updated_at(redis_client), ['weather_data', 'water_data', 'forecast_scores'])
     }
+    written = [entry['updatedAt'] for entry in response['dataFreshness'].values() if entry['updatedAt']]
+    response['updatedAt'] = max(written) if written else None
     
     return jsonify(response)
 
 @bp.route("/api/rowcast/forecast/short-term")
+@conditional('short_term_forecast')
 def rowcast_short_term_forecast():
     """Get 15-minute interval rowcast forecast for the next 3 hours"""
-    short_term_scores = get_data_from_redis('short_term_forecast')
+    if wants_slice():
+        return sliced_response('short_term_forecast', "Short-term forecast scores not available yet.")
+    response = stored_body('short_term_forecast')
+    if response is not None:
+        return response
+    short_term_scores = get_rows_from_redis('short_term_forecast')
     if short_term_scores:
         return jsonify(short_term_scores)
     return jsonify({"error": "Short-term forecast scores not available yet."}), 404
 
 @bp.route("/api/rowcast/forecast/short-term/simple")
+@conditional('short_term_forecast')
 def rowcast_short_term_forecast_simple():
     """Get simplified 15-minute interval rowcast forecast with just timestamps and scores"""
-    simple_short_term = get_data_from_redis('short_term_forecast_simple')
-    if simple_short_term:
-        return jsonify(simple_short_term)
-    return jsonify({"error": "Simple short-term forecast scores not available yet."}), 404
+    return sliced_response('short_term_forecast', "Simple short-term forecast scores not available yet.", default_fields=['score'])
 
 @bp.route("/api/noaa/stageflow")
+@conditional('noaa_stageflow_data')
 def noaa_stageflow():
     """Returns NOAA NWPS stageflow forecast data."""
+    response = stored_body('noaa_stageflow_data')
+    if response is not None:
+        return response
     data = get_data_from_redis('noaa_stageflow_data')
     if data:
         return jsonify(data)
     return jsonify({"error": "NOAA stageflow data not available yet."}), 404
 
 @bp.route("/api/noaa/stageflow/current")
+@conditional('noaa_stageflow_data')
 def noaa_stageflow_current():
     """Returns current observed NOAA stageflow data."""
     data = get_data_from_redis('noaa_stageflow_data')
@@ -233,121 +440,112 @@ def noaa_stageflow_current():
     return jsonify({"error": "Current NOAA stageflow data not available yet."}), 404
 
 @bp.route("/api/noaa/stageflow/forecast")
+@conditional('noaa_stageflow_data')
 def noaa_stageflow_forecast():
     """Returns NOAA stageflow forecast data only."""
+    if wants_slice():
+        return sliced_response('noaa_stageflow_data', "NOAA stageflow forecast data not available yet.")
     data = get_data_from_redis('noaa_stageflow_data')
     if data and data.get('forecast'):
         return jsonify(data['forecast'])
     return jsonify({"error": "NOAA stageflow forecast data not available yet."}), 404
 
 @bp.route("/api/weather/extended")
+@conditional('extended_weather_data')
 def weather_extended():
     """Returns extended weather forecast data (7 days)."""
+    if wants_slice():
+        return sliced_response('extended_weather_data', "Extended weather data not available yet.", whole=True)
+    response = stored_body('extended_weather_data')
+    if response is not None:
+        return response
     data = get_data_from_redis('extended_weather_data')
     if data:
         return jsonify(data)
     return jsonify({"error": "Extended weather data not available yet."}), 404
 
 @bp.route("/api/rowcast/forecast/extended")
+@conditional('extended_forecast_scores')
 def rowcast_forecast_extended():
     """Returns extended RowCast forecast scores (up to 7 days) using NOAA stageflow data."""
-    data = get_data_from_redis('extended_forecast_scores')
+    if wants_slice():
+        return sliced_response('extended_forecast_scores', "Extended forecast scores not available yet.")
+    response = stored_body('extended_forecast_scores')
+    if response is not None:
+        return response
+    data = get_rows_from_redis('extended_forecast_scores')
     if data:
         return jsonify(data)
     return jsonify({"error": "Extended forecast scores not available yet."}), 404
 
 @bp.route("/api/rowcast/forecast/extended/simple")
+@conditional('extended_forecast_scores')
 def rowcast_forecast_extended_simple():
     """Returns simplified extended RowCast forecast scores (timestamp and score only)."""
-    data = get_data_from_redis('extended_forecast_scores_simple')
-    if data:
-        return jsonify(data)
-    return jsonify({"error": "Extended forecast scores not available yet."}), 404
+    return sliced_response('extended_forecast_scores', "Extended forecast scores not available yet.", default_fields=['score', 'noaaDataUsed'])
 
 @bp.route("/api/complete/extended")
+@conditional(COMPLETE_EXTENDED_KEY)
 def complete_extended():
     """Returns all data including extended forecasts for comprehensive dashboard."""
+    # The worker rebuilds this document whenever one of its inputs changes
+    response = stored_body(COMPLETE_EXTENDED_KEY)
+    if response is not None:
+        return response
     try:
-        # Get all data sources
-        weather_data = get_data_from_redis('weather_data')
-        extended_weather_data = get_data_from_redis('extended_weather_data')
-        water_data = get_data_from_redis('water_data')
-        noaa_stageflow_data = get_data_from_redis('noaa_stageflow_data')
-        forecast_scores = get_data_from_redis('forecast_scores')
-        extended_forecast_scores = get_data_from_redis('extended_forecast_scores')
-        short_term_forecast = get_data_from_redis('short_term_forecast')
-        
-        response = {
-            'weather': {
-                'current': weather_data.get('current') if weather_data else None,
-                'forecast': weather_data.get('forecast') if weather_data else [],
-                'extended': extended_weather_data.get('forecast') if extended_weather_data else [],
-                'alerts': weather_data.get('alerts') if weather_data else []
-            },
-            'water': {
-                'current': water_data.get('current') if water_data else None,
-                'historical': water_data.get('historical') if water_data else {}
-            },
-            'noaa': {
-                'current': noaa_stageflow_data.get('current') if noaa_stageflow_data else None,
-                'observed': noaa_stageflow_data.get('observed') if noaa_stageflow_data else [],
-                'forecast': noaa_stageflow_data.get('forecast') if noaa_stageflow_data else [],
-                'metadata': noaa_stageflow_data.get('metadata') if noaa_stageflow_data else {}
-            },
-            'rowcast': {
-                'current': None,
-                'forecast': forecast_scores or [],
-                'extendedForecast': extended_forecast_scores or [],
-                'shortTerm': short_term_forecast or []
-            },
-            'metadata': {
-                'lastUpdated': datetime.now(EST).isoformat(),
-                'timezone': 'America/New_York',
-                'dataAvailability': {
-                    'weather': weather_data is not None,
-                    'extendedWeather': extended_weather_data is not None,
-                    'water': water_data is not None,
-                    'noaaStageflow': noaa_stageflow_data is not None,
-                    'forecast': forecast_scores is not None,
-                    'extendedForecast': extended_forecast_scores is not None,
-                    'shortTermForecast': short_term_forecast is not None
-                }
-            }
-        }
-        
-        # Calculate current rowcast if we have current data
-        if weather_data and weather_data.get('current'):
-            current_water = water_data.get('current') if water_data else {}
-            noaa_current = noaa_stageflow_data.get('current') if noaa_stageflow_data else {}
-            
-            # Use NOAA data if available, otherwise use current water data
-            current_params = {
-                'windSpeed': weather_data['current'].get('windSpeed'),
-                'windGust': weather_data['current'].get('windGust'),
-                'apparentTemp': weather_data['current'].get('apparentTemp'),
-                'uvIndex': weather_data['current'].get('uvIndex'),
-                'precipitation': weather_data['current'].get('precipitation'),
-                'discharge': noaa_current.get('discharge') or current_water.get('discharge'),
-                'waterTemp': current_water.get('waterTemp'),  # NOAA doesn't provide water temp
-                'gaugeHeight': noaa_current.get('gaugeHeight') or current_water.get('gaugeHeight'),
-                'weatherAlerts': weather_data['current'].get('weatherAlerts', []),
-                'visibility': weather_data['current'].get('visibility'),
-                'lightningPotential': 0,  # Not available in current weather
-                'precipitationProbability': 0  # Not available in current weather
-            }
-            
-            response['rowcast']['current'] = {
-                'score': compute_rowcast(current_params),
-                'conditions': current_params,
-                'timestamp': weather_data['current'].get('timestamp'),
-                'noaaDataUsed': noaa_current.get('discharge') is not None or noaa_current.get('gaugeHeight') is not None
-            }
-        
-        return jsonify(response)
-        
+        # No snapshot yet (first start): assemble it from the source documents
+        documents = document_cache.get_many(COMPLETE_EXTENDED_INPUTS)
+        return jsonify(build_complete_extended(documents, updated_at(redis_client)))
     except Exception as e:
         return jsonify({"error": f"Failed to compile extended data: {str(e)}"}), 500
 
+@bp.route("/api/status")
+def status():
+    """Returns how fresh each stored document is and this process's cold-start timing."""
+    freshness = freshness_report(updated_at(redis_client))
+    return jsonify({
+        'role': current_app.config.get('ROWCAST_ROLE'),
+        'stale': any(entry['stale'] for entry in freshness.values()),
+        'dataFreshness': freshness,
+        'startup': {
+            'readyInSeconds': current_app.config.get('ROWCAST_READY_IN'),
+            'firstResponseInSeconds': current_app.config.get('ROWCAST_FIRST_200_IN')
+        },
+        'checkedAt': datetime.now(EST).isoformat()
+    })
+
+@bp.route("/api/stream")
+def stream():
+    """
+    Server-Sent Events: one 'data_updated' event (with the Redis keys written) whenever a
+    job stores new data, so clients refetch only what changed instead of polling.
+    """
+    client = event_stream.connect()
+    if client is None:
+        return jsonify({"error": "Too many stream clients, poll the data endpoints instead."}), 503
+
+    def events():
+        try:
+            # EventSource reconnects after this many milliseconds, including after STREAM_MAX_AGE
+            yield "retry: 5000\n\n"
+            closes_at = time.monotonic() + STREAM_MAX_AGE
+            while time.monotonic() < closes_at:
+                try:
+                    message = client.get(timeout=STREAM_HEARTBEAT)
+                except queue.Empty:
+                    # Keeps proxies from timing out the connection and notices gone clients
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {message.get('event', 'message')}\ndata: {json.dumps(message)}\n\n"
+        finally:
+            event_stream.disconnect(client)
+
+    response = Response(events(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Tells nginx not to buffer the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @bp.route("/")
 @bp.route("/docs")
 @bp.route("/api")
@@ -387,7 +585,7 @@ def api_documentation():
             },
             "time_based_queries": {
                 "/api/rowcast/forecast/<time_offset>": {
-                    "description": "Get forecast for specific time offset from now",
+                    "description": "Get forecast for specific time offset from now, from the 15-minute, 24-hour or 7-day forecast (finest available); add ?interpolate=true to interpolate between forecast points",
                     "examples": [
                         "/api/rowcast/forecast/2h - 2 hours from now",
                         "/api/rowcast/forecast/30m - 30 minutes from now", 
@@ -395,15 +593,23 @@ def api_documentation():
                     ]
                 },
                 "/api/rowcast/at/<timestamp>": {
-                    "description": "Get forecast for specific timestamp",
+                    "description": "Get forecast for specific timestamp, from the 15-minute, 24-hour or 7-day forecast (finest available); add ?interpolate=true to interpolate between forecast points",
                     "format": "YYYY-MM-DDTHH:MM",
                     "example": "/api/rowcast/at/2025-07-01T16:00"
+                },
+                "POST /api/rowcast/at": {
+                    "description": "Get scores for up to 500 timestamps and/or offsets in one request; set \"conditions\": true to include conditions",
+                    "example": {"times": ["2025-07-01T16:00", "2h"], "conditions": False, "interpolate": False}
                 }
             },
             "complete_data": {
                 "/api/complete": "All current data, forecasts, and scores in one response",
                 "/api/complete/extended": "All data including extended forecasts and NOAA stageflow for comprehensive dashboard"
             },
+            "status": {
+                "/api/status": "Age and staleness of every stored data source, plus startup timing",
+                "/api/stream": "Server-Sent Events: a 'data_updated' event listing the changed data keys whenever new data is stored"
+            },
             "dashboard": {
                 "/dashboard": "Visual dashboard showing all data in easy-to-read format",
                 "/data": "Alternative URL for the visual dashboard"
@@ -421,15 +627,20 @@ def api_documentation():
         "score_range": "0-10 (10 = perfect conditions, 0 = dangerous/unsuitable)",
         "data_updates": {
             "weather": "Every 10 minutes",
-            "extended_weather": "Every 60 minutes",
+            "extended_weather": "Every 10 minutes (shares the weather fetch)",
+            "short_term_weather": "Every 5 minutes (a small 15-minute-only request, plus every weather fetch)",
             "water": "Every 15 minutes", 
             "noaa_stageflow": "Every 30 minutes",
-            "forecasts": "Every 10 minutes",
-            "extended_forecasts": "Every 30 minutes"
+            "forecasts": "Recomputed a few seconds after weather, water or NOAA data changes",
+            "extended_forecasts": "Recomputed a few seconds after weather, water or NOAA data changes",
+            "short_term_forecasts": "Recomputed a few seconds after weather or water data changes",
+            "complete_extended": "Rebuilt as one document right after any of its sources or scores change",
+            "startup": "Serves the last stored data immediately; sources older than their update interval are refreshed in the background (see /api/status)"
         },
         "response_formats": {
             "detailed": "Includes all conditions and parameters used in scoring",
-            "simple": "Timestamps and scores only for lightweight applications"
+            "simple": "Timestamps and scores only for lightweight applications",
+            "sliced": "Forecast routes (weather, rowcast and NOAA) accept ?fields=score,windSpeed (a group such as 'conditions' selects all its fields), ?from= and ?to= (ISO timestamps or offsets from now like '6h') and ?step= ('3h') to return only those columns, that window and at most one row per step"
         }
     }
     
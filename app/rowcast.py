@@ -1,6 +1,24 @@
 from math import exp
+
+import numpy as np
+
 from app.utils import clamp, fmt
 
+# Inputs the batch scorer reads, with the default compute_rowcast uses when a key is absent.
+# Fields defaulting to None are optional; the rest must be numeric.
+SCORE_FIELDS = {
+    'apparentTemp': None,
+    'windSpeed': 0,
+    'windGust': 0,
+    'discharge': 0,
+    'waterTemp': None,
+    'precipitation': 0,
+    'uvIndex': 0,
+    'visibility': None,
+    'lightningPotential': None,
+    'precipitationProbability': None,
+}
+
 
 def temp_score(temp):
     t = [74, 80, 85, 90, 95, 100, 105]
@@ -25,9 +43,8 @@ def exp_fall(val, lo, hi):
     return exp(-2.5 * (val - lo) / (hi - lo))
 
 
-def safety_alert_score(weather_alerts, visibility, lightning_potential, precip_prob):
-    """Calculate safety score based on dangerous weather conditions."""
-    # Start with perfect safety score
+def alert_multiplier(weather_alerts):
+    """Safety multiplier for a list of NWS alerts; 0 means an immediate danger alert is active."""
     safety_score = 1.0
     
     # Check for dangerous weather alerts
@@ -66,6 +83,16 @@ def safety_alert_score(weather_alerts, visibility, lightning_potential, precip_p
                 else:
                     safety_score *= 0.6  # Reduced score for minor high danger
     
+    return safety_score
+
+
+def safety_alert_score(weather_alerts, visibility, lightning_potential, precip_prob):
+    """Calculate safety score based on dangerous weather conditions."""
+    # Start from the weather alert multiplier (1.0 when there are no alerts)
+    safety_score = alert_multiplier(weather_alerts)
+    if safety_score == 0:
+        return 0
+    
     # Visibility score - critical for safety on water
     if visibility is not None:
         if visibility < 0.25:  # Less than 1/4 mile - extremely dangerous
@@ -220,5 +247,128 @@ def compute_rowcast(params):
     return score
 
 
+def _score_column(columns, name, n):
+    """One input column as float64 with NaN for missing values."""
+    default = SCORE_FIELDS[name]
+    if name not in columns:
+        return np.full(n, np.nan if default is None else float(default))
+    values = columns[name]
+    if not isinstance(values, np.ndarray) and None in values:
+        if default is not None:
+            raise TypeError(f"compute_rowcast_batch: '{name}' is required but has missing values")
+        values = [np.nan if v is None else v for v in values]
+    column = np.asarray(values, dtype=np.float64)
+    if len(column) != n:
+        raise ValueError(f"compute_rowcast_batch: '{name}' has {len(column)} values, expected {n}")
+    if default is not None and np.isnan(column).any():
+        raise TypeError(f"compute_rowcast_batch: '{name}' is required but has missing values")
+    return column
+
+
+def _round_scores(raw_scores):
+    """clamp(round(x, 2), 0, 10) for every element, with Python's exact rounding."""
+    rounded = np.round(raw_scores, 2)
+    # np.round scales by 100 first, which can pick the other side of a near-.5 tie
+    scaled = raw_scores * 100
+    for i in np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6).tolist():
+        rounded[i] = round(float(raw_scores[i]), 2)
+    scores = rounded.tolist()
+    # clamp returns its int bounds when a score reaches them
+    for i in np.flatnonzero(rounded <= 0).tolist():
+        scores[i] = 0
+    for i in np.flatnonzero(rounded >= 10).tolist():
+        scores[i] = 10
+    return scores
+
+
+def compute_rowcast_batch(columns, weather_alerts=None):
+    """
+    Scores many sets of conditions at once; `columns` maps SCORE_FIELDS names to equal-length
+    sequences (None or NaN for missing values). `weather_alerts` is an optional sequence of
+    alert lists, one per row. Returns a list with exactly what compute_rowcast gives per row.
+    """
+    n = len(next(iter(columns.values()))) if columns else len(weather_alerts or [])
+    if n == 0:
+        return []
+    temp = _score_column(columns, 'apparentTemp', n)
+    wind_speed = _score_column(columns, 'windSpeed', n)
+    wind_gust = _score_column(columns, 'windGust', n)
+    flow = _score_column(columns, 'discharge', n)
+    water_temp = _score_column(columns, 'waterTemp', n)
+    prec = _score_column(columns, 'precipitation', n)
+    uv = _score_column(columns, 'uvIndex', n)
+    visibility = _score_column(columns, 'visibility', n)
+    lightning_potential = _score_column(columns, 'lightningPotential', n)
+    precip_prob = _score_column(columns, 'precipitationProbability', n)
+
+    # Each np.select mirrors an if/elif chain in compute_rowcast: the first true condition wins
+    tempSc = np.select(
+        [np.isnan(temp), (65 <= temp) & (temp <= 85), (55 <= temp) & (temp < 65), (85 < temp) & (temp <= 95), temp < 55],
+        [0.3, 1.0, 0.8 - (65 - temp) * 0.05, 0.9 - (temp - 85) * 0.08, np.maximum(0.1, 0.8 - (55 - temp) * 0.1)],
+        np.maximum(0.05, 0.1 - (temp - 95) * 0.02),
+    )
+
+    max_wind = np.maximum(wind_speed, wind_gust * 0.7)
+    windSc = np.select(
+        [max_wind <= 5, max_wind <= 10, max_wind <= 15, max_wind <= 25],
+        [1.0, 0.9, 0.6 - (max_wind - 10) * 0.06, 0.3 - (max_wind - 15) * 0.02],
+        np.maximum(0.01, 0.1 - (max_wind - 25) * 0.01),
+    )
+
+    # math.exp only on the decaying range so results match the scalar path bit for bit
+    decay = (8000 < flow) & (flow < 13000)
+    flow_decay = np.zeros(n)
+    flow_decay[decay] = [max(0.05, exp(x)) for x in (-3 * (flow[decay] - 8000) / 5000).tolist()]
+    flowSc = np.select(
+        [flow >= 13000, (2000 <= flow) & (flow <= 8000), decay, (1000 <= flow) & (flow < 2000), flow < 1000],
+        [0.0, 1.0, flow_decay, 0.7 + (flow - 1000) * 0.3 / 1000, np.maximum(0.1, flow / 1000 * 0.7)],
+        0.0,
+    )
+
+    waterTempSc = np.select(
+        [np.isnan(water_temp), water_temp >= 70, water_temp >= 60, water_temp >= 50, water_temp >= 40],
+        [0.5, 1.0, 0.9, 0.6, 0.3],
+        0.1,
+    )
+    precipSc = np.select([prec >= 5, prec >= 2, prec >= 0.5, prec >= 0.1], [0.05, 0.2, 0.5, 0.8], 1.0)
+    uvSc = np.select([uv <= 2, uv <= 5, uv <= 7, uv <= 10], [1.0, 0.95, 0.8, 0.5], 0.2)
+
+    # Alerts are usually one list shared by every row, so score each distinct list once
+    multipliers = {}
+    alert_factors = []
+    for alerts in (weather_alerts if weather_alerts is not None else [None] * n):
+        if id(alerts) not in multipliers:
+            multipliers[id(alerts)] = alert_multiplier(alerts)
+        alert_factors.append(multipliers[id(alerts)])
+    safetySc = np.asarray(alert_factors, dtype=np.float64)
+    # Comparisons with NaN are false, so missing safety inputs leave the score unchanged
+    safetySc = safetySc * np.select(
+        [visibility < 0.25, visibility < 0.5, visibility < 1.0, visibility < 2.0, visibility < 5.0],
+        [0.0, 0.05, 0.2, 0.5, 0.8], 1.0)
+    safetySc = safetySc * np.select(
+        [lightning_potential > 80, lightning_potential > 60, lightning_potential > 40, lightning_potential > 20, lightning_potential > 10],
+        [0.0, 0.02, 0.1, 0.4, 0.7], 1.0)
+    safetySc = safetySc * np.select(
+        [precip_prob > 90, precip_prob > 70, precip_prob > 50], [0.3, 0.5, 0.7], 1.0)
+
+    # Same factor order as compute_rowcast so floating-point rounding matches
+    product = tempSc * 0.8
+    for factor, weight in ((windSc, 1.0), (flowSc, 0.9), (precipSc, 0.8), (uvSc, 0.6), (waterTempSc, 0.7), (safetySc, 1.2)):
+        product = product * factor * weight
+    raw_scores = 10 * product / (0.8 + 1.0 + 0.9 + 0.8 + 0.6 + 0.7 + 1.2)
+
+    return _round_scores(raw_scores)
+
+
+def compute_rowcast_many(params_list):
+    """compute_rowcast over a list of parameter dicts, scored as one batch."""
+    columns = {
+        name: [params.get(name, default) for params in params_list]
+        for name, default in SCORE_FIELDS.items()
+    }
+    weather_alerts = [params.get('weatherAlerts', []) for params in params_list]
+    return compute_rowcast_batch(columns, weather_alerts)
+
+
 def merge_params(weather, water):
     return { **weather, **water }
\ No newline at end of file
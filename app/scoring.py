@@ -0,0 +1,151 @@
+# app/scoring.py
+import hashlib
+import json
+import logging
+
+import app.rowcast as rowcast
+from app.alerts import resolve_alerts
+from app.columnar import COLUMN_SOURCES, columns_key, as_columns, source_rows
+
+logger = logging.getLogger(__name__)
+
+# Redis keys the scoring jobs read
+WEATHER_KEY = 'weather_data'
+EXTENDED_WEATHER_KEY = 'extended_weather_data'
+SHORT_TERM_WEATHER_KEY = 'short_term_weather_data'
+WATER_KEY = 'water_data'
+NOAA_STAGEFLOW_KEY = 'noaa_stageflow_data'
+SCORING_INPUT_KEYS = (WEATHER_KEY, EXTENDED_WEATHER_KEY, SHORT_TERM_WEATHER_KEY, WATER_KEY, NOAA_STAGEFLOW_KEY)
+# Score arrays the jobs write, in column form with each row's input fingerprint
+SCORE_KEYS = ('forecast_scores', 'extended_forecast_scores', 'short_term_forecast')
+# The inputs each score array is computed from
+SCORE_INPUTS = {
+    'forecast_scores': (WEATHER_KEY, WATER_KEY, NOAA_STAGEFLOW_KEY),
+    'extended_forecast_scores': (EXTENDED_WEATHER_KEY, WATER_KEY, NOAA_STAGEFLOW_KEY),
+    'short_term_forecast': (SHORT_TERM_WEATHER_KEY, WATER_KEY),
+}
+# The /api/complete/extended document (app.snapshots), rebuilt whenever one of its inputs is rewritten
+COMPLETE_EXTENDED_KEY = 'complete_extended'
+COMPLETE_EXTENDED_INPUTS = (WEATHER_KEY, EXTENDED_WEATHER_KEY, WATER_KEY, NOAA_STAGEFLOW_KEY) + SCORE_KEYS
+# What each score row records under 'conditions', in order
+CONDITION_FIELDS = (
+    'windSpeed', 'windGust', 'apparentTemp', 'uvIndex', 'precipitation', 'discharge', 'waterTemp',
+    'gaugeHeight', 'weatherAlertIds', 'visibility', 'lightningPotential', 'precipitationProbability',
+)
+
+
+def _scorer_version():
+    # Any change to the scoring code invalidates every stored fingerprint
+    with open(rowcast.__file__, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=8).hexdigest()
+
+
+SCORER_VERSION = _scorer_version()
+# Everything the three scoring jobs read, for a shared snapshot: the inputs with their
+# column forms, and the previous scores
+ALL_SCORING_KEYS = (SCORING_INPUT_KEYS
+                    + tuple(columns_key(key) for key in SCORING_INPUT_KEYS if key in COLUMN_SOURCES)
+                    + SCORE_KEYS)
+
+
+class ScoringContext:
+    """
+    A snapshot of the scoring inputs, read from Redis with a single MGET and decoded once.
+
+    Jobs load one for just the keys they need, or share one when they run back to back
+    (see tasks.run_refresh_cycle) so every job scores against the same data.
+    """
+
+    def __init__(self, documents):
+        self.documents = documents
+
+    @classmethod
+    def load(cls, redis_client, keys=ALL_SCORING_KEYS):
+        keys = list(keys)
+        values = redis_client.mget(keys)
+        documents = {}
+        for key, value in zip(keys, values):
+            try:
+                documents[key] = json.loads(value) if value else None
+            except ValueError:
+                logger.warning(f"Ignoring undecodable JSON in Redis key '{key}'")
+                documents[key] = None
+        return cls(documents)
+
+    def get(self, key):
+        return self.documents.get(key)
+
+    def columns(self, key):
+        """
+        The forecast rows of `key` as a columns_document: the stored column form when it
+        was loaded, otherwise one built from the rows (stored before column documents).
+        """
+        stored = self.get(columns_key(key))
+        if isinstance(stored, dict) and 'times' in stored:
+            return stored
+        return as_columns(source_rows(key, self.get(key)))
+
+    @property
+    def weather(self):
+        return self.get(WEATHER_KEY)
+
+    @property
+    def extended_weather(self):
+        return self.get(EXTENDED_WEATHER_KEY)
+
+    @property
+    def short_term_weather(self):
+        return self.get(SHORT_TERM_WEATHER_KEY)
+
+    @property
+    def water(self):
+        return self.get(WATER_KEY)
+
+    @property
+    def noaa_stageflow(self):
+        return self.get(NOAA_STAGEFLOW_KEY)
+
+
+def fingerprint(conditions):
+    """Stable digest of one row's scoring inputs."""
+    return hashlib.blake2b(json.dumps(conditions, sort_keys=True).encode(), digest_size=8).hexdigest()
+
+
+def score_columns(timestamps, conditions, previous=None, alerts=None):
+    """
+    Scores forecast rows given as columns: `conditions` maps each input name to one value
+    per timestamp. Rows whose fingerprint matches the one `previous` (the last scores, as
+    stored) holds for the same timestamp keep their score; only the rest go through the
+    batch scorer. Conditions reference alerts by 'weatherAlertIds', looked up in the
+    `alerts` table for scoring (NWS issues a new ID for every alert update, so the IDs
+    fingerprint the alerts too).
+
+    Returns (scores, fingerprints, rescored, skipped), with one score and fingerprint per row.
+    """
+    previous_scores = {}
+    if previous and previous.get('scorer') == SCORER_VERSION:
+        previous_columns = previous['columns']
+        for timestamp, digest, score in zip(previous_columns['timestamp'], previous['fingerprints'], previous_columns['score']):
+            previous_scores[timestamp] = (digest, score)
+
+    names = list(conditions)
+    fingerprints = []
+    scores = [None] * len(timestamps)
+    stale = []
+    for i, (timestamp, values) in enumerate(zip(timestamps, zip(*conditions.values()))):
+        digest = fingerprint(dict(zip(names, values)))
+        fingerprints.append(digest)
+        previous_entry = previous_scores.get(timestamp)
+        if previous_entry is not None and previous_entry[0] == digest:
+            scores[i] = previous_entry[1]
+        else:
+            stale.append(i)
+
+    columns = {name: [conditions[name][i] for i in stale] for name in names if name in rowcast.SCORE_FIELDS}
+    alert_ids = conditions.get('weatherAlertIds')
+    resolved = {}
+    weather_alerts = [resolve_alerts(alert_ids[i] if alert_ids else None, alerts, resolved) for i in stale]
+    for i, score in zip(stale, rowcast.compute_rowcast_batch(columns, weather_alerts)):
+        scores[i] = score
+
+    return scores, fingerprints, len(stale), len(timestamps) - len(stale)
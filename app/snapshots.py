@@ -0,0 +1,99 @@
+# app/snapshots.py
+import time
+from datetime import datetime
+
+import pytz
+
+from app.columnar import as_rows
+from app.freshness import updated_report
+from app.rowcast import compute_rowcast
+from app.scoring import WEATHER_KEY, EXTENDED_WEATHER_KEY, WATER_KEY, NOAA_STAGEFLOW_KEY
+
+EST = pytz.timezone('America/New_York')
+
+
+def build_complete_extended(documents, stamps, now=None):
+    """
+    Assembles the /api/complete/extended response from the decoded input documents
+    ({key: document or None}) and their update stamps (freshness.updated_at).
+    """
+    now = time.time() if now is None else now
+    weather_data = documents.get(WEATHER_KEY)
+    extended_weather_data = documents.get(EXTENDED_WEATHER_KEY)
+    water_data = documents.get(WATER_KEY)
+    noaa_stageflow_data = documents.get(NOAA_STAGEFLOW_KEY)
+    # Score arrays are stored in column form
+    forecast_scores = as_rows(documents.get('forecast_scores'))
+    extended_forecast_scores = as_rows(documents.get('extended_forecast_scores'))
+    short_term_forecast = as_rows(documents.get('short_term_forecast'))
+
+    response = {
+        'weather': {
+            'current': weather_data.get('current') if weather_data else None,
+            'forecast': weather_data.get('forecast') if weather_data else [],
+            'extended': extended_weather_data.get('forecast') if extended_weather_data else [],
+            'alerts': weather_data.get('alerts') if weather_data else []
+        },
+        'water': {
+            'current': water_data.get('current') if water_data else None,
+            'historical': water_data.get('historical') if water_data else {}
+        },
+        'noaa': {
+            'current': noaa_stageflow_data.get('current') if noaa_stageflow_data else None,
+            'observed': noaa_stageflow_data.get('observed') if noaa_stageflow_data else [],
+            'forecast': noaa_stageflow_data.get('forecast') if noaa_stageflow_data else [],
+            'metadata': noaa_stageflow_data.get('metadata') if noaa_stageflow_data else {}
+        },
+        'rowcast': {
+            'current': None,
+            'forecast': forecast_scores or [],
+            'extendedForecast': extended_forecast_scores or [],
+            'shortTerm': short_term_forecast or []
+        },
+        'metadata': {
+            'lastUpdated': datetime.fromtimestamp(now, EST).isoformat(),
+            'timezone': 'America/New_York',
+            'dataAvailability': {
+                'weather': weather_data is not None,
+                'extendedWeather': extended_weather_data is not None,
+                'water': water_data is not None,
+                'noaaStageflow': noaa_stageflow_data is not None,
+                'forecast': forecast_scores is not None,
+                'extendedForecast': extended_forecast_scores is not None,
+                'shortTermForecast': short_term_forecast is not None
+            },
+            # Ages and staleness would be out of date as soon as the snapshot is stored,
+            # so it only records when each source was written
+            'dataFreshness': updated_report(stamps)
+        }
+    }
+    
+    # Calculate current rowcast if we have current data
+    if weather_data and weather_data.get('current'):
+        current_water = water_data.get('current') if water_data else {}
+        noaa_current = noaa_stageflow_data.get('current') if noaa_stageflow_data else {}
+        
+        # Use NOAA data if available, otherwise use current water data
+        current_params = {
+            'windSpeed': weather_data['current'].get('windSpeed'),
+            'windGust': weather_data['current'].get('windGust'),
+            'apparentTemp': weather_data['current'].get('apparentTemp'),
+            'uvIndex': weather_data['current'].get('uvIndex'),
+            'precipitation': weather_data['current'].get('precipitation'),
+            'discharge': noaa_current.get('discharge') or current_water.get('discharge'),
+            'waterTemp': current_water.get('waterTemp'),  # NOAA doesn't provide water temp
+            'gaugeHeight': noaa_current.get('gaugeHeight') or current_water.get('gaugeHeight'),
+            'weatherAlerts': weather_data['current'].get('weatherAlerts', []),
+            'visibility': weather_data['current'].get('visibility'),
+            'lightningPotential': 0,  # Not available in current weather
+            'precipitationProbability': 0  # Not available in current weather
+        }
+        
+        response['rowcast']['current'] = {
+            'score': compute_rowcast(current_params),
+            'conditions': current_params,
+            'timestamp': weather_data['current'].get('timestamp'),
+            'noaaDataUsed': noaa_current.get('discharge') is not None or noaa_current.get('gaugeHeight') is not None
+        }
+
+    return response
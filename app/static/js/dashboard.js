@@ -91,7 +91,8 @@ class RowCastDashboard {
     async loadCurrentData() {
         try {
             console.log('Loading current data from:', `${this.baseURL}/api/complete`);
-            const response = await fetch(`${this.baseURL}/api/complete`);
+            // Revalidate: these loads follow update events, which arrive before max-age runs out
+            const response = await fetch(`${this.baseURL}/api/complete`, { cache: 'no-cache' });
             if (!response.ok) throw new Error(`HTTP ${response.status}`);
             this.currentData = await response.json();
             console.log('Current data loaded:', this.currentData);
@@ -110,7 +111,7 @@ class RowCastDashboard {
         } else {
             // Fallback to separate API call
             try {
-                const response = await fetch(`${this.baseURL}/api/rowcast/forecast`);
+                const response = await fetch(`${this.baseURL}/api/rowcast/forecast`, { cache: 'no-cache' });
                 if (!response.ok) throw new Error(`HTTP ${response.status}`);
                 this.forecastData = await response.json();
                 console.log('Loaded forecast data from separate API:', this.forecastData);
@@ -123,7 +124,7 @@ class RowCastDashboard {
 
     async loadExtendedData() {
         try {
-            const response = await fetch(`${this.baseURL}/api/rowcast/forecast/extended`);
+            const response = await fetch(`${this.baseURL}/api/rowcast/forecast/extended`, { cache: 'no-cache' });
             if (!response.ok) throw new Error(`HTTP ${response.status}`);
             this.extendedData = await response.json();
         } catch (error) {
@@ -184,7 +185,11 @@ class RowCastDashboard {
         }
 
         // Update last updated time (convert to local timezone)
-        const lastUpdated = new Date(this.currentData.lastUpdated);
+        if (!this.currentData.updatedAt) {
+            document.getElementById('last-updated').textContent = '--';
+            return;
+        }
+        const lastUpdated = new Date(this.currentData.updatedAt);
         document.getElementById('last-updated').textContent = 
             lastUpdated.toLocaleTimeString('en-US', { 
                 timeZone: 'America/New_York', // EST/EDT timezone
@@ -997,10 +1002,79 @@ class RowCastDashboard {
     }
 
     startDataRefresh() {
+        // Refetch when the server announces new data; poll only without a stream
+        if (!window.EventSource) {
+            this.startPolling();
+            return;
+        }
+        this.pendingKeys = new Set();
+        this.stream = new EventSource(`${this.baseURL}/api/stream`);
+        this.stream.addEventListener('data_updated', (event) => {
+            const message = JSON.parse(event.data);
+            this.onDataUpdated(message.keys || []);
+        });
+        this.stream.onopen = () => {
+            // Updates may have been missed while reconnecting
+            if (this.streamOpened) {
+                this.onDataUpdated(['forecast_scores', 'extended_forecast_scores']);
+            }
+            this.streamOpened = true;
+            this.stopPolling();
+        };
+        this.stream.onerror = () => {
+            // The browser reconnects by itself unless the server refused the stream (e.g. 503)
+            if (this.stream.readyState === EventSource.CLOSED) {
+                this.startPolling();
+            }
+        };
+    }
+
+    startPolling() {
         // Refresh data every 5 minutes
-        setInterval(() => {
-            this.refreshData();
-        }, 5 * 60 * 1000);
+        if (!this.pollTimer) {
+            this.pollTimer = setInterval(() => {
+                this.refreshData();
+            }, 5 * 60 * 1000);
+        }
+    }
+
+    stopPolling() {
+        clearInterval(this.pollTimer);
+        this.pollTimer = null;
+    }
+
+    onDataUpdated(keys) {
+        // A fetch is followed by rescoring a few seconds later; refetch once for the burst
+        keys.forEach(key => this.pendingKeys.add(key));
+        clearTimeout(this.updateTimer);
+        this.updateTimer = setTimeout(() => this.applyUpdates(), 1000);
+    }
+
+    async applyUpdates() {
+        const keys = this.pendingKeys;
+        this.pendingKeys = new Set();
+        // What /api/complete and /api/rowcast/forecast/extended are built from
+        const completeKeys = ['weather_data', 'water_data', 'forecast_scores'];
+        const reloadCurrent = completeKeys.some(key => keys.has(key));
+        const reloadExtended = keys.has('extended_forecast_scores');
+        if (!reloadCurrent && !reloadExtended) return;
+
+        try {
+            if (reloadCurrent) {
+                await this.loadCurrentData();
+                this.forecastData = this.currentData?.forecast?.rowcastScores || [];
+            }
+            if (reloadExtended) {
+                await this.loadExtendedData();
+            }
+            this.updateDashboard();
+            this.updateForecastWidget();
+            this.updateDetailedForecast();
+            this.updateCurrentConditions();
+            this.initializeCharts();
+        } catch (error) {
+            console.error('Error applying data update:', error);
+        }
     }
 
     showLoading() {
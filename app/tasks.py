@@ -1,16 +1,33 @@
 # app/tasks.py
 import logging
 import json
-from datetime import datetime, timedelta
-from app.fetchers import fetch_weather_data, fetch_water_data_with_history, fetch_noaa_stageflow_forecast, fetch_extended_weather_forecast
-from app.rowcast import compute_rowcast, merge_params
-# Import the redis_client instance from the extensions file
-from app.extensions import redis_client
-
+import time
 from datetime import datetime
+from app.fanout import fan_out, CYCLE_DEADLINE
+from app.timeseries import to_epoch, nearest_join
+from app.fetchers import fetch_open_meteo_bundle, fetch_open_meteo_short_term, fetch_water_data_incremental, fetch_noaa_stageflow_forecast, NOAA_STAGEFLOW_URL
+from app.scoring import ScoringContext, score_columns, SCORER_VERSION, CONDITION_FIELDS, SCORE_KEYS, SCORE_INPUTS, COMPLETE_EXTENDED_KEY, COMPLETE_EXTENDED_INPUTS, WEATHER_KEY, EXTENDED_WEATHER_KEY, SHORT_TERM_WEATHER_KEY, WATER_KEY, NOAA_STAGEFLOW_KEY
+from app.freshness import mark_updated, mark_checked, updated_at, checked_at, is_fresh, UPDATED_AT_KEY, CHECKED_AT_KEY
+from app.cache import bump_generations, content_tag, ETAGS_KEY, GENERATIONS_KEY
+from app.bodies import SERVED_KEYS, COLUMN_SERVED_KEYS, store_bodies, body_key, serialize
+from app.columnar import COLUMN_SOURCES, columns_key, as_columns, row_document, source_rows, select
+from app.snapshots import build_complete_extended
+# Import the redis_client instance from the extensions file
+from app.extensions import redis_client, scheduler, event_bus, http_client
+from app.events import DATA_UPDATED, ScoringPipeline
 
 logger = logging.getLogger(__name__)
 
+# How far a NOAA stageflow point may be from a forecast hour and still be used for it
+NOAA_MATCH_TOLERANCE = 3600
+
+# Keys earlier versions stored that nothing reads any more: the simple score arrays (now
+# served from the column documents), and the column form, epoch index and fingerprints
+# once stored next to each score array (now all one document)
+RETIRED_KEYS = tuple(f'{key}{suffix}' for suffix in ('_simple', '_columns', '_index', '_fingerprints') for key in SCORE_KEYS)
+# Separate identity bodies, now that served documents are stored ready to send
+RETIRED_BODIES = tuple(f'{key}:body:identity' for key in SERVED_KEYS + COLUMN_SERVED_KEYS + RETIRED_KEYS)
+
 def extrapolate(historical_list, current_value, target_dt):
     """Extrapolate a value based on the last two historical points within 3 hours"""
     try:
@@ -40,212 +57,220 @@ def extrapolate(historical_list, current_value, target_dt):
         logging.exception("Error extrapolating data")
         raise
 
+def match_noaa_forecast(hour_times, noaa_stageflow):
+    """
+    Returns the NOAA stageflow forecast point nearest each of `hour_times` (epoch seconds),
+    or None where none is within NOAA_MATCH_TOLERANCE. NOAA's UTC times are compared as
+    epoch seconds too, so Open-Meteo's local times line up with them.
+    """
+    points = [point for point in (noaa_stageflow or {}).get('forecast', []) if point.get('timestamp')]
+    point_times = [to_epoch(point['timestamp']) for point in points]
+    matches = nearest_join(hour_times, point_times, NOAA_MATCH_TOLERANCE)
+    return [points[index] if index is not None else None for index in matches]
+
+def project_water(weather, water_data, noaa_stageflow):
+    """
+    Water conditions for each row of `weather` (a columns_document of forecast hours):
+    NOAA's discharge and gauge height where a stageflow point is near the hour, otherwise
+    extrapolated from the USGS history; water temperature is always extrapolated, as NOAA
+    does not forecast it. Returns ({'discharge', 'waterTemp', 'gaugeHeight'} columns, noaa_used).
+    """
+    current_water = (water_data or {}).get('current', {})
+    hist = (water_data or {}).get('historical', {})
+    water = {'discharge': [], 'waterTemp': [], 'gaugeHeight': []}
+    noaa_used = []
+    # Pair each hour with the nearest NOAA stageflow point in one merge join
+    for timestamp, noaa_data in zip(weather['columns']['timestamp'], match_noaa_forecast(weather['times'], noaa_stageflow)):
+        target_dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+        # Use NOAA data if available, otherwise fall back to extrapolation
+        if noaa_data:
+            water['discharge'].append(noaa_data.get('discharge'))
+            water['gaugeHeight'].append(noaa_data.get('gaugeHeight'))
+        else:
+            water['discharge'].append(extrapolate(hist.get('discharge', []), current_water.get('discharge'), target_dt))
+            water['gaugeHeight'].append(extrapolate(hist.get('gaugeHeight', []), current_water.get('gaugeHeight'), target_dt))
+        water['waterTemp'].append(extrapolate(hist.get('waterTemp', []), current_water.get('waterTemp'), target_dt))
+        noaa_used.append(noaa_data is not None)
+    return water, noaa_used
+
+def score_conditions(weather, water, defaults=None):
+    """
+    The scoring inputs for each row of `weather` (a columns_document) as columns in
+    CONDITION_FIELDS order: the water columns from `water`, the rest from the weather
+    columns, or `defaults` (None, and no alerts) where the weather has none.
+    """
+    n = len(weather['times'])
+    defaults = {'weatherAlertIds': [], **(defaults or {})}
+    conditions = {}
+    for name in CONDITION_FIELDS:
+        if name in water:
+            conditions[name] = water[name]
+        elif name in weather['columns']:
+            conditions[name] = weather['columns'][name]
+        else:
+            conditions[name] = [defaults.get(name) for _ in range(n)]
+    return conditions
+
+def score_document(weather, scores, fingerprints, conditions, extra=None):
+    """
+    The scores as stored: the columns_document of score rows (timestamp, score, conditions
+    and any `extra` columns), with each row's input fingerprint for the next run.
+    """
+    return {
+        'times': weather['times'],
+        'columns': {'timestamp': weather['columns']['timestamp'], 'score': scores, **conditions, **(extra or {})},
+        'groups': {name: 'conditions' for name in conditions},
+        'scorer': SCORER_VERSION,
+        'fingerprints': fingerprints,
+    }
+
+def score_forecast(score_key, weather, conditions, context, alerts=None, extra=None):
+    """
+    Scores `conditions` (see score_conditions) against the previous scores of `score_key`
+    in `context` and stores them. Returns the stored document and (rescored, skipped).
+    """
+    # Only rows whose inputs changed since the last run are scored again
+    scores, fingerprints, rescored, skipped = score_columns(
+        weather['columns']['timestamp'], conditions, context.columns(score_key), alerts=alerts)
+    document = score_document(weather, scores, fingerprints, conditions, extra)
+    store_documents({score_key: document})
+    event_bus.publish(DATA_UPDATED, keys=[score_key])
+    return document, rescored, skipped
+
+def store_documents(documents):
+    """
+    Writes each {key: document} as JSON in one transaction, stamping its update time and
+    bumping its cache generation so every web worker drops its decoded copy. Documents the
+    routes return whole also get their encoded response bodies (see app.bodies), forecast
+    documents their column form for sliced responses (see app.columnar), and every
+    document gets a content digest for the routes' ETags.
+
+    Forecast rows may be given as rows, ForecastColumns or a columns_document; the column
+    form is stored as is and row dicts are only built for the row document. Score arrays
+    are stored in column form only, with rows built just for their compressed bodies.
+    """
+    columns = {
+        columns_key(key): as_columns(source_rows(key, document))
+        for key, document in documents.items() if key in COLUMN_SOURCES
+    }
+    documents = {**{key: row_document(key, document) for key, document in documents.items()}, **columns}
+    pipe = redis_client.pipeline()
+    tags = {}
+    for key, document in documents.items():
+        # Served documents double as their identity response body
+        text = serialize(document).decode() if key in SERVED_KEYS else json.dumps(document, separators=(',', ':'))
+        pipe.set(key, text)
+        tags[key] = content_tag(text)
+        if key in SERVED_KEYS:
+            store_bodies(pipe, key, document)
+        elif key in COLUMN_SERVED_KEYS:
+            store_bodies(pipe, key, select(document))
+    pipe.hset(ETAGS_KEY, mapping=tags)
+    mark_updated(pipe, documents)
+    bump_generations(pipe, documents)
+    pipe.execute()
+
+def drop_retired_keys():
+    """Deletes RETIRED_KEYS with their bodies, tags and stamps, and the RETIRED_BODIES."""
+    pipe = redis_client.pipeline()
+    pipe.delete(*RETIRED_KEYS, *RETIRED_BODIES, *(body_key(key, encoding) for key in RETIRED_KEYS for encoding in ('br', 'gzip')))
+    for hash_key in (ETAGS_KEY, UPDATED_AT_KEY, CHECKED_AT_KEY, GENERATIONS_KEY):
+        pipe.hdel(hash_key, *RETIRED_KEYS)
+    pipe.execute()
+
 def update_weather_data_job():
-    """Fetches new weather data and stores it in Redis."""
+    """
+    Fetches current, 24-hour, 7-day and 15-minute weather in one Open-Meteo request
+    and stores each view in Redis.
+    """
     print("SCHEDULER JOB: Running weather data update...")
     try:
-        data = fetch_weather_data()
-        redis_client.set('weather_data', json.dumps(data))
-        print("SCHEDULER JOB: Weather data updated successfully.")
+        bundle = fetch_open_meteo_bundle()
+        store_documents({
+            WEATHER_KEY: bundle['weather'],
+            EXTENDED_WEATHER_KEY: bundle['extended'],
+            SHORT_TERM_WEATHER_KEY: bundle['shortTerm'],
+        })
+        event_bus.publish(DATA_UPDATED, keys=[WEATHER_KEY, EXTENDED_WEATHER_KEY, SHORT_TERM_WEATHER_KEY])
+        print(f"SCHEDULER JOB: Weather data updated successfully ({len(bundle['extended']['forecast'])} hours, {len(bundle['shortTerm']['forecast'])} 15-minute intervals).")
     except Exception as e:
         print(f"SCHEDULER JOB: Failed to update weather data. Error: {e}")
 
+def update_short_term_weather_job():
+    """Refreshes the 15-minute weather between weather updates, with a request for just that view."""
+    print("SCHEDULER JOB: Running short-term weather update...")
+    try:
+        short_term = fetch_open_meteo_short_term()
+        store_documents({SHORT_TERM_WEATHER_KEY: short_term})
+        event_bus.publish(DATA_UPDATED, keys=[SHORT_TERM_WEATHER_KEY])
+        print(f"SCHEDULER JOB: Short-term weather updated successfully ({len(short_term['forecast'])} 15-minute intervals).")
+    except Exception as e:
+        print(f"SCHEDULER JOB: Failed to update short-term weather. Error: {e}")
+
 def update_water_data_job():
-    """Fetches new water data with historical data and stores it in Redis."""
+    """Ingests new USGS samples into the per-series history buffers and stores the water data in Redis."""
     print("SCHEDULER JOB: Running water data update...")
     try:
-        data = fetch_water_data_with_history()
+        data = fetch_water_data_incremental()
         # Store only current and historical data; projections will be computed dynamically
         water_data = {
             'current': data['current'],
             'historical': data['historical']
         }
         
-        redis_client.set('water_data', json.dumps(water_data))
+        store_documents({WATER_KEY: water_data})
+        event_bus.publish(DATA_UPDATED, keys=[WATER_KEY])
         print("SCHEDULER JOB: Water data updated successfully.")
     except Exception as e:
         print(f"SCHEDULER JOB: Failed to update water data. Error: {e}")
 
-def update_forecast_scores_job():
+def update_forecast_scores_job(context=None):
     """Calculates rowcast scores for weather forecast periods, using NOAA data when available."""
     print("SCHEDULER JOB: Running forecast scores update...")
     try:
-        # Get weather and water data
-        weather_data_str = redis_client.get('weather_data')
-        water_data_str = redis_client.get('water_data')
-        noaa_stageflow_str = redis_client.get('noaa_stageflow_data')
+        # Get weather, water, NOAA data and the previous scores in one round trip
+        context = context or ScoringContext.load(redis_client, (WEATHER_KEY, columns_key(WEATHER_KEY), WATER_KEY, NOAA_STAGEFLOW_KEY, 'forecast_scores'))
+        weather_data = context.weather
+        water_data = context.water
         
-        if not weather_data_str or not water_data_str:
+        if not weather_data or not water_data:
             print("SCHEDULER JOB: Missing weather or water data for forecast calculation")
             return
-            
-        weather_data = json.loads(weather_data_str)
-        water_data = json.loads(water_data_str)
-        noaa_stageflow = json.loads(noaa_stageflow_str) if noaa_stageflow_str else None
         
-        # Create a lookup dictionary for NOAA stageflow forecast data by timestamp
-        # Handle timezone differences and find closest matches
-        noaa_forecast_lookup = {}
-        if noaa_stageflow and noaa_stageflow.get('forecast'):
-            for noaa_point in noaa_stageflow['forecast']:
-                timestamp = noaa_point.get('timestamp')
-                if timestamp:
-                    # Normalize timestamp format for matching
-                    try:
-                        # Parse NOAA timestamp (with Z timezone)
-                        noaa_dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                        # Create lookup key without timezone for matching
-                        lookup_key = noaa_dt.replace(tzinfo=None).isoformat()
-                        noaa_forecast_lookup[lookup_key] = noaa_point
-                    except Exception:
-                        # Fallback to direct timestamp matching
-                        noaa_forecast_lookup[timestamp] = noaa_point
+        weather = context.columns(WEATHER_KEY)
+        water, noaa_used = project_water(weather, water_data, context.noaa_stageflow)
+        document, rescored, skipped = score_forecast(
+            'forecast_scores', weather, score_conditions(weather, water), context,
+            alerts=weather_data.get('alerts'), extra={'noaaDataUsed': noaa_used})
         
-        forecast_scores = []
-        
-        # Calculate scores for each forecast hour
-        for forecast_hour in weather_data.get('forecast', []):
-            timestamp = forecast_hour.get('timestamp')
-            target_dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-            current_water = water_data.get('current', {})
-            hist = water_data.get('historical', {})
-            
-            # Try to get NOAA stageflow data for this timestamp
-            # Handle timezone differences in timestamp matching
-            noaa_data = None
-            try:
-                # Parse weather timestamp (no timezone)
-                weather_dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                if weather_dt.tzinfo:
-                    weather_dt = weather_dt.replace(tzinfo=None)
-                
-                # Try exact match first
-                lookup_key = weather_dt.isoformat()
-                noaa_data = noaa_forecast_lookup.get(lookup_key)
-                
-                # If no exact match, find closest timestamp within 1 hour
-                if not noaa_data:
-                    closest_diff = float('inf')
-                    for noaa_key, noaa_point in noaa_forecast_lookup.items():
-                        try:
-                            noaa_dt = datetime.fromisoformat(noaa_key)
-                            diff = abs((weather_dt - noaa_dt).total_seconds())
-                            if diff < closest_diff and diff <= 3600:  # Within 1 hour
-                                closest_diff = diff
-                                noaa_data = noaa_point
-                        except Exception:
-                            continue
-            except Exception:
-                # Fallback to direct lookup
-                noaa_data = noaa_forecast_lookup.get(timestamp)
-            
-            # Use NOAA data if available, otherwise fall back to extrapolation
-            if noaa_data:
-                discharge_pred = noaa_data.get('discharge')
-                gauge_pred = noaa_data.get('gaugeHeight')
-                # Water temp not available from NOAA, extrapolate
-                temp_pred = extrapolate(hist.get('waterTemp', []), current_water.get('waterTemp'), target_dt)
-                noaa_used = True
-            else:
-                # Extrapolate each water metric
-                discharge_pred = extrapolate(hist.get('discharge', []), current_water.get('discharge'), target_dt)
-                gauge_pred = extrapolate(hist.get('gaugeHeight', []), current_water.get('gaugeHeight'), target_dt)
-                temp_pred = extrapolate(hist.get('waterTemp', []), current_water.get('waterTemp'), target_dt)
-                noaa_used = False
-            
-            forecast_params = {
-                'windSpeed': forecast_hour.get('windSpeed'),
-                'windGust': forecast_hour.get('windGust'),
-                'apparentTemp': forecast_hour.get('apparentTemp'),
-                'uvIndex': forecast_hour.get('uvIndex'),
-                'precipitation': forecast_hour.get('precipitation'),
-                # Use NOAA data or dynamic projections for water
-                'discharge': discharge_pred,
-                'waterTemp': temp_pred,
-                'gaugeHeight': gauge_pred,
-                # Add safety parameters
-                'weatherAlerts': forecast_hour.get('weatherAlerts', []),
-                'visibility': forecast_hour.get('visibility'),
-                'lightningPotential': forecast_hour.get('lightningPotential'),
-                'precipitationProbability': forecast_hour.get('precipitationProbability')
-            }
-            
-            score = compute_rowcast(forecast_params)
-            
-            forecast_scores.append({
-                'timestamp': forecast_hour.get('timestamp'),
-                'score': score,
-                'conditions': forecast_params,
-                'noaaDataUsed': noaa_used
-            })
-        
-        # Create simplified scores array with just timestamps and scores
-        simple_scores = [
-            {
-                'timestamp': score['timestamp'],
-                'score': score['score'],
-                'noaaDataUsed': score.get('noaaDataUsed', False)
-            }
-            for score in forecast_scores
-        ]
-        
-        redis_client.set('forecast_scores', json.dumps(forecast_scores))
-        redis_client.set('forecast_scores_simple', json.dumps(simple_scores))
-        
-        noaa_count = sum(1 for score in forecast_scores if score.get('noaaDataUsed'))
-        print(f"SCHEDULER JOB: Forecast scores updated successfully with {len(forecast_scores)} hours ({noaa_count} using NOAA data).")
+        print(f"SCHEDULER JOB: Forecast scores updated successfully with {len(document['times'])} hours ({sum(noaa_used)} using NOAA data; rescored {rescored}, skipped {skipped} unchanged).")
+        return {'rescored': rescored, 'skipped': skipped}
         
     except Exception as e:
         print(f"SCHEDULER JOB: Failed to update forecast scores. Error: {e}")
 
-def update_short_term_forecast_job():
+def update_short_term_forecast_job(context=None):
     """Calculates rowcast scores for 15-minute intervals over the next 3 hours."""
     print("SCHEDULER JOB: Running short-term forecast scores update...")
     try:
-        from app.fetchers import fetch_short_term_forecast
-        
-        # Get 15-minute forecast data
-        short_term_data = fetch_short_term_forecast()
+        # 15-minute weather comes from the consolidated weather fetch
+        context = context or ScoringContext.load(redis_client, (SHORT_TERM_WEATHER_KEY, columns_key(SHORT_TERM_WEATHER_KEY), WATER_KEY, 'short_term_forecast'))
         
-        short_term_scores = []
-        
-        # Calculate scores for each 15-minute interval
-        for interval in short_term_data.get('forecast', []):
-            forecast_params = {
-                'windSpeed': interval.get('windSpeed'),
-                'windGust': interval.get('windGust'),
-                'apparentTemp': interval.get('apparentTemp'),
-                'uvIndex': interval.get('uvIndex', 0),  # Default to 0 for short-term
-                'precipitation': interval.get('precipitation'),
-                'discharge': interval.get('discharge'),
-                'waterTemp': interval.get('waterTemp'),
-                'gaugeHeight': interval.get('gaugeHeight'),
-                'weatherAlerts': interval.get('weatherAlerts', []),
-                'visibility': interval.get('visibility'),
-                'lightningPotential': interval.get('lightningPotential', 0),
-                'precipitationProbability': interval.get('precipitationProbability')
-            }
-            
-            score = compute_rowcast(forecast_params)
-            
-            short_term_scores.append({
-                'timestamp': interval.get('timestamp'),
-                'score': score,
-                'conditions': forecast_params
-            })
+        if not context.short_term_weather:
+            print("SCHEDULER JOB: Missing 15-minute weather data for short-term forecast calculation")
+            return
         
-        # Create simplified scores for short-term
-        simple_short_term = [
-            {
-                'timestamp': score['timestamp'],
-                'score': score['score']
-            }
-            for score in short_term_scores
-        ]
+        weather = context.columns(SHORT_TERM_WEATHER_KEY)
+        # Use current water values for the short-term forecast
+        current_water = (context.water or {}).get('current', {})
+        n = len(weather['times'])
+        water = {name: [current_water.get(name)] * n for name in ('discharge', 'waterTemp', 'gaugeHeight')}
+        # UV and lightning are not in the 15-minute data
+        conditions = score_conditions(weather, water, defaults={'uvIndex': 0, 'lightningPotential': 0})
+        document, rescored, skipped = score_forecast('short_term_forecast', weather, conditions, context)
         
-        redis_client.set('short_term_forecast', json.dumps(short_term_scores))
-        redis_client.set('short_term_forecast_simple', json.dumps(simple_short_term))
-        print(f"SCHEDULER JOB: Short-term forecast scores updated successfully with {len(short_term_scores)} intervals.")
+        print(f"SCHEDULER JOB: Short-term forecast scores updated successfully with {len(document['times'])} intervals (rescored {rescored}, skipped {skipped} unchanged).")
+        return {'rescored': rescored, 'skipped': skipped}
         
     except Exception as e:
         print(f"SCHEDULER JOB: Failed to update short-term forecast scores. Error: {e}")
@@ -254,159 +279,151 @@ def update_noaa_stageflow_job():
     """Fetches NOAA NWPS stageflow forecast data and stores it in Redis."""
     print("SCHEDULER JOB: Running NOAA stageflow data update...")
     try:
-        data = fetch_noaa_stageflow_forecast()
-        redis_client.set('noaa_stageflow_data', json.dumps(data))
+        # Only ask for a 304 while we still hold the previous forecast
+        conditional = bool(redis_client.exists(NOAA_STAGEFLOW_KEY))
+        data = fetch_noaa_stageflow_forecast(conditional=conditional)
+        if data is None:
+            print("SCHEDULER JOB: NOAA stageflow forecast unchanged (304 Not Modified); skipping parse, store and rescore.")
+            # What we hold is still current, but unchanged: nothing built from it is outdated
+            mark_checked(redis_client, [NOAA_STAGEFLOW_KEY])
+            return
+        try:
+            store_documents({NOAA_STAGEFLOW_KEY: data})
+        except Exception:
+            # Fetch the whole forecast next time rather than get a 304 for one we never stored
+            http_client.forget_validators(NOAA_STAGEFLOW_URL)
+            raise
+        event_bus.publish(DATA_UPDATED, keys=[NOAA_STAGEFLOW_KEY])
         print(f"SCHEDULER JOB: NOAA stageflow data updated successfully with {len(data.get('forecast', []))} forecast hours.")
     except Exception as e:
         print(f"SCHEDULER JOB: Failed to update NOAA stageflow data. Error: {e}")
 
 def update_extended_weather_data_job():
-    """Fetches extended weather forecast data (7 days) and stores it in Redis."""
-    print("SCHEDULER JOB: Running extended weather data update...")
-    try:
-        data = fetch_extended_weather_forecast()
-        redis_client.set('extended_weather_data', json.dumps(data))
-        print(f"SCHEDULER JOB: Extended weather data updated successfully with {len(data.get('forecast', []))} forecast hours.")
-    except Exception as e:
-        print(f"SCHEDULER JOB: Failed to update extended weather data. Error: {e}")
+    """
+    Refreshes extended weather forecast data (7 days). The extended view is sliced from
+    the same Open-Meteo payload as the current and short-term views, so this runs the
+    consolidated weather update.
+    """
+    update_weather_data_job()
 
-def update_extended_forecast_scores_job():
+def update_extended_forecast_scores_job(context=None):
     """Calculates rowcast scores for extended forecast periods using NOAA stageflow and extended weather data."""
     print("SCHEDULER JOB: Running extended forecast scores update...")
     try:
-        # Get extended weather and NOAA stageflow data
-        extended_weather_str = redis_client.get('extended_weather_data')
-        noaa_stageflow_str = redis_client.get('noaa_stageflow_data')
+        # Get extended weather, NOAA stageflow, water data and the previous scores in one round trip
+        context = context or ScoringContext.load(redis_client, (EXTENDED_WEATHER_KEY, columns_key(EXTENDED_WEATHER_KEY), NOAA_STAGEFLOW_KEY, WATER_KEY, 'extended_forecast_scores'))
+        extended_weather = context.extended_weather
         
-        if not extended_weather_str:
+        if not extended_weather:
             print("SCHEDULER JOB: Missing extended weather data for extended forecast calculation")
             return
-            
-        extended_weather = json.loads(extended_weather_str)
-        noaa_stageflow = json.loads(noaa_stageflow_str) if noaa_stageflow_str else None
         
-        # Create a lookup dictionary for NOAA stageflow forecast data by timestamp
-        # Handle timezone differences and find closest matches
-        noaa_forecast_lookup = {}
-        if noaa_stageflow and noaa_stageflow.get('forecast'):
-            for noaa_point in noaa_stageflow['forecast']:
-                timestamp = noaa_point.get('timestamp')
-                if timestamp:
-                    # Normalize timestamp format for matching
-                    try:
-                        # Parse NOAA timestamp (with Z timezone)
-                        noaa_dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                        # Create lookup key without timezone for matching
-                        lookup_key = noaa_dt.replace(tzinfo=None).isoformat()
-                        noaa_forecast_lookup[lookup_key] = noaa_point
-                    except Exception:
-                        # Fallback to direct timestamp matching
-                        noaa_forecast_lookup[timestamp] = noaa_point
+        weather = context.columns(EXTENDED_WEATHER_KEY)
+        # Without water data the water conditions are left empty
+        water, noaa_used = project_water(weather, context.water, context.noaa_stageflow)
+        document, rescored, skipped = score_forecast(
+            'extended_forecast_scores', weather, score_conditions(weather, water), context,
+            alerts=extended_weather.get('alerts'), extra={'noaaDataUsed': noaa_used})
         
-        extended_forecast_scores = []
-        
-        # Calculate scores for each extended forecast hour
-        for forecast_hour in extended_weather.get('forecast', []):
-            timestamp = forecast_hour.get('timestamp')
-            
-            # Try to get NOAA stageflow data for this timestamp
-            # Handle timezone differences in timestamp matching
-            noaa_data = None
-            try:
-                # Parse weather timestamp (no timezone)
-                weather_dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                if weather_dt.tzinfo:
-                    weather_dt = weather_dt.replace(tzinfo=None)
-                
-                # Try exact match first
-                lookup_key = weather_dt.isoformat()
-                noaa_data = noaa_forecast_lookup.get(lookup_key)
-                
-                # If no exact match, find closest timestamp within 1 hour
-                if not noaa_data:
-                    closest_diff = float('inf')
-                    for noaa_key, noaa_point in noaa_forecast_lookup.items():
-                        try:
-                            noaa_dt = datetime.fromisoformat(noaa_key)
-                            diff = abs((weather_dt - noaa_dt).total_seconds())
-                            if diff < closest_diff and diff <= 3600:  # Within 1 hour
-                                closest_diff = diff
-                                noaa_data = noaa_point
-                        except Exception:
-                            continue
-            except Exception:
-                # Fallback to direct lookup
-                noaa_data = noaa_forecast_lookup.get(timestamp)
-            
-            # Use NOAA data if available, otherwise fall back to extrapolation
-            if noaa_data:
-                discharge = noaa_data.get('discharge')
-                gauge_height = noaa_data.get('gaugeHeight')
-                water_temp = None  # NOAA doesn't provide water temp, we'll need to extrapolate
-                
-                # For water temp, extrapolate from current water data if available
-                water_data_str = redis_client.get('water_data')
-                if water_data_str:
-                    water_data = json.loads(water_data_str)
-                    target_dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                    current_water = water_data.get('current', {})
-                    hist = water_data.get('historical', {})
-                    water_temp = extrapolate(hist.get('waterTemp', []), current_water.get('waterTemp'), target_dt)
-            else:
-                # Fall back to extrapolation if no NOAA data
-                water_data_str = redis_client.get('water_data')
-                if water_data_str:
-                    water_data = json.loads(water_data_str)
-                    target_dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                    current_water = water_data.get('current', {})
-                    hist = water_data.get('historical', {})
-                    discharge = extrapolate(hist.get('discharge', []), current_water.get('discharge'), target_dt)
-                    gauge_height = extrapolate(hist.get('gaugeHeight', []), current_water.get('gaugeHeight'), target_dt)
-                    water_temp = extrapolate(hist.get('waterTemp', []), current_water.get('waterTemp'), target_dt)
-                else:
-                    discharge = None
-                    gauge_height = None
-                    water_temp = None
-            
-            forecast_params = {
-                'windSpeed': forecast_hour.get('windSpeed'),
-                'windGust': forecast_hour.get('windGust'),
-                'apparentTemp': forecast_hour.get('apparentTemp'),
-                'uvIndex': forecast_hour.get('uvIndex'),
-                'precipitation': forecast_hour.get('precipitation'),
-                'discharge': discharge,
-                'waterTemp': water_temp,
-                'gaugeHeight': gauge_height,
-                'weatherAlerts': forecast_hour.get('weatherAlerts', []),
-                'visibility': forecast_hour.get('visibility'),
-                'lightningPotential': forecast_hour.get('lightningPotential'),
-                'precipitationProbability': forecast_hour.get('precipitationProbability')
-            }
-            
-            score = compute_rowcast(forecast_params)
-            
-            extended_forecast_scores.append({
-                'timestamp': forecast_hour.get('timestamp'),
-                'score': score,
-                'conditions': forecast_params,
-                'noaaDataUsed': noaa_data is not None
-            })
-        
-        # Create simplified scores array with just timestamps and scores
-        simple_extended_scores = [
-            {
-                'timestamp': score['timestamp'],
-                'score': score['score'],
-                'noaaDataUsed': score.get('noaaDataUsed', False)
-            }
-            for score in extended_forecast_scores
-        ]
-        
-        redis_client.set('extended_forecast_scores', json.dumps(extended_forecast_scores))
-        redis_client.set('extended_forecast_scores_simple', json.dumps(simple_extended_scores))
-        
-        noaa_count = sum(1 for score in extended_forecast_scores if score.get('noaaDataUsed'))
-        print(f"SCHEDULER JOB: Extended forecast scores updated successfully with {len(extended_forecast_scores)} hours ({noaa_count} using NOAA data).")
+        print(f"SCHEDULER JOB: Extended forecast scores updated successfully with {len(document['times'])} hours ({sum(noaa_used)} using NOAA data; rescored {rescored}, skipped {skipped} unchanged).")
+        return {'rescored': rescored, 'skipped': skipped}
         
     except Exception as e:
         print(f"SCHEDULER JOB: Failed to update extended forecast scores. Error: {e}")
+
+
+def update_complete_snapshot_job():
+    """
+    Rebuilds the /api/complete/extended document from its seven inputs and stores it as one
+    key, so the route is a single read. It always reads its inputs itself: it runs after
+    the scoring jobs whose output it includes.
+    """
+    print("SCHEDULER JOB: Running complete snapshot update...")
+    try:
+        context = ScoringContext.load(redis_client, COMPLETE_EXTENDED_INPUTS)
+        snapshot = build_complete_extended(context.documents, updated_at(redis_client))
+        store_documents({COMPLETE_EXTENDED_KEY: snapshot})
+        event_bus.publish(DATA_UPDATED, keys=[COMPLETE_EXTENDED_KEY])
+        available = sum(snapshot['metadata']['dataAvailability'].values())
+        print(f"SCHEDULER JOB: Complete snapshot updated successfully ({available}/{len(COMPLETE_EXTENDED_INPUTS)} sources available).")
+    except Exception as e:
+        print(f"SCHEDULER JOB: Failed to update complete snapshot. Error: {e}")
+
+
+# Scoring jobs by scheduler id, with the Redis keys whose updates trigger them. The
+# snapshot comes last so a refresh cycle builds it after the scores it includes.
+SNAPSHOT_JOB = 'Update Complete Snapshot'
+SCORING_JOBS = {
+    'Update Forecast Scores': (update_forecast_scores_job, SCORE_INPUTS['forecast_scores']),
+    'Update Extended Forecast Scores': (update_extended_forecast_scores_job, SCORE_INPUTS['extended_forecast_scores']),
+    'Update Short-term Forecast': (update_short_term_forecast_job, SCORE_INPUTS['short_term_forecast']),
+    SNAPSHOT_JOB: (update_complete_snapshot_job, COMPLETE_EXTENDED_INPUTS),
+}
+scoring_pipeline = ScoringPipeline(scheduler, SCORING_JOBS)
+# The key each scoring job writes
+SCORING_OUTPUTS = {
+    'Update Forecast Scores': 'forecast_scores',
+    'Update Extended Forecast Scores': 'extended_forecast_scores',
+    'Update Short-term Forecast': 'short_term_forecast',
+    SNAPSHOT_JOB: COMPLETE_EXTENDED_KEY,
+}
+# Redis keys each fetch in the refresh cycle writes
+FETCH_SOURCES = {
+    'weather': (WEATHER_KEY, EXTENDED_WEATHER_KEY, SHORT_TERM_WEATHER_KEY),
+    'water': (WATER_KEY,),
+    'noaa_stageflow': (NOAA_STAGEFLOW_KEY,),
+}
+
+
+def outdated_scoring_jobs(stamps):
+    """Scoring jobs whose scores were never written or are older than one of their inputs."""
+    outdated = []
+    for job_id, (_, inputs) in SCORING_JOBS.items():
+        scored_at = stamps.get(SCORING_OUTPUTS[job_id])
+        if scored_at is None or any(stamps.get(key, 0) > scored_at for key in inputs):
+            outdated.append(job_id)
+    return outdated
+
+
+def run_refresh_cycle(skip_fresh=False):
+    """
+    Runs every fetch job concurrently under one deadline, then rescores whatever they updated.
+
+    With `skip_fresh` (the start-up warm-up) sources whose stored data is still within
+    its max age are not fetched again, and scores left behind by a previous run are
+    brought up to date as well.
+    """
+    print("SCHEDULER JOB: Running full refresh cycle...")
+    started = time.monotonic()
+    calls = {
+        'weather': update_weather_data_job,
+        'water': update_water_data_job,
+        'noaa_stageflow': update_noaa_stageflow_job,
+    }
+    if skip_fresh:
+        drop_retired_keys()
+        stamps, checked = updated_at(redis_client), checked_at(redis_client)
+        fresh = [name for name in calls if is_fresh(stamps, FETCH_SOURCES[name], checked=checked)]
+        calls = {name: call for name, call in calls.items() if name not in fresh}
+        if fresh:
+            print(f"SCHEDULER JOB: Skipping fresh sources: {', '.join(fresh)}.")
+    # The fetch jobs touch independent upstreams and Redis keys, so the cycle only
+    # waits as long as the slowest one. Anything past the deadline keeps running in
+    # the background and its update event schedules the rescore as usual.
+    with scoring_pipeline.hold() as triggered:
+        _, errors = fan_out(calls, deadline=CYCLE_DEADLINE)
+    fetched_in = time.monotonic() - started
+    if skip_fresh:
+        triggered.update(outdated_scoring_jobs(updated_at(redis_client)))
+    
+    # One snapshot of every scoring input for the jobs this cycle's updates triggered
+    context = ScoringContext.load(redis_client)
+    with scoring_pipeline.hold() as rescored:
+        scoring_pipeline.run_now(triggered - {SNAPSHOT_JOB}, context)
+    # The new scores trigger the complete snapshot too; build it once, right away
+    triggered.update(rescored)
+    if SNAPSHOT_JOB in triggered:
+        scoring_pipeline.run_now([SNAPSHOT_JOB])
+    
+    timed_out = ', '.join(sorted(errors)) or 'none'
+    print(f"SCHEDULER JOB: Refresh cycle finished in {time.monotonic() - started:.1f}s (fetches {fetched_in:.1f}s, rescored {len(triggered)} jobs, timed out: {timed_out}).")
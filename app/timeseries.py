@@ -0,0 +1,96 @@
+# app/timeseries.py
+
+from datetime import datetime, timezone
+
+import pytz
+
+# Open-Meteo is queried with timezone=America/New_York and returns naive local times
+LOCAL_TZ = pytz.timezone('America/New_York')
+
+
+def to_epoch(timestamp, naive_tz=LOCAL_TZ):
+    """
+    Parses an ISO-8601 timestamp into epoch seconds. Timestamps without a 'Z' or offset
+    suffix are read as local times in `naive_tz`.
+    """
+    dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    if dt.tzinfo is None:
+        dt = naive_tz.localize(dt)
+    return dt.timestamp()
+
+
+def epoch_to_iso_z(epoch):
+    """Formats epoch seconds as a UTC timestamp with a 'Z' suffix."""
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+def time_grid(start_epoch, end_epoch, step_seconds, align_seconds=3600):
+    """
+    Evenly spaced epochs from `start_epoch` (floored to a multiple of `align_seconds`)
+    up to and including `end_epoch`.
+    """
+    current = start_epoch - start_epoch % align_seconds
+    grid = []
+    while current <= end_epoch:
+        grid.append(current)
+        current += step_seconds
+    return grid
+
+
+def interpolate_series(point_times, columns, targets):
+    """
+    Linearly interpolates every series in `columns` at the sorted `targets` in one merge pass.
+
+    `point_times` are sorted epoch seconds and `columns` maps a name to values aligned with
+    them (None allowed). Targets before the first point take the first point's values and
+    targets after the last take the last point's; a value is None wherever either bracketing
+    point is None. Returns a dict of name -> list of values aligned with `targets`.
+    """
+    out = {name: [] for name in columns}
+    n = len(point_times)
+    if n == 0:
+        for values in out.values():
+            values.extend([None] * len(targets))
+        return out
+
+    after = 0
+    for target in targets:
+        # Advance to the first point strictly after the target
+        while after < n and point_times[after] <= target:
+            after += 1
+        before = after - 1
+
+        if before < 0 or after >= n:
+            # Outside the forecast range: hold the nearest end point
+            edge = after if before < 0 else before
+            for name, values in columns.items():
+                out[name].append(values[edge])
+            continue
+
+        factor = (target - point_times[before]) / (point_times[after] - point_times[before])
+        for name, values in columns.items():
+            lo, hi = values[before], values[after]
+            out[name].append(lo + factor * (hi - lo) if lo is not None and hi is not None else None)
+    return out
+
+
+def nearest_join(left_times, right_times, tolerance):
+    """
+    Matches each of the sorted `left_times` to the nearest of the sorted `right_times` in one
+    merge pass. Returns a list aligned with `left_times` holding an index into `right_times`,
+    or None where no point lies within `tolerance` seconds. Ties go to the earlier point.
+    """
+    matches = []
+    m = len(right_times)
+    before = 0
+    for target in left_times:
+        # Advance to the last point at or before the target
+        while before + 1 < m and right_times[before + 1] <= target:
+            before += 1
+        candidates = [k for k in (before, before + 1) if k < m]
+        nearest = min(candidates, key=lambda k: abs(target - right_times[k]), default=None)
+        if nearest is not None and abs(target - right_times[nearest]) <= tolerance:
+            matches.append(nearest)
+        else:
+            matches.append(None)
+    return matches
@@ -0,0 +1,298 @@
+# conftest.py - shared fixtures for the offline tests
+
+import fnmatch
+import queue
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+import app as app_package
+import app.routes as routes
+import app.tasks as tasks
+from app import create_app, leader
+from app.cache import DocumentCache
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the redis-py client (decode_responses=True)."""
+
+    def __init__(self):
+        self.store = {}
+        self.expiry = {}
+        self.published = []
+        self.pubsubs = []
+
+    def _alive(self, key):
+        expires_at = self.expiry.get(key)
+        if expires_at is not None and expires_at <= time.time():
+            self.store.pop(key, None)
+            self.expiry.pop(key, None)
+        return key in self.store
+
+    def get(self, key):
+        return self.store.get(key) if self._alive(key) else None
+
+    def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and self._alive(key):
+            return None
+        self.store[key] = value
+        self.expiry.pop(key, None)
+        if ex is not None:
+            self.expiry[key] = time.time() + ex
+        if px is not None:
+            self.expiry[key] = time.time() + px / 1000
+        return True
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def rpush(self, key, *values):
+        self._alive(key)
+        self.store.setdefault(key, []).extend(values)
+        return len(self.store[key])
+
+    def ltrim(self, key, start, end):
+        if self._alive(key):
+            items = self.store[key]
+            length = len(items)
+            start = max(start + length, 0) if start < 0 else start
+            end = end + length if end < 0 else min(end, length - 1)
+            self.store[key] = items[start:end + 1]
+        return True
+
+    def lrange(self, key, start, end):
+        if not self._alive(key):
+            return []
+        items = self.store[key]
+        end = len(items) if end == -1 else end + 1
+        return list(items[start:end])
+
+    def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                removed += 1
+            self.store.pop(key, None)
+            self.expiry.pop(key, None)
+        return removed
+
+    def exists(self, *keys):
+        return sum(1 for key in keys if self._alive(key))
+
+    def pttl(self, key):
+        if not self._alive(key):
+            return -2
+        expires_at = self.expiry.get(key)
+        return -1 if expires_at is None else int((expires_at - time.time()) * 1000)
+
+    def keys(self, pattern='*'):
+        return [key for key in list(self.store) if self._alive(key) and fnmatch.fnmatchcase(key, pattern)]
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        self._alive(key)
+        fields = dict(mapping or {})
+        if field is not None:
+            fields[field] = value
+        hash_ = self.store.setdefault(key, {})
+        added = sum(1 for name in fields if name not in hash_)
+        hash_.update({name: str(value) for name, value in fields.items()})
+        return added
+
+    def hdel(self, key, *fields):
+        hash_ = self.store[key] if self._alive(key) else {}
+        return sum(1 for field in fields if hash_.pop(field, None) is not None)
+
+    def hincrby(self, key, field, amount=1):
+        self._alive(key)
+        hash_ = self.store.setdefault(key, {})
+        hash_[field] = str(int(hash_.get(field, 0)) + amount)
+        return int(hash_[field])
+
+    def hmget(self, key, fields):
+        hash_ = self.store[key] if self._alive(key) else {}
+        return [hash_.get(field) for field in fields]
+
+    def hgetall(self, key):
+        return dict(self.store[key]) if self._alive(key) else {}
+
+    def ping(self):
+        return True
+
+    def pexpire(self, key, milliseconds):
+        if not self._alive(key):
+            return 0
+        self.expiry[key] = time.time() + int(milliseconds) / 1000
+        return 1
+
+    def eval(self, script, numkeys, *keys_and_args):
+        """Runs the app's Lua scripts through their Python equivalents in SCRIPTS."""
+        keys, args = list(keys_and_args[:numkeys]), list(keys_and_args[numkeys:])
+        if script not in SCRIPTS:
+            raise NotImplementedError("FakeRedis.eval: no Python equivalent registered for this script")
+        return SCRIPTS[script](self, keys, args)
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+        receivers = [pubsub for pubsub in self.pubsubs if channel in pubsub.channels]
+        for pubsub in receivers:
+            pubsub.messages.put({'type': 'message', 'channel': channel, 'data': message})
+        return len(receivers)
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return FakePubSub(self)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+def _renew_lease(client, keys, args):
+    return client.pexpire(keys[0], args[1]) if client.get(keys[0]) == args[0] else 0
+
+
+def _release_lease(client, keys, args):
+    return client.delete(keys[0]) if client.get(keys[0]) == args[0] else 0
+
+
+# Lua script text -> Python equivalent for FakeRedis.eval
+SCRIPTS = {
+    leader.RENEW_SCRIPT: _renew_lease,
+    leader.RELEASE_SCRIPT: _release_lease,
+}
+
+
+class FakePipeline:
+    """Queues calls and replays them against the FakeRedis on execute()."""
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        method = getattr(self.client, name)
+
+        def queue(*args, **kwargs):
+            self.calls.append((method, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        results = [method(*args, **kwargs) for method, args, kwargs in self.calls]
+        self.calls = []
+        return results
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakePubSub:
+    """Subscription side of FakeRedis.publish."""
+
+    def __init__(self, client):
+        self.client = client
+        self.channels = set()
+        self.messages = queue.Queue()
+
+    def subscribe(self, *channels):
+        self.channels.update(channels)
+        if self not in self.client.pubsubs:
+            self.client.pubsubs.append(self)
+
+    def get_message(self, timeout=0.0):
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        if self in self.client.pubsubs:
+            self.client.pubsubs.remove(self)
+
+
+class FakeScheduler:
+    """Records add_job calls by id, like APScheduler with replace_existing=True."""
+
+    def __init__(self):
+        self.jobs = {}
+        self.adds = 0
+
+    def add_job(self, id, func, **kwargs):
+        assert kwargs.get('replace_existing')
+        self.adds += 1
+        self.jobs[id] = (func, kwargs)
+
+    def fire(self):
+        jobs, self.jobs = self.jobs, {}
+        for func, kwargs in jobs.values():
+            func(*kwargs.get('args', []))
+
+
+class BinaryView:
+    """A FakeRedis seen through a decode_responses=False client, like extensions.redis_binary."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, key):
+        value = self.client.get(key)
+        return value.encode() if isinstance(value, str) else value
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def fake_redis_binary(fake_redis):
+    return BinaryView(fake_redis)
+
+
+@pytest.fixture(autouse=True)
+def offline_event_bus(monkeypatch):
+    """Keeps data_updated events published by the jobs away from a real Redis server."""
+    from app.extensions import event_bus
+    monkeypatch.setattr(event_bus, 'redis_client', FakeRedis())
+
+
+def horizon_scores(count, step_minutes, label, start=datetime(2025, 7, 1, 8)):
+    return [{
+        'timestamp': (start + timedelta(minutes=step_minutes * i)).strftime('%Y-%m-%dT%H:%M'),
+        'score': float(i),
+        'label': label,
+        'conditions': {'windSpeed': 2.0 * i, 'weatherAlerts': []},
+    } for i in range(count)]
+
+
+# Overlapping score documents for the time lookups: 15-minute, hourly and extended hourly
+HORIZON_SCORES = {
+    'short_term_forecast': horizon_scores(12 * 4, 15, 'short'),
+    'forecast_scores': horizon_scores(24, 60, 'hourly'),
+    'extended_forecast_scores': horizon_scores(168, 60, 'extended'),
+}
+
+
+@pytest.fixture
+def document_cache(fake_redis):
+    return DocumentCache(fake_redis)
+
+
+@pytest.fixture
+def app_redis(monkeypatch, fake_redis, fake_redis_binary, document_cache):
+    """Points the app, the routes and the jobs at the fake Redis."""
+    for module, name in [(app_package, 'redis_client'), (routes, 'redis_client'), (tasks, 'redis_client')]:
+        monkeypatch.setattr(module, name, fake_redis)
+    monkeypatch.setattr(routes, 'redis_binary', fake_redis_binary)
+    monkeypatch.setattr(routes, 'document_cache', document_cache)
+    return fake_redis
+
+
+@pytest.fixture
+def client(app_redis):
+    return create_app(role='web').test_client()
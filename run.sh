@@ -1,11 +1,19 @@
 #!/usr/bin/env bash
 # run.sh - start the API server
-# Preload the app so APScheduler runs in the master process
+# Fetching and scoring run in a separate worker process (worker.py), so the gunicorn
+# workers only read Redis and can scale across cores
+WEB_WORKERS="${ROWCAST_WEB_WORKERS:-$(nproc 2>/dev/null || echo 2)}"
+# Each /api/stream client holds a thread (at most ROWCAST_STREAM_MAX_CLIENTS per worker)
+WEB_THREADS="${ROWCAST_WEB_THREADS:-16}"
+
+python worker.py &
+WORKER_PID=$!
+trap 'kill "$WORKER_PID" 2>/dev/null; wait "$WORKER_PID" 2>/dev/null' EXIT INT TERM
+
 # Increase timeout to prevent worker startup timeouts
-exec gunicorn wsgi:app \
+ROWCAST_ROLE=web gunicorn wsgi:app \
   --bind 0.0.0.0:5000 \
-  --workers 1 \
-  --threads 4 \
+  --workers "$WEB_WORKERS" \
+  --threads "$WEB_THREADS" \
   --timeout 120 \
-  --preload \
   "$@"
@@ -8,33 +8,44 @@ mkdir -p logs
 TIMESTAMP=$(date +"%Y%m%d_%H%M%S")
 LOG_FILE="logs/rowcast_${TIMESTAMP}.log"
 PID_FILE="logs/rowcast.pid"
+WORKER_PID_FILE="logs/rowcast_worker.pid"
+# Web workers only read Redis; fetching and scoring run in one separate worker process
+WEB_WORKERS="${ROWCAST_WEB_WORKERS:-$(nproc 2>/dev/null || echo 2)}"
+# Each /api/stream client holds a thread (at most ROWCAST_STREAM_MAX_CLIENTS per worker)
+WEB_THREADS="${ROWCAST_WEB_THREADS:-16}"
 
 echo "Starting RowCast API server..."
 echo "Logs will be written to: $LOG_FILE"
 echo "PID file: $PID_FILE"
 
-# Stop any existing server
-if [ -f "$PID_FILE" ]; then
-    OLD_PID=$(cat "$PID_FILE")
-    if ps -p "$OLD_PID" > /dev/null 2>&1; then
-        echo "Stopping existing server (PID: $OLD_PID)..."
-        kill "$OLD_PID"
-        sleep 2
+# Stop any existing server and worker
+for FILE in "$PID_FILE" "$WORKER_PID_FILE"; do
+    if [ -f "$FILE" ]; then
+        OLD_PID=$(cat "$FILE")
+        if ps -p "$OLD_PID" > /dev/null 2>&1; then
+            echo "Stopping existing process (PID: $OLD_PID)..."
+            kill "$OLD_PID"
+            sleep 2
+        fi
+        rm -f "$FILE"
     fi
-    rm -f "$PID_FILE"
-fi
+done
 
 # Also kill any lingering gunicorn processes on our port
 pkill -f "gunicorn wsgi:app" 2>/dev/null || true
+pkill -f "python worker.py" 2>/dev/null || true
 sleep 1
 
-# Start server with nohup
-nohup gunicorn wsgi:app \
+# Start the scheduler worker (fetching and scoring) with nohup
+nohup python worker.py >> "$LOG_FILE" 2>&1 &
+echo $! > "$WORKER_PID_FILE"
+
+# Start the web-only server with nohup
+ROWCAST_ROLE=web nohup gunicorn wsgi:app \
   --bind 0.0.0.0:8000 \
-  --workers 1 \
-  --threads 4 \
+  --workers "$WEB_WORKERS" \
+  --threads "$WEB_THREADS" \
   --timeout 120 \
-  --preload \
   --access-logfile "$LOG_FILE" \
   --error-logfile "$LOG_FILE" \
   --log-level info \
@@ -44,14 +55,16 @@ nohup gunicorn wsgi:app \
 # Save PID
 echo $! > "$PID_FILE"
 PID=$(cat "$PID_FILE")
+WORKER_PID=$(cat "$WORKER_PID_FILE")
 
-echo "Server started with PID: $PID"
+echo "Server started with PID: $PID ($WEB_WORKERS web workers)"
+echo "Scheduler worker started with PID: $WORKER_PID"
 echo "To view logs: tail -f $LOG_FILE"
 echo "To stop server: ./stop_server.sh"
 
 # Wait a moment and check if server started successfully
 sleep 3
-if ps -p "$PID" > /dev/null 2>&1; then
+if ps -p "$PID" > /dev/null 2>&1 && ps -p "$WORKER_PID" > /dev/null 2>&1; then
     echo "✅ Server is running successfully!"
     echo "API available at: http://localhost:8000"
     echo "Documentation: http://localhost:8000/docs"
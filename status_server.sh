@@ -30,6 +30,13 @@ else
     echo "❌ Server is NOT RUNNING (no PID file)"
 fi
 
+WORKER_PID_FILE="logs/rowcast_worker.pid"
+if [ -f "$WORKER_PID_FILE" ] && ps -p "$(cat "$WORKER_PID_FILE")" > /dev/null 2>&1; then
+    echo "✅ Scheduler worker is RUNNING (PID: $(cat "$WORKER_PID_FILE"))"
+else
+    echo "❌ Scheduler worker is NOT RUNNING (scores and data will go stale)"
+fi
+
 echo ""
 echo "Available commands:"
 echo "  ./start_server.sh  - Start the server"
@@ -2,6 +2,24 @@
 # stop_server.sh - stop the RowCast API server
 
 PID_FILE="logs/rowcast.pid"
+WORKER_PID_FILE="logs/rowcast_worker.pid"
+
+# Stop the scheduler worker (fetching and scoring)
+if [ -f "$WORKER_PID_FILE" ]; then
+    WORKER_PID=$(cat "$WORKER_PID_FILE")
+    if ps -p "$WORKER_PID" > /dev/null 2>&1; then
+        echo "Stopping RowCast scheduler worker (PID: $WORKER_PID)..."
+        kill "$WORKER_PID"
+        for i in {1..10}; do
+            ps -p "$WORKER_PID" > /dev/null 2>&1 || break
+            sleep 1
+        done
+        kill -9 "$WORKER_PID" 2>/dev/null
+    fi
+    rm -f "$WORKER_PID_FILE"
+else
+    pkill -f "python worker.py" && echo "Killed remaining worker processes."
+fi
 
 if [ -f "$PID_FILE" ]; then
     PID=$(cat "$PID_FILE")
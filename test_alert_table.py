@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for the normalized alert table (app.alerts): weather documents store each active
+NWS alert once, keyed by ID, and forecast hours and scores reference the alerts in effect
+during them by 'weatherAlertIds'.
+"""
+
+import json
+import time
+
+import app.fetchers as fetchers
+import app.tasks as tasks
+from app.alerts import alert_table, attach_alert_ids, resolve_alerts
+from app.columnar import select
+from app.rowcast import compute_rowcast
+from app.scoring import score_columns
+from test_open_meteo_bundle import make_payload
+
+STORM = {
+    'id': 'urn:oid:2.49.0.1.840.0.storm', 'type': 'Severe Thunderstorm Warning', 'severity': 'Severe',
+    'urgency': 'Immediate', 'description': 'A severe thunderstorm is moving east. ' * 20,
+    'onset': '2025-07-01T14:00:00-04:00', 'expires': '2025-07-01T16:30:00-04:00',
+}
+HEAT = {
+    'id': 'urn:oid:2.49.0.1.840.0.heat', 'type': 'Heat Advisory', 'severity': 'Moderate',
+    'urgency': 'Expected', 'description': 'Heat index values up to 105. ' * 30,
+    'onset': None, 'expires': None,
+}
+
+
+def bundle(monkeypatch, alerts):
+    monkeypatch.setattr(fetchers, '_get_json', lambda url, **kwargs: make_payload())
+    monkeypatch.setattr(fetchers, 'fetch_weather_alerts', lambda lat, lon: alerts)
+    return fetchers.fetch_open_meteo_bundle()
+
+
+def test_table_is_keyed_by_id():
+    table = alert_table([STORM, {**HEAT, 'id': None}])
+    assert STORM['id'] in table
+    derived = [key for key in table if key != STORM['id']][0]
+    assert derived.startswith('alert-') and table[derived]['id'] == derived
+    assert alert_table(table) is table
+
+
+def test_hours_reference_the_alerts_in_effect():
+    rows = [{'timestamp': f'2025-07-01T{hour:02d}:00'} for hour in range(12, 18)]
+    attach_alert_ids(rows, alert_table([STORM, HEAT]), 3600)
+    ids = {row['timestamp'][11:13]: row['weatherAlertIds'] for row in rows}
+    # The storm runs 14:00-16:30: hours 14, 15 and 16 overlap it
+    assert ids['13'] == [HEAT['id']]
+    assert ids['14'] == ids['16'] == [STORM['id'], HEAT['id']]
+    assert ids['17'] == [HEAT['id']]
+
+
+def test_bundle_stores_each_alert_once(monkeypatch):
+    extended = bundle(monkeypatch, [STORM, HEAT])['extended']
+    rows = extended['forecast'].rows()
+
+    assert set(extended['alerts']) == {STORM['id'], HEAT['id']}
+    assert all('weatherAlerts' not in row for row in rows)
+    assert rows[14]['weatherAlertIds'] == [STORM['id'], HEAT['id']]
+    assert rows[20]['weatherAlertIds'] == [HEAT['id']]
+    # Current conditions keep the alert details the dashboard shows
+    assert [alert['type'] for alert in extended['current']['weatherAlerts']] == [STORM['type'], HEAT['type']]
+
+
+def test_scores_resolve_ids_per_hour():
+    table = alert_table([STORM, HEAT])
+    conditions = {'windSpeed': 4.0, 'windGust': 6.0, 'apparentTemp': 78.0, 'uvIndex': 3.0, 'precipitation': 0.0,
+                  'discharge': 3000, 'waterTemp': 72.0, 'gaugeHeight': 3.1, 'visibility': 10.0,
+                  'lightningPotential': 0, 'precipitationProbability': 10}
+    columns = {name: [value, value] for name, value in conditions.items()}
+    columns['weatherAlertIds'] = [[HEAT['id']], [STORM['id'], HEAT['id']]]
+
+    scores, _, _, _ = score_columns(['2025-07-01T13:00', '2025-07-01T14:00'], columns, alerts=table)
+
+    assert scores[0] == compute_rowcast({**conditions, 'weatherAlerts': [table[HEAT['id']]]}) > 0
+    assert scores[1] == 0
+
+
+def test_unknown_ids_resolve_to_nothing():
+    resolved = {}
+    assert resolve_alerts(['gone'], alert_table([HEAT]), resolved) == []
+    assert resolve_alerts([HEAT['id']], alert_table([HEAT]), resolved) is resolve_alerts([HEAT['id']], {}, resolved)
+
+
+def test_alert_events_shrink_the_stored_documents(monkeypatch):
+    extended = fetchers.with_rows(bundle(monkeypatch, [STORM, HEAT])['extended'])
+    # What every hour carried before: the full alert list
+    copied = {**extended, 'alerts': list(extended['alerts'].values()), 'forecast': [
+        {**{k: v for k, v in row.items() if k != 'weatherAlertIds'}, 'weatherAlerts': [STORM, HEAT]} for row in extended['forecast']]}
+
+    def encode(document, runs=20):
+        started = time.perf_counter()
+        for _ in range(runs):
+            text = json.dumps(document)
+        return len(text), (time.perf_counter() - started) / runs * 1000
+
+    (before, before_ms), (after, after_ms) = encode(copied), encode(extended)
+    print(f"\nextended weather during two alerts: {before / 1024:.0f} KB / {before_ms:.2f} ms -> {after / 1024:.0f} KB / {after_ms:.2f} ms")
+    assert after * 5 < before
+
+
+def test_scoring_jobs_pass_the_table(monkeypatch, fake_redis):
+    monkeypatch.setattr(tasks, 'redis_client', fake_redis)
+    tasks.store_documents({
+        'weather_data': bundle(monkeypatch, [STORM])['weather'],
+        'water_data': {'current': {'discharge': 3000, 'waterTemp': 72.0, 'gaugeHeight': 3.1}, 'historical': {}},
+    })
+
+    tasks.update_forecast_scores_job()
+
+    scores = select(json.loads(fake_redis.get('forecast_scores')))
+    in_storm = [entry for entry in scores if entry['conditions']['weatherAlertIds']]
+    assert [entry['timestamp'] for entry in in_storm] == ['2025-07-01T14:00', '2025-07-01T15:00', '2025-07-01T16:00']
+    assert all(entry['score'] == 0 for entry in in_storm)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for the process roles of create_app: web-only processes never start the scheduler,
+the worker runs the jobs without registering any routes, and a worker without the leader
+lease keeps its jobs paused.
+"""
+
+import time
+
+import pytest
+from apscheduler.schedulers.base import STATE_PAUSED, STATE_RUNNING
+
+import app as app_package
+import app.routes as routes
+import app.tasks as tasks
+from app import create_app, leader
+from app.extensions import scheduler
+
+
+@pytest.fixture
+def offline_app(monkeypatch, fake_redis):
+    refreshes = []
+    monkeypatch.setattr(app_package, 'redis_client', fake_redis)
+    monkeypatch.setattr(routes, 'redis_client', fake_redis)
+    monkeypatch.setattr(routes.document_cache, 'redis', fake_redis)
+    monkeypatch.setattr(tasks, 'run_refresh_cycle', lambda **kwargs: refreshes.append(kwargs))
+    yield refreshes
+    if scheduler.running:
+        scheduler.remove_all_jobs()
+        scheduler.shutdown(wait=False)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_web_role_serves_routes_without_a_scheduler(offline_app):
+    web = create_app(role='web')
+    assert not scheduler.running
+    assert offline_app == []
+    assert any(rule.rule == '/api/complete' for rule in web.url_map.iter_rules())
+
+
+def test_worker_role_runs_jobs_without_routes(offline_app, monkeypatch):
+    monkeypatch.setattr(app_package, 'LEADER_ELECTION', False)
+    worker = create_app(role='worker')
+    assert scheduler.running
+    assert wait_for(lambda: offline_app == [{'skip_fresh': True}])
+    assert {job.id for job in scheduler.get_jobs()} == {'Update Weather Data', 'Update Short-term Weather', 'Update Water Data', 'Update NOAA Stageflow Data'}
+    assert not any(rule.rule.startswith('/api') for rule in worker.url_map.iter_rules())
+
+
+def test_role_comes_from_the_environment(offline_app, monkeypatch):
+    monkeypatch.setenv('ROWCAST_ROLE', 'web')
+    assert create_app().config['ROWCAST_ROLE'] == 'web'
+    monkeypatch.setenv('ROWCAST_ROLE', 'sideways')
+    with pytest.raises(Exception, match='Unknown ROWCAST_ROLE'):
+        create_app()
+
+
+def test_worker_stands_by_while_another_process_leads(offline_app, fake_redis):
+    fake_redis.set(leader.LEADER_KEY, 'other-host:1:abcd', px=60000)
+    worker = create_app(role='worker')
+    lease = worker.extensions['rowcast_leader_lease']
+    try:
+        assert not lease.is_leader
+        assert scheduler.state == STATE_PAUSED
+        assert offline_app == []
+
+        # The leader goes away: the next heartbeat takes over and resumes the jobs
+        fake_redis.delete(leader.LEADER_KEY)
+        assert lease.tick()
+        assert scheduler.state == STATE_RUNNING
+        assert wait_for(lambda: offline_app == [{'skip_fresh': True}])
+    finally:
+        lease.stop()
+
+
+def test_startup_serves_stored_data_without_waiting_for_the_warm_up(offline_app, monkeypatch, fake_redis):
+    monkeypatch.setattr(app_package, 'LEADER_ELECTION', False)
+    # A warm-up stuck on a slow upstream must not hold up startup
+    monkeypatch.setattr(tasks, 'run_refresh_cycle', lambda **kwargs: time.sleep(2))
+    fake_redis.set('weather_data', '{"current": {"windSpeed": 4}, "forecast": []}')
+
+    started = time.monotonic()
+    app = create_app(role='all')
+    client = app.test_client()
+    response = client.get('/api/weather/current')
+    first_response_in = time.monotonic() - started
+
+    assert response.status_code == 200
+    assert first_response_in < 1
+    status = client.get('/api/status').get_json()
+    assert status['startup']['firstResponseInSeconds'] <= first_response_in
+    assert status['dataFreshness']['weather_data'] == {'updatedAt': None, 'ageSeconds': None, 'stale': True}
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Parity tests and micro-benchmark for the NumPy batch scorer (app.rowcast.compute_rowcast_batch)
+
+    python -m pytest -q test_batch_scorer.py   # identical results to compute_rowcast
+    python test_batch_scorer.py                # scalar loop vs batch on a multi-day grid
+"""
+
+import itertools
+import json
+import random
+import time
+
+import numpy as np
+import pytest
+
+from app.rowcast import SCORE_FIELDS, _round_scores, compute_rowcast, compute_rowcast_batch, compute_rowcast_many
+from app.utils import clamp
+
+# Values on, just inside and just outside every branch boundary in compute_rowcast
+BOUNDARIES = {
+    'apparentTemp': [None, -5, 54.99, 55, 60, 64.99, 65, 75, 85, 85.01, 90, 95, 95.01, 99.5, 120],
+    'windSpeed': [0, 5, 5.01, 10, 10.01, 12.5, 15, 15.01, 25, 25.01, 30, 40],
+    'windGust': [0, 7.2, 14.3, 21.5, 36, 50],
+    'discharge': [0, 142, 999, 1000, 1500, 1999.9, 2000, 5000, 8000, 8000.01, 9000, 10000, 12999.99, 13000, 20000],
+    'waterTemp': [None, 30, 39.99, 40, 49.99, 50, 59.99, 60, 69.99, 70, 80],
+    'precipitation': [0, 0.09, 0.1, 0.49, 0.5, 1.99, 2, 4.99, 5, 10],
+    'uvIndex': [0, 2, 2.01, 5, 5.01, 7, 7.01, 10, 10.01, 12],
+    'visibility': [None, 0.1, 0.25, 0.49, 0.5, 0.99, 1.0, 1.99, 2.0, 4.99, 5.0, 15],
+    'lightningPotential': [None, 0, 10, 10.1, 20, 20.1, 40, 40.1, 60, 60.1, 80, 80.1],
+    'precipitationProbability': [None, 0, 50, 51, 70, 71, 90, 91, 100],
+}
+
+ALERTS = [
+    [],
+    [{'type': 'Tornado Warning', 'severity': 'Extreme', 'urgency': 'Immediate'}],
+    [{'type': 'Flood Warning', 'severity': 'Moderate', 'urgency': 'Expected'}],
+    [{'type': 'Gale Warning', 'severity': 'Minor', 'urgency': 'Future'}],
+    [{'type': 'Small Craft Advisory', 'severity': 'Severe', 'urgency': 'Expected'}],
+    [{'type': 'Wind Advisory', 'severity': 'Moderate'}, {'type': 'Flood Watch', 'severity': 'Minor'}],
+    [{'type': 'Heat Advisory', 'severity': 'Moderate', 'urgency': 'Expected'}],
+]
+
+
+def neutral_params():
+    """Conditions that hit the 1.0 branch of every factor."""
+    return {
+        'apparentTemp': 75, 'windSpeed': 2, 'windGust': 3, 'discharge': 5000, 'waterTemp': 72,
+        'precipitation': 0, 'uvIndex': 1, 'visibility': 10, 'lightningPotential': 0,
+        'precipitationProbability': 0, 'weatherAlerts': [],
+    }
+
+
+def assert_parity(params_list):
+    expected = [compute_rowcast(params) for params in params_list]
+    actual = compute_rowcast_many(params_list)
+    # json.dumps also catches 0 vs 0.0 and last-digit rounding differences
+    assert json.dumps(actual) == json.dumps(expected)
+
+
+@pytest.mark.parametrize('field', list(BOUNDARIES))
+def test_every_branch_boundary_of_each_field(field):
+    params_list = []
+    for value in BOUNDARIES[field]:
+        params = neutral_params()
+        params[field] = value
+        params_list.append(params)
+    assert_parity(params_list)
+
+
+def test_alert_severities():
+    params_list = []
+    for alerts in ALERTS:
+        params = neutral_params()
+        params['weatherAlerts'] = alerts
+        params_list.append(params)
+    assert_parity(params_list)
+
+
+def test_random_combinations_of_boundaries():
+    rng = random.Random(9)
+    params_list = []
+    for _ in range(5000):
+        params = {field: rng.choice(values) for field, values in BOUNDARIES.items()}
+        params['weatherAlerts'] = rng.choice(ALERTS)
+        params_list.append(params)
+    assert_parity(params_list)
+
+
+def test_pairwise_temperature_and_wind_grid():
+    params_list = []
+    for temp, speed, gust in itertools.product(BOUNDARIES['apparentTemp'], BOUNDARIES['windSpeed'], BOUNDARIES['windGust']):
+        params = neutral_params()
+        params.update(apparentTemp=temp, windSpeed=speed, windGust=gust)
+        params_list.append(params)
+    assert_parity(params_list)
+
+
+def test_random_continuous_values():
+    rng = random.Random(2025)
+    params_list = [{
+        'apparentTemp': rng.uniform(-10, 110),
+        'windSpeed': rng.uniform(0, 40),
+        'windGust': rng.uniform(0, 60),
+        'discharge': rng.choice([rng.uniform(0, 16000), rng.randint(0, 16000)]),
+        'waterTemp': rng.uniform(30, 85),
+        'precipitation': rng.uniform(0, 6),
+        'uvIndex': rng.uniform(0, 12),
+        'visibility': rng.uniform(0, 15),
+        'lightningPotential': rng.uniform(0, 100),
+        'precipitationProbability': rng.randint(0, 100),
+    } for _ in range(5000)]
+    assert_parity(params_list)
+
+
+def test_absent_keys_use_the_scalar_defaults():
+    params_list = [{}, {'apparentTemp': 70}, {'discharge': 3000, 'waterTemp': 65}]
+    assert_parity(params_list)
+
+
+def test_columns_accept_nan_for_optional_values():
+    columns = {name: [] for name in SCORE_FIELDS}
+    params = neutral_params()
+    for name in SCORE_FIELDS:
+        columns[name].append(params[name])
+    columns['visibility'] = [float('nan')]
+    columns['waterTemp'] = [float('nan')]
+    expected = compute_rowcast(dict(params, visibility=None, waterTemp=None))
+    assert compute_rowcast_batch(columns) == [expected]
+
+
+def test_missing_required_value_raises_like_the_scalar_path():
+    params = neutral_params()
+    params['discharge'] = None
+    with pytest.raises(TypeError):
+        compute_rowcast(params)
+    with pytest.raises(TypeError):
+        compute_rowcast_many([neutral_params(), params])
+
+
+def test_rounding_matches_python_round_at_ties():
+    # Decimal ties and values whose binary form sits just either side of one
+    raw = [0.125, 0.135, 0.145, 0.005, 0.015, 0.285, 0.335, 0.4449999999999999, 0.0049, 0.0, 10.004]
+    assert json.dumps(_round_scores(np.array(raw))) == json.dumps([clamp(round(x, 2), 0, 10) for x in raw])
+
+
+def test_empty_batch():
+    assert compute_rowcast_many([]) == []
+
+
+def benchmark(days=7, venues=5, profiles=4, iterations=5):
+    rng = random.Random(1)
+    alerts = ALERTS[6]
+    rows = days * 24 * venues * profiles
+    params_list = [{
+        'apparentTemp': rng.uniform(40, 100), 'windSpeed': rng.uniform(0, 30), 'windGust': rng.uniform(0, 45),
+        'discharge': rng.uniform(500, 15000), 'waterTemp': rng.uniform(40, 85), 'precipitation': rng.uniform(0, 3),
+        'uvIndex': rng.uniform(0, 11), 'visibility': rng.uniform(0, 15), 'lightningPotential': rng.uniform(0, 90),
+        'precipitationProbability': rng.randint(0, 100), 'weatherAlerts': alerts,
+    } for _ in range(rows)]
+    columns = {name: [params[name] for params in params_list] for name in SCORE_FIELDS}
+    weather_alerts = [alerts] * rows
+
+    def run(scorer):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            scorer()
+        return (time.perf_counter() - started) / iterations * 1000
+
+    scalar = run(lambda: [compute_rowcast(params) for params in params_list])
+    many = run(lambda: compute_rowcast_many(params_list))
+    batch = run(lambda: compute_rowcast_batch(columns, weather_alerts))
+
+    print("=" * 60)
+    print(f" ROWCAST SCORER BENCHMARK ({days} days x {venues} venues x {profiles} profiles = {rows} rows)")
+    print("=" * 60)
+    print(f"scalar compute_rowcast loop:  {scalar:.2f} ms")
+    print(f"compute_rowcast_many (dicts): {many:.2f} ms  ({scalar / many:.2f}x)")
+    print(f"compute_rowcast_batch:        {batch:.2f} ms  ({scalar / batch:.2f}x)")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for POST /api/rowcast/at: a batch of timestamps and offsets answered from one read of
+the stored scores.
+"""
+
+import time
+
+import pytest
+
+import app.routes as routes
+import app.tasks as tasks
+from app import create_app
+from app.cache import DocumentCache
+from conftest import HORIZON_SCORES
+
+
+class CountingCache(DocumentCache):
+    def __init__(self, redis):
+        super().__init__(redis)
+        self.reads = 0
+
+    def get_many(self, keys):
+        self.reads += 1
+        return super().get_many(keys)
+
+
+@pytest.fixture
+def document_cache(fake_redis):
+    return CountingCache(fake_redis)
+
+
+@pytest.fixture
+def client(client):
+    tasks.store_documents(HORIZON_SCORES)
+    return client
+
+
+def test_batch_matches_single_lookups(client, document_cache):
+    times = ['2025-07-01T09:40', '2025-07-01T22:00', '2025-07-02T02:00:00Z', '2025-07-05T10:00']
+
+    response = client.post('/api/rowcast/at', json={'times': times})
+
+    assert response.status_code == 200
+    assert document_cache.reads == 1
+    for text, entry in zip(times, response.get_json()):
+        single = client.get(f'/api/rowcast/at/{text}').get_json()
+        assert entry == {'time': text, **{k: v for k, v in single.items() if k != 'conditions'}}
+
+
+def test_conditions_and_interpolation_are_optional(client):
+    plain, = client.post('/api/rowcast/at', json={'times': ['2025-07-01T09:40']}).get_json()
+    assert 'conditions' not in plain and plain['timestamp'] == '2025-07-01T09:45'
+
+    blended, = client.post('/api/rowcast/at', json={
+        'times': ['2025-07-01T09:40'], 'conditions': True, 'interpolate': True}).get_json()
+    assert blended['timestamp'] == '2025-07-01T09:40' and blended['interpolated'] is True
+    assert blended == {'time': '2025-07-01T09:40', **client.get('/api/rowcast/at/2025-07-01T09:40?interpolate=true').get_json()}
+
+
+def test_offsets_share_one_now(client):
+    entries = client.post('/api/rowcast/at', json={'times': ['2h', '2025-07-01T08:00', '2h']}).get_json()
+    assert [entry['time'] for entry in entries] == ['2h', '2025-07-01T08:00', '2h']
+    assert entries[0] == entries[2]
+
+
+def test_bad_requests_answer_400(client):
+    assert client.post('/api/rowcast/at', data='not json', content_type='application/json').status_code == 400
+    assert client.post('/api/rowcast/at', json={'times': []}).status_code == 400
+    assert client.post('/api/rowcast/at', json=['2h']).status_code == 400
+    assert client.post('/api/rowcast/at', json={'times': ['2h'] * (routes.MAX_BATCH_TIMES + 1)}).status_code == 400
+
+    response = client.post('/api/rowcast/at', json={'times': ['2h', 'tomorrow', 5, '3x']})
+    assert response.status_code == 400
+    assert response.get_json()['invalid'] == ['tomorrow', 5, '3x']
+
+
+def test_missing_scores_answer_404(app_redis):
+    response = create_app(role='web').test_client().post('/api/rowcast/at', json={'times': ['2h']})
+    assert response.status_code == 404
+
+
+def test_one_batch_beats_one_request_per_slot(client):
+    slots = [f'2025-07-{day:02d}T{hour:02d}:00' for day in range(1, 8) for hour in (6, 17)] * 3
+
+    def timed(run):
+        started = time.perf_counter()
+        run()
+        return (time.perf_counter() - started) * 1000
+
+    # Clearing the local cache makes every read decode the stored scores, as after a write
+    def one_by_one():
+        for slot in slots:
+            routes.document_cache._local.clear()
+            client.get(f'/api/rowcast/at/{slot}')
+
+    def batched():
+        routes.document_cache._local.clear()
+        client.post('/api/rowcast/at', json={'times': slots})
+
+    single_ms, batch_ms = timed(one_by_one), timed(batched)
+    print(f"\n{len(slots)} slots: one request each {single_ms:.1f} ms, one batch {batch_ms:.1f} ms")
+    assert batch_ms < single_ms
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Parity tests and micro-benchmark for the columnar Open-Meteo parser (app/columnar.py)
+
+    python -m pytest -q test_columnar_forecast.py   # parity with the old per-index loop
+    python test_columnar_forecast.py                # old loop vs columnar on a 7-day payload
+"""
+
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+import app.tasks as tasks
+from app.columnar import ForecastColumns, HOURLY_FIELDS, columns_document
+from app.fetchers import build_hourly_forecast
+from app.utils import fmt, deg_to_cardinal
+
+
+def legacy_build_hourly_forecast(hourly, alerts):
+    """The per-index loop fetch_extended_weather_forecast used before the columnar parser."""
+    times = hourly.get('time', [])
+    forecast = []
+    for i in range(len(times)):
+        deg_forecast = hourly.get('wind_direction_10m', [])[i] if i < len(hourly.get('wind_direction_10m', [])) else None
+        wind_dir_forecast = f"{deg_to_cardinal(deg_forecast)} ({fmt(deg_forecast, 0, '°')})" if deg_forecast is not None else "N/A"
+        forecast.append({
+            'timestamp': times[i],
+            'windSpeed': hourly.get('wind_speed_10m', [])[i] if i < len(hourly.get('wind_speed_10m', [])) else None,
+            'windGust': hourly.get('wind_gusts_10m', [])[i] if i < len(hourly.get('wind_gusts_10m', [])) else None,
+            'windDir': wind_dir_forecast,
+            'apparentTemp': hourly.get('apparent_temperature', [])[i] if i < len(hourly.get('apparent_temperature', [])) else None,
+            'uvIndex': hourly.get('uv_index', [])[i] if i < len(hourly.get('uv_index', [])) else None,
+            'precipitation': hourly.get('precipitation', [])[i] if i < len(hourly.get('precipitation', [])) else None,
+            'currentTemp': hourly.get('temperature_2m', [])[i] if i < len(hourly.get('temperature_2m', [])) else None,
+            'visibility': hourly.get('visibility', [])[i] if i < len(hourly.get('visibility', [])) else None,
+            'precipitationProbability': hourly.get('precipitation_probability', [])[i] if i < len(hourly.get('precipitation_probability', [])) else None,
+            'lightningPotential': hourly.get('lightning_potential', [])[i] if i < len(hourly.get('lightning_potential', [])) else None,
+            'weatherAlertIds': list(alerts)
+        })
+    return forecast
+
+
+def seven_day_payload(seed=7):
+    """A 168-hour `hourly` block with Open-Meteo's value types (ints, floats and nulls)."""
+    rng = random.Random(seed)
+    start = datetime(2025, 7, 1)
+    hours = 168
+    return {
+        'time': [(start + timedelta(hours=i)).strftime('%Y-%m-%dT%H:%M') for i in range(hours)],
+        'temperature_2m': [round(rng.uniform(60, 95), 1) for _ in range(hours)],
+        'apparent_temperature': [round(rng.uniform(58, 100), 1) for _ in range(hours)],
+        'wind_speed_10m': [round(rng.uniform(0, 25), 1) for _ in range(hours)],
+        'wind_direction_10m': [rng.randint(0, 359) for _ in range(hours)],
+        'wind_gusts_10m': [round(rng.uniform(0, 40), 1) for _ in range(hours)],
+        'precipitation': [round(rng.choice([0, 0, 0, 0.1, 0.6, 2.3]), 2) for _ in range(hours)],
+        'uv_index': [round(rng.uniform(0, 10), 2) for _ in range(hours)],
+        'visibility': [float(rng.choice([24140, 16000, 3200])) for _ in range(hours)],
+        'precipitation_probability': [rng.randint(0, 100) for _ in range(hours)],
+        # Lightning potential is only forecast for the first days
+        'lightning_potential': [round(rng.uniform(0, 90), 1) if i < 48 else None for i in range(hours)],
+    }
+
+
+def test_columnar_rows_match_the_legacy_loop():
+    hourly = seven_day_payload()
+    alerts = {'nws-1': {'id': 'nws-1', 'type': 'Heat Advisory', 'severity': 'Moderate'}}
+    assert build_hourly_forecast(hourly, alerts).rows() == legacy_build_hourly_forecast(hourly, alerts)
+    # Same JSON values too (ints stay ints, nulls stay nulls)
+    assert json.loads(json.dumps(build_hourly_forecast(hourly, alerts).rows())) == \
+        json.loads(json.dumps(legacy_build_hourly_forecast(hourly, alerts)))
+
+
+def test_missing_and_short_arrays_become_none():
+    hourly = seven_day_payload()
+    del hourly['uv_index']
+    hourly['wind_direction_10m'] = hourly['wind_direction_10m'][:10]
+    hourly['visibility'][5] = None
+    assert build_hourly_forecast(hourly, {}).rows() == legacy_build_hourly_forecast(hourly, {})
+
+
+def test_columns_are_typed_and_sliceable():
+    columns = ForecastColumns.from_open_meteo(seven_day_payload(), HOURLY_FIELDS)
+    assert len(columns) == 168
+    assert columns.column('windSpeed').typecode == 'd'
+    assert len(columns.rows(0, 24)) == 24
+    assert columns.rows(24, 25)[0]['timestamp'] == '2025-07-02T00:00'
+    assert columns.values('lightningPotential', 47, 49)[1] is None
+
+
+def test_column_document_matches_the_rows():
+    hourly = seven_day_payload()
+    hourly['visibility'][5] = None
+    columns = build_hourly_forecast(hourly, {})
+    assert columns.document() == columns_document(columns.rows())
+    assert columns.head(24).document() == columns_document(columns.rows(stop=24))
+
+
+def test_stored_columns_become_rows_only_in_the_row_document(monkeypatch, fake_redis):
+    monkeypatch.setattr(tasks, 'redis_client', fake_redis)
+    columns = build_hourly_forecast(seven_day_payload(), {})
+    tasks.store_documents({'extended_weather_data': {'current': {}, 'forecast': columns}})
+
+    assert json.loads(fake_redis.get('extended_weather_data'))['forecast'] == json.loads(json.dumps(columns.rows()))
+    assert json.loads(fake_redis.get('extended_weather_data_columns')) == json.loads(json.dumps(columns.document()))
+
+
+def benchmark(iterations=300):
+    hourly = seven_day_payload()
+    alerts = []
+    # Start from the raw JSON like the fetcher does
+    raw = json.dumps({'hourly': hourly})
+
+    def run(builder):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            builder(json.loads(raw)['hourly'], alerts)
+        return (time.perf_counter() - started) / iterations * 1000
+
+    decode_only = run(lambda block, _: block)
+    legacy = run(legacy_build_hourly_forecast)
+    columnar = run(lambda block, alerts: build_hourly_forecast(block, alerts).rows())
+    columns_only = run(build_hourly_forecast)
+
+    print("=" * 60)
+    print(" OPEN-METEO PARSER BENCHMARK (7-day hourly block, 168 rows)")
+    print("=" * 60)
+    print(f"json.loads only (baseline):   {decode_only:.3f} ms  (included in every line below)")
+    print(f"legacy per-index loop:        {legacy:.3f} ms")
+    print(f"columnar + row dicts:         {columnar:.3f} ms  ({legacy / columnar:.2f}x)")
+    print(f"columnar, no row dicts:       {columns_only:.3f} ms  ({legacy / columns_only:.2f}x)")
+
+
+if __name__ == "__main__":
+    benchmark()
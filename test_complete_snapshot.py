@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for the precomputed /api/complete/extended document (app.snapshots): the worker
+rebuilds it whenever an input changes and the route answers with a single read.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import app.routes as routes
+import app.tasks as tasks
+from app import create_app
+from app.events import EventBus, ScoringPipeline
+from app.scoring import COMPLETE_EXTENDED_KEY
+from conftest import FakeScheduler
+
+
+def weather(hours):
+    start = datetime(2025, 7, 1, 8)
+    forecast = [{
+        'timestamp': (start + timedelta(hours=i)).strftime('%Y-%m-%dT%H:%M'),
+        'windSpeed': 4.0, 'windGust': 6.0, 'apparentTemp': 76.0, 'uvIndex': 3.0, 'precipitation': 0.0,
+        'visibility': 10.0, 'lightningPotential': None, 'precipitationProbability': 10, 'weatherAlerts': [],
+    } for i in range(hours)]
+    return {'current': {**forecast[0], 'timestamp': forecast[0]['timestamp']}, 'forecast': forecast}
+
+
+@pytest.fixture
+def wired(monkeypatch, fake_redis, app_redis):
+    """Real jobs on a fake Redis, with a bus and pipeline that record what they schedule."""
+    scheduler = FakeScheduler()
+    bus = EventBus(fake_redis)
+    pipeline = ScoringPipeline(scheduler, tasks.SCORING_JOBS)
+    pipeline.attach(bus)
+    monkeypatch.setattr(tasks, 'event_bus', bus)
+    monkeypatch.setattr(tasks, 'scoring_pipeline', pipeline)
+
+    monkeypatch.setattr(tasks, 'fetch_open_meteo_bundle', lambda: {
+        'weather': weather(24), 'extended': weather(48), 'shortTerm': weather(12)})
+    monkeypatch.setattr(tasks, 'fetch_water_data_incremental', lambda: {
+        'current': {'discharge': 3000, 'waterTemp': 72.0, 'gaugeHeight': 3.1}, 'historical': {}})
+    monkeypatch.setattr(tasks, 'fetch_noaa_stageflow_forecast', lambda conditional=False: {
+        'current': {'discharge': 3100, 'gaugeHeight': 3.2}, 'observed': [], 'forecast': [], 'metadata': {}})
+    return scheduler
+
+
+def test_score_updates_schedule_a_snapshot_rebuild(wired, fake_redis):
+    fake_redis.set('short_term_weather_data', json.dumps(weather(12)))
+    fake_redis.set('water_data', json.dumps({'current': {'discharge': 3000}, 'historical': {}}))
+    tasks.update_short_term_forecast_job()
+    assert set(wired.jobs) == {tasks.SNAPSHOT_JOB}
+
+
+def test_refresh_cycle_builds_the_snapshot_once_after_the_scores(wired, fake_redis, monkeypatch):
+    builds = []
+    build = tasks.build_complete_extended
+    monkeypatch.setattr(tasks, 'build_complete_extended', lambda *args: builds.append(1) or build(*args))
+
+    tasks.run_refresh_cycle()
+
+    assert builds == [1]
+    # Nothing left to run later
+    assert wired.jobs == {}
+    snapshot = json.loads(fake_redis.get(COMPLETE_EXTENDED_KEY))
+    assert len(snapshot['rowcast']['extendedForecast']) == 48
+    assert len(snapshot['rowcast']['shortTerm']) == 12
+    assert snapshot['rowcast']['current']['noaaDataUsed']
+    assert all(snapshot['metadata']['dataAvailability'].values())
+    assert snapshot['metadata']['dataFreshness']['extended_forecast_scores']['updatedAt'] is not None
+    # Ages are only known when a request is made
+    assert all(set(entry) == {'updatedAt'} for entry in snapshot['metadata']['dataFreshness'].values())
+
+
+def test_route_serves_the_stored_snapshot_with_one_read(wired, monkeypatch):
+    tasks.run_refresh_cycle()
+    client = create_app(role='web').test_client()
+
+    def no_assembly(keys):
+        raise AssertionError('the route should not read the source documents')
+    monkeypatch.setattr(routes.document_cache, 'get_many', no_assembly)
+    response = client.get('/api/complete/extended', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    again = client.get('/api/complete/extended', headers={'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['ETag']})
+    assert again.status_code == 304
+
+
+def test_route_assembles_the_document_until_the_first_snapshot(wired, fake_redis):
+    tasks.update_weather_data_job()
+    tasks.update_water_data_job()
+    client = create_app(role='web').test_client()
+
+    document = client.get('/api/complete/extended').get_json()
+
+    assert fake_redis.get(COMPLETE_EXTENDED_KEY) is None
+    assert document['weather']['current']['windSpeed'] == 4.0
+    assert document['metadata']['dataAvailability']['weather']
+    assert not document['metadata']['dataAvailability']['noaaStageflow']
+    assert document['rowcast']['extendedForecast'] == []
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Tests for conditional (ETag / Last-Modified) upstream requests against a local
+stub server: unchanged NOAA stageflow data should cost one small 304 round trip
+and skip the parse -> store -> rescore chain.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import app.fetchers as fetchers
+import app.tasks as tasks
+from app.http_client import HTTPClient
+
+STAGEFLOW = {
+    'observed': {'data': [
+        {'validTime': '2025-07-01T12:00:00Z', 'primary': 3.1, 'secondary': 2.4, 'generatedTime': '2025-07-01T12:05:00Z'},
+    ]},
+    'forecast': {
+        'issuedTime': '2025-07-01T12:00:00Z', 'wfo': 'PHI',
+        'data': [
+            {'validTime': '2025-07-01T12:00:00Z', 'primary': 3.1, 'secondary': 2.4},
+            {'validTime': '2025-07-01T18:00:00Z', 'primary': 3.4, 'secondary': 2.9},
+        ],
+    },
+}
+
+
+class StageflowHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    etag = '"issued-2025-07-01T12"'
+    hits = []
+
+    def do_GET(self):
+        body = json.dumps(STAGEFLOW).encode()
+        # Record before responding: the client may check hits as soon as it has the response
+        if self.headers.get('If-None-Match') == self.etag:
+            self.hits.append((304, 0))
+            self.send_response(304)
+            self.send_header("ETag", self.etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.hits.append((200, len(body)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", self.etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubRoutedClient(HTTPClient):
+    """HTTPClient that sends every request to the stub server, keeping the path."""
+
+    def __init__(self, base_url):
+        super().__init__()
+        self.base_url = base_url
+
+    def request(self, method, url, timeout=None, **kwargs):
+        return super().request(method, self.base_url + urlsplit(url).path, timeout=timeout, **kwargs)
+
+
+def start_stub_server():
+    StageflowHandler.hits = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StageflowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_second_request_is_a_bodiless_304():
+    server, base_url = start_stub_server()
+    client = HTTPClient()
+    try:
+        first = client.get_conditional(f"{base_url}/stageflow")
+        client.remember_validators(f"{base_url}/stageflow", first)
+        second = client.get_conditional(f"{base_url}/stageflow")
+        assert first.status_code == 200 and first.json() == STAGEFLOW
+        assert second.status_code == 304 and second.content == b''
+        assert [status for status, _ in StageflowHandler.hits] == [200, 304]
+        assert StageflowHandler.hits[1][1] == 0
+        assert client.stats()[base_url.split('//', 1)[1]]['notModified'] == 1
+    finally:
+        client.close()
+        server.shutdown()
+
+
+def test_validators_are_not_sent_when_the_caller_has_no_copy():
+    server, base_url = start_stub_server()
+    client = HTTPClient()
+    try:
+        client.remember_validators(f"{base_url}/stageflow", client.get_conditional(f"{base_url}/stageflow"))
+        again = client.get_conditional(f"{base_url}/stageflow", use_validators=False)
+        assert again.status_code == 200
+    finally:
+        client.close()
+        server.shutdown()
+
+
+def test_unchanged_stageflow_skips_parse_store_and_rescore(monkeypatch, fake_redis):
+    server, base_url = start_stub_server()
+    client = StubRoutedClient(base_url)
+    monkeypatch.setattr(fetchers, 'http_client', client)
+    monkeypatch.setattr(tasks, 'redis_client', fake_redis)
+    try:
+        tasks.update_noaa_stageflow_job()
+        stored = fake_redis.get('noaa_stageflow_data')
+        assert json.loads(stored)['forecast'][0]['gaugeHeight'] == 3.1
+
+        writes = []
+        original_set = fake_redis.set
+        monkeypatch.setattr(fake_redis, 'set', lambda *a, **kw: writes.append(a) or original_set(*a, **kw))
+        tasks.update_noaa_stageflow_job()
+
+        assert writes == []
+        assert [status for status, _ in StageflowHandler.hits] == [200, 304]
+    finally:
+        client.close()
+        server.shutdown()
+
+
+def test_full_fetch_when_redis_lost_the_forecast(monkeypatch, fake_redis):
+    server, base_url = start_stub_server()
+    client = StubRoutedClient(base_url)
+    monkeypatch.setattr(fetchers, 'http_client', client)
+    monkeypatch.setattr(tasks, 'redis_client', fake_redis)
+    try:
+        tasks.update_noaa_stageflow_job()
+        fake_redis.delete('noaa_stageflow_data')
+        tasks.update_noaa_stageflow_job()
+
+        assert [status for status, _ in StageflowHandler.hits] == [200, 200]
+        assert fake_redis.get('noaa_stageflow_data') is not None
+    finally:
+        client.close()
+        server.shutdown()
+
+
+def test_failed_parse_does_not_keep_the_validators(monkeypatch, fake_redis):
+    server, base_url = start_stub_server()
+    client = StubRoutedClient(base_url)
+    monkeypatch.setattr(fetchers, 'http_client', client)
+    monkeypatch.setattr(tasks, 'redis_client', fake_redis)
+    fake_redis.set('noaa_stageflow_data', json.dumps({'forecast': [{'gaugeHeight': 9.9}]}))
+    try:
+        def broken(*args, **kwargs):
+            raise ValueError("bad forecast point")
+        with monkeypatch.context() as patched:
+            patched.setattr(fetchers, 'time_grid', broken)
+            tasks.update_noaa_stageflow_job()
+        tasks.update_noaa_stageflow_job()
+
+        # The second run fetched and stored the forecast instead of a 304 for the stale copy
+        assert [status for status, _ in StageflowHandler.hits] == [200, 200]
+        assert json.loads(fake_redis.get('noaa_stageflow_data'))['forecast'][0]['gaugeHeight'] == 3.1
+    finally:
+        client.close()
+        server.shutdown()
+
+
+def test_failed_store_does_not_keep_the_validators(monkeypatch, fake_redis):
+    server, base_url = start_stub_server()
+    client = StubRoutedClient(base_url)
+    monkeypatch.setattr(fetchers, 'http_client', client)
+    monkeypatch.setattr(tasks, 'http_client', client)
+    monkeypatch.setattr(tasks, 'redis_client', fake_redis)
+    fake_redis.set('noaa_stageflow_data', json.dumps({'forecast': [{'gaugeHeight': 9.9}]}))
+    try:
+        def broken(documents):
+            raise ConnectionError("Redis went away")
+        with monkeypatch.context() as patched:
+            patched.setattr(tasks, 'store_documents', broken)
+            tasks.update_noaa_stageflow_job()
+        tasks.update_noaa_stageflow_job()
+
+        assert [status for status, _ in StageflowHandler.hits] == [200, 200]
+    finally:
+        client.close()
+        server.shutdown()
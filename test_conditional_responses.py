@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tests for ETag / If-None-Match handling in the API routes: an unchanged poll costs a
+bodiless 304, and Cache-Control max-age runs until the producing job is due to run again.
+"""
+
+import time
+
+import app.tasks as tasks
+from app.events import SCORING_DEBOUNCE
+from app.freshness import mark_updated, refresh_due, seconds_until_refresh
+
+WEATHER = {'current': {'windSpeed': 4, 'apparentTemp': 78}, 'forecast': [{'timestamp': '2025-07-01T08:00', 'windSpeed': 4}]}
+WATER = {'current': {'discharge': 3000, 'waterTemp': 72, 'gaugeHeight': 3.1}, 'historical': {}}
+SCORES = [{'timestamp': '2025-07-01T08:00', 'score': 8.5, 'conditions': {}}]
+
+
+def test_unchanged_poll_gets_a_304(client):
+    tasks.store_documents({'forecast_scores': SCORES})
+
+    first = client.get('/api/rowcast/forecast')
+    again = client.get('/api/rowcast/forecast', headers={'If-None-Match': first.headers['ETag']})
+
+    assert first.status_code == 200
+    assert first.headers['ETag'].startswith('W/"')
+    assert again.status_code == 304
+    assert again.data == b''
+    assert again.headers['ETag'] == first.headers['ETag']
+
+
+def test_changed_documents_get_a_new_etag(client):
+    tasks.store_documents({'weather_data': WEATHER})
+    etag = client.get('/api/weather/current').headers['ETag']
+
+    # Rewriting identical content keeps the tag
+    tasks.store_documents({'weather_data': WEATHER})
+    assert client.get('/api/weather/current', headers={'If-None-Match': etag}).status_code == 304
+
+    tasks.store_documents({'weather_data': {**WEATHER, 'current': {'windSpeed': 9}}})
+    response = client.get('/api/weather/current', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json() == {'windSpeed': 9}
+    assert response.headers['ETag'] != etag
+
+
+def test_composite_routes_change_with_any_of_their_documents(client):
+    tasks.store_documents({'weather_data': WEATHER, 'water_data': WATER, 'forecast_scores': SCORES})
+    etag = client.get('/api/complete').headers['ETag']
+    assert client.get('/api/complete', headers={'If-None-Match': etag}).status_code == 304
+
+    tasks.store_documents({'water_data': {**WATER, 'current': {**WATER['current'], 'discharge': 9000}}})
+    assert client.get('/api/complete', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_composite_bodies_only_change_with_their_documents(client, fake_redis):
+    tasks.store_documents({'weather_data': WEATHER, 'water_data': WATER})
+    mark_updated(fake_redis, ['forecast_scores'], at=time.time() - 30)
+    first = client.get('/api/complete')
+    time.sleep(1.1)
+    # A cached or revalidated copy stays accurate: no ages that grow with the clock
+    assert client.get('/api/complete').data == first.data
+    body = first.get_json()
+    assert set(body['dataFreshness']['water_data']) == {'updatedAt'}
+    assert body['updatedAt'] == max(entry['updatedAt'] for entry in body['dataFreshness'].values())
+    assert 'lastUpdated' not in body
+
+
+def test_stored_bodies_are_tagged_too(client):
+    tasks.store_documents({'extended_forecast_scores': SCORES})
+    first = client.get('/api/rowcast/forecast/extended', headers={'Accept-Encoding': 'gzip'})
+    again = client.get('/api/rowcast/forecast/extended', headers={'Accept-Encoding': 'gzip', 'If-None-Match': first.headers['ETag']})
+    assert first.headers['Content-Encoding'] == 'gzip'
+    assert again.status_code == 304
+    assert 'Accept-Encoding' in again.headers['Vary']
+
+
+def test_max_age_runs_until_the_next_fetch(client, fake_redis):
+    tasks.store_documents({'water_data': WATER})
+    mark_updated(fake_redis, ['water_data'], at=time.time() - 300)
+
+    response = client.get('/api/water')
+
+    # Water is fetched every 15 minutes
+    assert 595 <= response.cache_control.max_age <= 600
+    assert response.cache_control.public
+
+
+def test_overdue_or_untagged_data_must_revalidate(client, fake_redis):
+    tasks.store_documents({'water_data': WATER})
+    mark_updated(fake_redis, ['water_data'], at=time.time() - 3600)
+    assert client.get('/api/water').cache_control.no_cache
+
+    # Written before ETags existed
+    fake_redis.set('noaa_stageflow_data', '{"forecast": [1]}')
+    response = client.get('/api/noaa/stageflow')
+    assert response.status_code == 200
+    assert 'ETag' not in response.headers
+
+
+def test_relative_windows_are_not_tagged_or_cached(client):
+    tasks.store_documents({'extended_forecast_scores': SCORES})
+    etag = client.get('/api/rowcast/forecast/extended').headers['ETag']
+
+    for query in ('from=6h', 'to=1d', 'from=2025-07-01T00:00&to=12h'):
+        response = client.get(f'/api/rowcast/forecast/extended?{query}', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert 'ETag' not in response.headers
+        assert response.cache_control.no_cache and response.cache_control.max_age is None
+
+    # A fixed window is still tagged
+    fixed = client.get('/api/rowcast/forecast/extended?from=2025-07-01T00:00', headers={'If-None-Match': etag})
+    assert fixed.status_code == 304
+
+
+def test_missing_data_is_not_tagged(client):
+    response = client.get('/api/rowcast/forecast/short-term')
+    assert response.status_code == 404
+    assert 'ETag' not in response.headers
+
+
+def test_scores_are_due_a_debounce_after_their_first_input():
+    now = 1_750_000_000
+    stamps = {'weather_data': now - 100, 'water_data': now - 800, 'noaa_stageflow_data': now - 120, 'forecast_scores': now - 90}
+    # Water (every 15 minutes) is due first, in 100 s
+    assert refresh_due(stamps, 'forecast_scores') == now + 100 + SCORING_DEBOUNCE
+    assert seconds_until_refresh(stamps, ['forecast_scores', 'weather_data'], now=now) == 100 + SCORING_DEBOUNCE
+
+
+def test_scores_with_a_pending_rescore_are_due_now():
+    now = 1_750_000_000
+    stamps = {'weather_data': now - 2, 'water_data': now - 60, 'noaa_stageflow_data': now - 60, 'forecast_scores': now - 50}
+    assert seconds_until_refresh(stamps, ['forecast_scores'], now=now) == 0
+    assert seconds_until_refresh({}, ['forecast_scores'], now=now) == 0
+
+
+def test_a_confirmed_source_extends_only_its_own_expiry():
+    now = 1_750_000_000
+    stamps = {'weather_data': now - 60, 'water_data': now - 60, 'noaa_stageflow_data': now - 3600, 'forecast_scores': now - 50}
+    # NOAA (every 30 minutes) is overdue until its source answers 304 again
+    assert seconds_until_refresh(stamps, ['noaa_stageflow_data'], now=now) == 0
+    checked = {'noaa_stageflow_data': now - 10}
+    assert seconds_until_refresh(stamps, ['noaa_stageflow_data'], now=now, checked=checked) == 1790
+    # The confirmation does not outdate the scores built from it; weather is due first
+    assert refresh_due(stamps, 'forecast_scores', checked) == now + 540 + SCORING_DEBOUNCE
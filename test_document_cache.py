@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for the routes' decoded-document cache (app.cache.DocumentCache): a document is read
+and decoded once per write, and a write from any process invalidates every cache.
+"""
+
+import json
+
+import pytest
+
+import app as app_package
+import app.routes as routes
+import app.tasks as tasks
+from app import create_app
+from app.cache import DocumentCache, bump_generations
+from app.columnar import columns_document
+from conftest import FakeRedis
+
+
+class CountingRedis(FakeRedis):
+    """FakeRedis that records the read commands the cache sends."""
+
+    def __init__(self):
+        super().__init__()
+        self.commands = []
+
+    def hmget(self, key, fields):
+        self.commands.append('hmget')
+        return super().hmget(key, fields)
+
+    def mget(self, keys):
+        self.commands.append('mget')
+        return super().mget(keys)
+
+
+@pytest.fixture
+def shared_redis(monkeypatch):
+    redis = CountingRedis()
+    monkeypatch.setattr(tasks, 'redis_client', redis)
+    return redis
+
+
+def test_unchanged_documents_are_decoded_once(shared_redis):
+    tasks.store_documents({'weather_data': {'current': {'windSpeed': 4}}})
+    cache = DocumentCache(shared_redis)
+
+    first = cache.get('weather_data')
+    second = cache.get('weather_data')
+
+    assert first == {'current': {'windSpeed': 4}}
+    assert second is first
+    assert shared_redis.commands == ['hmget', 'mget', 'hmget']
+
+
+def test_a_write_from_another_process_invalidates_every_cache(shared_redis):
+    tasks.store_documents({'water_data': {'current': {'discharge': 3000}}})
+    # Two web workers with their own caches
+    caches = [DocumentCache(shared_redis), DocumentCache(shared_redis)]
+    assert all(cache.get('water_data')['current']['discharge'] == 3000 for cache in caches)
+
+    tasks.store_documents({'water_data': {'current': {'discharge': 4200}}})
+
+    assert all(cache.get('water_data')['current']['discharge'] == 4200 for cache in caches)
+
+
+def test_only_changed_keys_are_reloaded(shared_redis):
+    tasks.store_documents({'weather_data': {'a': 1}, 'water_data': {'b': 2}, 'forecast_scores': []})
+    cache = DocumentCache(shared_redis)
+    cache.get_many(['weather_data', 'water_data', 'forecast_scores'])
+
+    tasks.store_documents({'water_data': {'b': 3}})
+    loaded = []
+    mget = shared_redis.mget
+    shared_redis.mget = lambda keys: loaded.extend(keys) or mget(keys)
+
+    documents = cache.get_many(['weather_data', 'water_data', 'forecast_scores'])
+
+    assert loaded == ['water_data']
+    assert documents == {'weather_data': {'a': 1}, 'water_data': {'b': 3}, 'forecast_scores': columns_document([])}
+
+
+def test_keys_without_a_generation_are_always_read(shared_redis):
+    # Written before generations existed, or by hand
+    shared_redis.set('noaa_stageflow_data', json.dumps({'forecast': []}))
+    cache = DocumentCache(shared_redis)
+    cache.get('noaa_stageflow_data')
+    shared_redis.set('noaa_stageflow_data', json.dumps({'forecast': [1]}))
+    assert cache.get('noaa_stageflow_data') == {'forecast': [1]}
+
+    shared_redis.delete('noaa_stageflow_data')
+    assert cache.get('noaa_stageflow_data') is None
+
+
+def test_deleted_documents_are_not_served_from_cache(shared_redis):
+    tasks.store_documents({'weather_data': {'a': 1}})
+    cache = DocumentCache(shared_redis)
+    cache.get('weather_data')
+    pipe = shared_redis.pipeline()
+    pipe.delete('weather_data')
+    bump_generations(pipe, ['weather_data'])
+    pipe.execute()
+    assert cache.get('weather_data') is None
+
+
+def test_routes_read_through_the_cache(monkeypatch, shared_redis):
+    monkeypatch.setattr(app_package, 'redis_client', shared_redis)
+    monkeypatch.setattr(routes, 'redis_client', shared_redis)
+    monkeypatch.setattr(routes, 'document_cache', DocumentCache(shared_redis))
+    tasks.store_documents({'weather_data': {'current': {'windSpeed': 4}, 'forecast': []}})
+    client = create_app(role='web').test_client()
+
+    for _ in range(3):
+        assert client.get('/api/weather/current').get_json() == {'windSpeed': 4}
+
+    assert shared_redis.commands.count('mget') == 1
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Tests for event-driven scoring (app.events): fetch jobs publish data_updated events and
+only the scoring jobs that read the updated keys are scheduled, debounced.
+"""
+
+import json
+import threading
+import time
+
+import pytest
+
+import app.tasks as tasks
+from app.events import DATA_UPDATED, EventBus, ScoringPipeline
+from conftest import FakeScheduler
+
+
+def make_pipeline(calls, debounce=5):
+    jobs = {
+        'forecast': (lambda context=None: calls.append('forecast'), ('weather_data', 'water_data', 'noaa_stageflow_data')),
+        'extended': (lambda context=None: calls.append('extended'), ('extended_weather_data', 'water_data', 'noaa_stageflow_data')),
+        'short_term': (lambda context=None: calls.append('short_term'), ('short_term_weather_data', 'water_data')),
+    }
+    scheduler = FakeScheduler()
+    return ScoringPipeline(scheduler, jobs, debounce=debounce), scheduler
+
+
+def test_only_dependent_jobs_are_scheduled(fake_redis):
+    calls = []
+    pipeline, scheduler = make_pipeline(calls)
+    bus = EventBus(fake_redis)
+    pipeline.attach(bus)
+
+    bus.publish(DATA_UPDATED, keys=['noaa_stageflow_data'])
+    assert set(scheduler.jobs) == {'forecast', 'extended'}
+    scheduler.fire()
+    assert sorted(calls) == ['extended', 'forecast']
+
+    # Score outputs have no dependents
+    bus.publish(DATA_UPDATED, keys=['forecast_scores'])
+    assert scheduler.jobs == {}
+
+
+def test_a_burst_of_updates_is_scored_once(fake_redis):
+    calls = []
+    pipeline, scheduler = make_pipeline(calls, debounce=5)
+    bus = EventBus(fake_redis)
+    pipeline.attach(bus)
+
+    bus.publish(DATA_UPDATED, keys=['weather_data', 'extended_weather_data', 'short_term_weather_data'])
+    first_run = scheduler.jobs['forecast'][1]['run_date']
+    bus.publish(DATA_UPDATED, keys=['water_data'])
+
+    # Each update pushes the pending run out instead of adding another
+    assert scheduler.jobs['forecast'][1]['run_date'] >= first_run
+    assert scheduler.jobs['forecast'][1]['trigger'] == 'date'
+    scheduler.fire()
+    assert sorted(calls) == ['extended', 'forecast', 'short_term']
+
+
+def test_events_are_mirrored_to_redis(fake_redis):
+    bus = EventBus(fake_redis, channel='test:events')
+    bus.publish(DATA_UPDATED, keys=['water_data'])
+    channel, message = fake_redis.published[0]
+    assert channel == 'test:events'
+    assert json.loads(message)['keys'] == ['water_data']
+
+
+def test_a_failing_subscriber_does_not_stop_the_others(fake_redis):
+    seen = []
+    bus = EventBus(fake_redis)
+    bus.subscribe(DATA_UPDATED, lambda message: 1 / 0)
+    bus.subscribe(DATA_UPDATED, seen.append)
+    bus.publish(DATA_UPDATED, keys=['water_data'])
+    assert len(seen) == 1
+
+
+def test_hold_collects_jobs_for_the_caller_to_run():
+    calls = []
+    pipeline, scheduler = make_pipeline(calls)
+    with pipeline.hold() as triggered:
+        pipeline.on_data_updated({'keys': ['short_term_weather_data']})
+    assert triggered == {'short_term'} and scheduler.jobs == {}
+    pipeline.run_now(triggered)
+    assert calls == ['short_term']
+
+
+def test_runs_of_one_job_do_not_overlap():
+    active, overlaps = [], []
+
+    def slow_job(context=None):
+        active.append(1)
+        if len(active) > 1:
+            overlaps.append(1)
+        time.sleep(0.05)
+        active.pop()
+
+    pipeline = ScoringPipeline(FakeScheduler(), {'slow': (slow_job, ('water_data',))})
+    threads = [threading.Thread(target=pipeline.run, args=['slow']) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert overlaps == []
+
+
+@pytest.fixture
+def wired(monkeypatch, fake_redis):
+    """The real fetch/score jobs with upstreams stubbed and a fresh bus and pipeline."""
+    bus = EventBus(fake_redis)
+    scheduler = FakeScheduler()
+    pipeline = ScoringPipeline(scheduler, tasks.SCORING_JOBS)
+    pipeline.attach(bus)
+    monkeypatch.setattr(tasks, 'redis_client', fake_redis)
+    monkeypatch.setattr(tasks, 'event_bus', bus)
+    monkeypatch.setattr(tasks, 'scoring_pipeline', pipeline)
+    return scheduler
+
+
+def test_unchanged_noaa_forecast_schedules_nothing(monkeypatch, fake_redis, wired):
+    fake_redis.set('noaa_stageflow_data', json.dumps({'forecast': []}))
+    monkeypatch.setattr(tasks, 'fetch_noaa_stageflow_forecast', lambda conditional=False: None)
+    tasks.update_noaa_stageflow_job()
+    assert wired.jobs == {}
+
+
+def test_water_update_schedules_every_scoring_job(monkeypatch, fake_redis, wired):
+    monkeypatch.setattr(tasks, 'fetch_water_data_incremental', lambda: {'current': {}, 'historical': {}})
+    tasks.update_water_data_job()
+    assert set(wired.jobs) == set(tasks.SCORING_JOBS)
+
+
+def test_refresh_cycle_scores_only_what_its_fetches_updated(monkeypatch, fake_redis, wired):
+    ran = []
+    monkeypatch.setattr(tasks, 'update_weather_data_job', lambda: None)
+    monkeypatch.setattr(tasks, 'update_noaa_stageflow_job', lambda: None)
+    monkeypatch.setattr(tasks, 'fetch_water_data_incremental', lambda: {'current': {}, 'historical': {}})
+    monkeypatch.setattr(tasks.scoring_pipeline, 'run', lambda job_id, context=None: ran.append(job_id))
+
+    tasks.run_refresh_cycle()
+
+    assert ran == list(tasks.SCORING_JOBS)
+    assert wired.jobs == {}
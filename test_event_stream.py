@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for /api/stream: data_updated events published by the jobs reach every connected
+Server-Sent Events client through one Redis subscription per web process.
+"""
+
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+import app.routes as routes
+from app.events import DATA_UPDATED, EVENT_CHANNEL, EventBus, EventStream
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def stream(fake_redis):
+    return EventStream(fake_redis, max_clients=3)
+
+
+@pytest.fixture
+def client(client, monkeypatch, stream):
+    monkeypatch.setattr(routes, 'event_stream', stream)
+    return client
+
+
+def test_one_subscription_fans_out_to_every_client(fake_redis, stream):
+    clients = [stream.connect() for _ in range(3)]
+    wait_for(lambda: len(fake_redis.pubsubs) == 1)
+
+    EventBus(fake_redis).publish(DATA_UPDATED, keys=['water_data'])
+
+    for queue in clients:
+        message = queue.get(timeout=1)
+        assert message['keys'] == ['water_data']
+        assert datetime.fromisoformat(message['publishedAt']).utcoffset() == timedelta(0)
+    assert len(fake_redis.pubsubs) == 1
+
+    for queue in clients:
+        stream.disconnect(queue)
+    wait_for(lambda: fake_redis.pubsubs == [])
+    # A later client subscribes again
+    stream.connect()
+    wait_for(lambda: len(fake_redis.pubsubs) == 1)
+
+
+def test_clients_beyond_the_limit_are_refused(client, stream):
+    for _ in range(3):
+        stream.connect()
+    response = client.get('/api/stream')
+    assert response.status_code == 503
+
+
+def test_route_streams_events_and_keep_alives(client, fake_redis, stream, monkeypatch):
+    monkeypatch.setattr(routes, 'STREAM_HEARTBEAT', 0.05)
+    response = client.get('/api/stream', buffered=False)
+    chunks = response.response.__iter__()
+
+    assert response.mimetype == 'text/event-stream'
+    assert response.headers['Cache-Control'] == 'no-cache'
+    assert next(chunks) == b'retry: 5000\n\n'
+    wait_for(lambda: len(fake_redis.pubsubs) == 1)
+    assert next(chunks) == b': keep-alive\n\n'
+
+    EventBus(fake_redis).publish(DATA_UPDATED, keys=['forecast_scores'])
+    chunk = next(chunk for chunk in chunks if not chunk.startswith(b':'))
+    event, data = chunk.decode().strip().split('\n')
+    assert event == 'event: data_updated'
+    assert json.loads(data[len('data: '):])['keys'] == ['forecast_scores']
+
+    response.close()
+    assert stream.clients() == 0
+
+
+def test_streams_close_after_their_max_age(client, stream, monkeypatch):
+    monkeypatch.setattr(routes, 'STREAM_MAX_AGE', 0.1)
+    monkeypatch.setattr(routes, 'STREAM_HEARTBEAT', 0.02)
+    body = client.get('/api/stream').data
+    assert body.startswith(b'retry: 5000\n\n')
+    assert stream.clients() == 0
+
+
+def test_malformed_events_are_skipped(fake_redis, stream):
+    queue = stream.connect()
+    wait_for(lambda: len(fake_redis.pubsubs) == 1)
+    fake_redis.publish(EVENT_CHANNEL, 'not json')
+    fake_redis.publish(EVENT_CHANNEL, json.dumps({'event': DATA_UPDATED, 'keys': ['weather_data']}))
+    assert queue.get(timeout=1)['keys'] == ['weather_data']
+    stream.disconnect(queue)
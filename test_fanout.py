@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Tests for the concurrent fan-out fetch engine (app/fanout.py)
+"""
+
+import time
+
+from app.fanout import fan_out
+
+
+def test_calls_run_concurrently():
+    started = time.monotonic()
+    results, errors = fan_out({
+        'open_meteo': lambda: time.sleep(0.3) or 'weather',
+        'nws': lambda: time.sleep(0.3) or 'alerts',
+        'usgs': lambda: time.sleep(0.3) or 'water',
+    }, deadline=5)
+    elapsed = time.monotonic() - started
+    assert results == {'open_meteo': 'weather', 'nws': 'alerts', 'usgs': 'water'}
+    assert errors == {}
+    # Wall clock is the slowest call, not the sum of all three
+    assert elapsed < 0.6
+
+
+def test_partial_results_when_a_source_times_out():
+    started = time.monotonic()
+    results, errors = fan_out({
+        'fast': lambda: 'ok',
+        'slow': lambda: time.sleep(2) or 'late',
+    }, deadline=0.2)
+    assert time.monotonic() - started < 1
+    assert results == {'fast': 'ok'}
+    assert isinstance(errors['slow'], TimeoutError)
+
+
+def test_exceptions_are_reported_per_call():
+    def boom():
+        raise ValueError("upstream returned garbage")
+
+    results, errors = fan_out({'good': lambda: 1, 'bad': boom})
+    assert results == {'good': 1}
+    assert isinstance(errors['bad'], ValueError)
+
+
+def test_empty_fan_out():
+    assert fan_out({}) == ({}, {})
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Tests for the time lookups (app.forecast_index) that bisect the times of the stored score
+columns for /api/rowcast/at and /api/rowcast/forecast/<time_offset>.
+"""
+
+import time
+from datetime import datetime
+
+import pytest
+
+import app.routes as routes
+import app.tasks as tasks
+from app import create_app
+from app.columnar import columns_document
+from app.forecast_index import locate, interpolate_entry
+from app.timeseries import LOCAL_TZ, to_epoch
+from conftest import HORIZON_SCORES
+
+
+def indexes():
+    return {key: columns_document(entries) for key, entries in HORIZON_SCORES.items()}
+
+
+def at(text):
+    return to_epoch(text)
+
+
+@pytest.fixture
+def client(client):
+    tasks.store_documents(HORIZON_SCORES)
+    return client
+
+
+def test_scores_stored_out_of_order_are_found(client):
+    tasks.store_documents({'forecast_scores': list(reversed(HORIZON_SCORES['forecast_scores']))})
+    entry = client.get('/api/rowcast/at/2025-07-01T22:00').get_json()
+    assert entry['timestamp'] == '2025-07-01T22:00' and entry['score'] == 14.0
+
+
+def test_finest_covering_horizon_wins():
+    assert locate(indexes(), at('2025-07-01T09:15'))[0] == 'short_term_forecast'
+    # Past the 12-hour short-term forecast, inside the 24-hour one
+    assert locate(indexes(), at('2025-07-01T22:00'))[0] == 'forecast_scores'
+    assert locate(indexes(), at('2025-07-04T12:00'))[0] == 'extended_forecast_scores'
+
+
+def test_exact_and_between_matches():
+    key, before, after, factor = locate(indexes(), at('2025-07-01T22:00'))
+    assert (before, after) == (14, None)
+    key, before, after, factor = locate(indexes(), at('2025-07-01T22:20'))
+    assert (before, after) == (14, 15)
+    assert factor == pytest.approx(1 / 3)
+
+
+def test_out_of_range_falls_back_to_the_nearest_point():
+    key, before, after, _ = locate(indexes(), at('2025-06-30T12:00'))
+    assert after is None
+    assert HORIZON_SCORES[key][before]['timestamp'] == '2025-07-01T08:00'
+    key, before, _, _ = locate(indexes(), at('2025-07-20T12:00'))
+    assert (key, before) == ('extended_forecast_scores', 167)
+    assert locate({}, at('2025-07-01T08:00')) is None
+
+
+def test_interpolation_blends_numbers_and_keeps_the_rest():
+    entries = HORIZON_SCORES['forecast_scores']
+    target = at('2025-07-01T22:15')
+    key, before, after, factor = locate(indexes(), target)
+    assert (key, factor) == ('forecast_scores', 0.25)
+    entry = interpolate_entry(entries, before, after, factor, target)
+    assert entry['score'] == 14.25
+    assert entry['conditions'] == {'windSpeed': 28.5, 'weatherAlerts': []}
+    assert entry['timestamp'] == '2025-07-01T22:15'
+    assert entry['interpolated'] is True
+
+
+def test_at_route_reads_naive_times_as_local(client):
+    naive = client.get('/api/rowcast/at/2025-07-01T22:00:00').get_json()
+    # 22:00 EDT
+    utc = client.get('/api/rowcast/at/2025-07-02T02:00:00Z').get_json()
+    assert naive == utc
+    assert naive['label'] == 'hourly' and naive['timestamp'] == '2025-07-01T22:00'
+
+
+def test_at_route_picks_horizons_and_interpolates(client):
+    assert client.get('/api/rowcast/at/2025-07-01T09:40').get_json()['timestamp'] == '2025-07-01T09:45'
+    assert client.get('/api/rowcast/at/2025-07-05T10:00').get_json()['label'] == 'extended'
+    blended = client.get('/api/rowcast/at/2025-07-01T09:40?interpolate=true').get_json()
+    assert blended['timestamp'] == '2025-07-01T09:40'
+    assert blended['score'] == pytest.approx(6 + 2 / 3, abs=0.01)
+    assert client.get('/api/rowcast/at/tomorrow').status_code == 400
+
+
+def test_offset_route_uses_the_index(client, monkeypatch):
+    now = at('2025-07-01T10:00')
+    monkeypatch.setattr(routes, 'datetime', type('FixedDatetime', (datetime,), {
+        'now': classmethod(lambda cls, tz=None: datetime.fromtimestamp(now, tz or LOCAL_TZ))}))
+    assert client.get('/api/rowcast/forecast/30m').get_json()['timestamp'] == '2025-07-01T10:30'
+    assert client.get('/api/rowcast/forecast/1d').get_json()['label'] == 'extended'
+    assert client.get('/api/rowcast/forecast/2x').status_code == 400
+
+
+def test_missing_scores_answer_404(app_redis):
+    response = create_app(role='web').test_client().get('/api/rowcast/at/2025-07-01T10:00')
+    assert response.status_code == 404
+
+
+def test_bisection_beats_a_linear_scan():
+    entries = HORIZON_SCORES['extended_forecast_scores']
+    index = columns_document(entries)
+    targets = [at('2025-07-01T08:00') + 977 * i for i in range(500)]
+
+    def linear(target):
+        return min(entries, key=lambda entry: abs(to_epoch(entry['timestamp']) - target))
+
+    started = time.perf_counter()
+    expected = [linear(target) for target in targets]
+    scanned = time.perf_counter() - started
+    started = time.perf_counter()
+    found = [locate({'extended_forecast_scores': index}, target) for target in targets]
+    bisected = time.perf_counter() - started
+
+    for entry, (_, before, after, factor) in zip(expected, found):
+        assert entry is entries[before if after is None or factor <= 0.5 else after]
+    print(f"\n500 lookups in 168 hours: linear scan {scanned * 1000:.1f} ms, bisection {bisected * 1000:.1f} ms")
+    assert bisected < scanned
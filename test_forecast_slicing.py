@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tests for the stored column form of forecast rows (app.columnar.columns_document / select)
+and the ?fields=, ?from=, ?to= and ?step= parameters of the forecast routes.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import app.tasks as tasks
+from app.bodies import body_key
+from app.cache import ETAGS_KEY
+from app.columnar import columns_document, columns_key, select
+from app.freshness import UPDATED_AT_KEY
+from app.timeseries import to_epoch
+
+START = datetime(2025, 7, 1, 8)
+
+
+def hours(count, start=START):
+    return [(start + timedelta(hours=i)).strftime('%Y-%m-%dT%H:%M') for i in range(count)]
+
+
+def scores(count=168):
+    return [{
+        'timestamp': timestamp,
+        'score': round(5 + (i % 11) / 2, 2),
+        'noaaDataUsed': i % 3 == 0,
+        'conditions': {'windSpeed': 3.0 + i % 7, 'apparentTemp': 70.0 + i % 13, 'weatherAlerts': []},
+    } for i, timestamp in enumerate(hours(count))]
+
+
+def weather(count):
+    forecast = [{'timestamp': timestamp, 'windSpeed': 4.0 + i, 'apparentTemp': 76.0} for i, timestamp in enumerate(hours(count))]
+    return {'current': forecast[0], 'forecast': forecast}
+
+
+def test_columns_round_trip_to_the_rows():
+    rows = scores(24)
+    document = columns_document(list(reversed(rows)))
+    assert document['times'] == sorted(document['times'])
+    assert document['groups'] == {'windSpeed': 'conditions', 'apparentTemp': 'conditions', 'weatherAlerts': 'conditions'}
+    assert select(document) == rows
+
+
+def test_nested_names_shadowing_top_level_ones_are_qualified():
+    document = columns_document([{'timestamp': '2025-07-01T08:00', 'score': 5, 'conditions': {'score': 1}}])
+    assert set(document['columns']) == {'timestamp', 'score', 'conditions.score'}
+    assert select(document) == [{'timestamp': '2025-07-01T08:00', 'score': 5, 'conditions': {'score': 1}}]
+
+
+def test_select_projects_windows_and_thins():
+    document = columns_document(scores(48))
+    rows = select(document, fields=['score', 'windSpeed'],
+                  start=to_epoch('2025-07-01T10:00'), end=to_epoch('2025-07-01T20:00'), step=3 * 3600)
+    assert [row['timestamp'] for row in rows] == ['2025-07-01T10:00', '2025-07-01T13:00', '2025-07-01T16:00', '2025-07-01T19:00']
+    assert rows[0] == {'timestamp': '2025-07-01T10:00', 'score': 6.0, 'conditions': {'windSpeed': 5.0}}
+    assert set(select(document, fields=['conditions'])[0]['conditions']) == {'windSpeed', 'apparentTemp', 'weatherAlerts'}
+    with pytest.raises(ValueError):
+        select(document, fields=['nope'])
+
+
+def test_jobs_store_columns_next_to_the_documents(fake_redis, monkeypatch):
+    monkeypatch.setattr(tasks, 'redis_client', fake_redis)
+    tasks.store_documents({'extended_weather_data': weather(168), 'water_data': {'current': {}}})
+
+    columns = json.loads(fake_redis.get(columns_key('extended_weather_data')))
+    assert len(columns['times']) == 168
+    assert fake_redis.get(columns_key('water_data')) is None
+    # Tagged and stamped like any document, but never served whole
+    assert fake_redis.hgetall(ETAGS_KEY)[columns_key('extended_weather_data')]
+    assert fake_redis.get(body_key(columns_key('extended_weather_data'), 'gzip')) is None
+
+
+def test_routes_slice_the_stored_columns(client):
+    tasks.store_documents({'extended_forecast_scores': scores()})
+
+    response = client.get('/api/rowcast/forecast/extended?fields=score&from=2025-07-02T08:00&to=2025-07-03T08:00&step=6h')
+
+    assert response.status_code == 200
+    assert [row['timestamp'] for row in response.get_json()] == [
+        '2025-07-02T08:00', '2025-07-02T14:00', '2025-07-02T20:00', '2025-07-03T02:00', '2025-07-03T08:00']
+    assert set(response.get_json()[0]) == {'timestamp', 'score'}
+    assert response.headers['ETag'] == client.get('/api/rowcast/forecast/extended').headers['ETag']
+
+
+def test_simple_routes_are_projections(client, fake_redis):
+    tasks.store_documents({'forecast_scores': scores(24), 'short_term_forecast': scores(12)})
+
+    simple = client.get('/api/rowcast/forecast/simple').get_json()
+    assert simple == [{'timestamp': row['timestamp'], 'score': row['score'], 'noaaDataUsed': row['noaaDataUsed']} for row in scores(24)]
+    assert set(client.get('/api/rowcast/forecast/short-term/simple').get_json()[0]) == {'timestamp', 'score'}
+    assert len(client.get('/api/rowcast/forecast/simple?to=2025-07-01T09:00').get_json()) == 2
+    assert fake_redis.keys('*_simple*') == []
+
+
+def test_weather_and_noaa_forecast_routes(client):
+    noaa = {'current': {}, 'forecast': [{'timestamp': f'2025-07-01T{hour:02d}:00:00Z', 'discharge': 3000 + hour, 'gaugeHeight': 3.1} for hour in range(24)]}
+    tasks.store_documents({'weather_data': weather(24), 'extended_weather_data': weather(168), 'noaa_stageflow_data': noaa})
+
+    assert client.get('/api/weather/forecast?fields=windSpeed&step=12h').get_json() == [
+        {'timestamp': '2025-07-01T08:00', 'windSpeed': 4.0}, {'timestamp': '2025-07-01T20:00', 'windSpeed': 16.0}]
+    extended = client.get('/api/weather/extended?from=2025-07-05T00:00').get_json()
+    assert extended['current']['timestamp'] == '2025-07-01T08:00'
+    assert extended['forecast'][0]['timestamp'] == '2025-07-05T00:00'
+    # 12:00Z is 08:00 EDT
+    rows = client.get('/api/noaa/stageflow/forecast?fields=discharge&to=2025-07-01T08:00').get_json()
+    assert rows[-1] == {'timestamp': '2025-07-01T12:00:00Z', 'discharge': 3012}
+
+
+def test_bad_parameters_answer_400(client):
+    tasks.store_documents({'forecast_scores': scores(24)})
+    assert client.get('/api/rowcast/forecast?fields=nope').status_code == 400
+    assert client.get('/api/rowcast/forecast?from=yesterday').status_code == 400
+    assert client.get('/api/rowcast/forecast?step=3x').status_code == 400
+    assert client.get('/api/rowcast/forecast/short-term?fields=score').status_code == 404
+
+
+def test_documents_stored_before_columns_are_sliced_too(client, fake_redis):
+    fake_redis.set('forecast_scores', json.dumps(scores(24)))
+    rows = client.get('/api/rowcast/forecast?fields=score&step=12h').get_json()
+    assert [row['timestamp'] for row in rows] == ['2025-07-01T08:00', '2025-07-01T20:00']
+
+
+def test_warm_up_drops_the_retired_simple_keys(fake_redis, monkeypatch):
+    monkeypatch.setattr(tasks, 'redis_client', fake_redis)
+    fake_redis.set('forecast_scores_simple', '[]')
+    fake_redis.set(body_key('forecast_scores_simple', 'gzip'), b'x')
+    fake_redis.set('forecast_scores:body:identity', b'x')
+    fake_redis.hset(ETAGS_KEY, mapping={'forecast_scores_simple': 'abc', 'forecast_scores': 'def'})
+    fake_redis.hset(UPDATED_AT_KEY, mapping={'forecast_scores_simple': 1})
+
+    tasks.drop_retired_keys()
+
+    assert fake_redis.keys('forecast_scores*') == []
+    assert fake_redis.hgetall(ETAGS_KEY) == {'forecast_scores': 'def'}
+    assert fake_redis.hgetall(UPDATED_AT_KEY) == {}
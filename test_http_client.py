@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests and benchmark for the shared pooled HTTP client (app/http_client.py).
+Runs entirely against a local stub server - no network or Redis needed.
+
+    python -m pytest -q test_http_client.py   # tests
+    python test_http_client.py                # keep-alive vs bare requests benchmark
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from app.http_client import HTTPClient
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so the server honours keep-alive like the real upstreams do
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without TCP_NODELAY they stall on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        body = json.dumps({"path": self.path, "hourly": {"time": list(range(48))}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_connections_are_reused_per_host():
+    server, base_url = start_stub_server()
+    client = HTTPClient()
+    try:
+        for i in range(5):
+            response = client.get(f"{base_url}/forecast?i={i}")
+            assert response.status_code == 200
+            assert response.json()["path"] == f"/forecast?i={i}"
+
+        host = base_url.split("//", 1)[1]
+        stats = client.stats()[host]
+        assert stats["requests"] == 5
+        assert stats["newConnections"] == 1
+        assert stats["reusedConnections"] == 4
+        assert stats["failures"] == 0
+    finally:
+        client.close()
+        server.shutdown()
+
+
+def test_each_host_gets_its_own_pool():
+    server_a, url_a = start_stub_server()
+    server_b, url_b = start_stub_server()
+    client = HTTPClient()
+    try:
+        for _ in range(3):
+            client.get(f"{url_a}/a")
+            client.get(f"{url_b}/b")
+        stats = client.stats()
+        assert set(stats) == {url_a.split("//", 1)[1], url_b.split("//", 1)[1]}
+        for host_stats in stats.values():
+            assert host_stats["requests"] == 3
+            assert host_stats["newConnections"] == 1
+    finally:
+        client.close()
+        server_a.shutdown()
+        server_b.shutdown()
+
+
+def test_failures_are_counted():
+    client = HTTPClient(connect_timeout=0.5, read_timeout=0.5)
+    try:
+        # Nothing listens on port 9 locally
+        try:
+            client.get("http://127.0.0.1:9/")
+            assert False, "expected a connection error"
+        except requests.exceptions.RequestException:
+            pass
+        assert client.stats()["127.0.0.1:9"]["failures"] == 1
+    finally:
+        client.close()
+
+
+def benchmark(n=300):
+    """Compare bare requests.get (new connection per call) with the pooled client."""
+    server, base_url = start_stub_server()
+    client = HTTPClient()
+    try:
+        started = time.perf_counter()
+        for i in range(n):
+            requests.get(f"{base_url}/bare?i={i}", timeout=5).json()
+        bare = (time.perf_counter() - started) / n * 1000
+
+        started = time.perf_counter()
+        for i in range(n):
+            client.get(f"{base_url}/pooled?i={i}").json()
+        pooled = (time.perf_counter() - started) / n * 1000
+
+        print("=" * 60)
+        print(" HTTP CLIENT BENCHMARK (local stub server)")
+        print("=" * 60)
+        print(f"Requests per variant:     {n}")
+        print(f"bare requests.get:        {bare:.3f} ms/request")
+        print(f"pooled HTTPClient:        {pooled:.3f} ms/request")
+        print(f"speedup:                  {bare / pooled:.2f}x")
+        print(f"pool stats:               {client.stats()}")
+    finally:
+        client.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental rescoring (app.scoring.score_columns): only forecast hours whose
+input fingerprint changed go back through the scorer.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import app.scoring as scoring
+import app.tasks as tasks
+from app.columnar import select
+from app.rowcast import compute_rowcast
+
+
+def noaa_forecast(hours, tail_bump=0.0, tail_from=None):
+    start = datetime(2025, 7, 1, 12)
+    return {'forecast': [{
+        'timestamp': (start + timedelta(hours=i)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'discharge': 3000.0 + 40 * i + (tail_bump if tail_from is not None and i >= tail_from else 0),
+        'gaugeHeight': 3.0,
+    } for i in range(hours)]}
+
+
+def seed(redis, noaa):
+    start = datetime(2025, 7, 1, 8)
+    hours = [{
+        'timestamp': (start + timedelta(hours=i)).strftime('%Y-%m-%dT%H:%M'),
+        'windSpeed': 3.0 + i % 7, 'windGust': 5.0 + i % 11, 'apparentTemp': 70.0 + i % 13, 'uvIndex': 2.0,
+        'precipitation': 0.0, 'visibility': 10.0, 'lightningPotential': None, 'precipitationProbability': 10,
+        'weatherAlerts': [],
+    } for i in range(168)]
+    redis.set('extended_weather_data', json.dumps({'current': {}, 'forecast': hours}))
+    redis.set('water_data', json.dumps({'current': {'discharge': 3000, 'waterTemp': 70.0, 'gaugeHeight': 3.0}, 'historical': {}}))
+    redis.set('noaa_stageflow_data', json.dumps(noaa))
+
+
+def test_unchanged_inputs_are_not_rescored(monkeypatch, fake_redis):
+    monkeypatch.setattr(tasks, 'redis_client', fake_redis)
+    seed(fake_redis, noaa_forecast(168))
+
+    first = tasks.update_extended_forecast_scores_job()
+    stored = fake_redis.get('extended_forecast_scores')
+    second = tasks.update_extended_forecast_scores_job()
+
+    assert first == {'rescored': 168, 'skipped': 0}
+    assert second == {'rescored': 0, 'skipped': 168}
+    assert fake_redis.get('extended_forecast_scores') == stored
+
+
+def test_noaa_reissue_rescores_only_the_changed_tail(monkeypatch, fake_redis):
+    monkeypatch.setattr(tasks, 'redis_client', fake_redis)
+    seed(fake_redis, noaa_forecast(168))
+    tasks.update_extended_forecast_scores_job()
+
+    # The reissue raises flow for the last 24 NOAA hours only
+    fake_redis.set('noaa_stageflow_data', json.dumps(noaa_forecast(168, tail_bump=6000, tail_from=144)))
+    counts = tasks.update_extended_forecast_scores_job()
+
+    # 08:00 EDT is 12:00Z, so weather hour i pairs with NOAA hour i
+    assert counts == {'rescored': 24, 'skipped': 144}
+    scores = select(json.loads(fake_redis.get('extended_forecast_scores')))
+    assert all(entry['score'] == compute_rowcast(entry['conditions']) for entry in scores)
+    # The scores and their fingerprints are one document
+    assert fake_redis.keys('extended_forecast_scores_*') == []
+
+
+def test_a_new_scorer_version_rescores_everything(monkeypatch, fake_redis):
+    monkeypatch.setattr(tasks, 'redis_client', fake_redis)
+    seed(fake_redis, noaa_forecast(168))
+    tasks.update_extended_forecast_scores_job()
+
+    monkeypatch.setattr(scoring, 'SCORER_VERSION', 'changed')
+    assert tasks.update_extended_forecast_scores_job() == {'rescored': 168, 'skipped': 0}
+
+
+def test_new_timestamps_are_scored_and_old_ones_dropped():
+    def scored(timestamps, previous=None):
+        conditions = {'discharge': [3000] * len(timestamps), 'apparentTemp': [75] * len(timestamps)}
+        scores, fingerprints, rescored, skipped = scoring.score_columns(timestamps, conditions, previous)
+        document = {'columns': {'timestamp': timestamps, 'score': scores}, 'scorer': scoring.SCORER_VERSION, 'fingerprints': fingerprints}
+        return document, rescored, skipped
+
+    previous, _, _ = scored(['2025-07-01T08:00', '2025-07-01T09:00'])
+    current, rescored, skipped = scored(['2025-07-01T09:00', '2025-07-01T10:00'], previous)
+
+    assert (rescored, skipped) == (1, 1)
+    assert len(current['fingerprints']) == 2
+    assert current['columns']['score'][0] == previous['columns']['score'][1] == current['columns']['score'][1]
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for the scheduler leader lease (app.leader.LeaderLease).
+
+Runs against the in-memory FakeRedis; set ROWCAST_TEST_REDIS_URL (e.g.
+redis://localhost:6379/15) to run the same tests against a real Redis as well.
+"""
+
+import os
+import time
+
+import pytest
+import redis
+
+from app.leader import LeaderLease
+from conftest import FakeRedis
+
+REDIS_URL = os.getenv('ROWCAST_TEST_REDIS_URL')
+TEST_KEY = 'rowcast:test:leader'
+
+
+@pytest.fixture(params=['fake'] + (['redis'] if REDIS_URL else []))
+def lease_redis(request):
+    if request.param == 'fake':
+        yield FakeRedis()
+        return
+    client = redis.Redis.from_url(REDIS_URL, decode_responses=True)
+    client.delete(TEST_KEY)
+    yield client
+    client.delete(TEST_KEY)
+
+
+def make_lease(client, name, events, ttl=0.3):
+    return LeaderLease(
+        client, key=TEST_KEY, ttl=ttl, identity=name,
+        on_elected=lambda: events.append((name, 'elected')),
+        on_demoted=lambda: events.append((name, 'demoted')),
+    )
+
+
+def test_exactly_one_process_leads(lease_redis):
+    events = []
+    leases = [make_lease(lease_redis, f'node-{i}', events) for i in range(3)]
+    assert [lease.tick() for lease in leases] == [True, False, False]
+    # Heartbeats keep the same leader
+    assert [lease.tick() for lease in leases] == [True, False, False]
+    assert events == [('node-0', 'elected')]
+
+
+def test_release_hands_over_on_the_next_heartbeat(lease_redis):
+    events = []
+    first, second = make_lease(lease_redis, 'first', events), make_lease(lease_redis, 'second', events)
+    first.tick()
+    second.tick()
+
+    first.stop()
+
+    assert second.tick()
+    assert events == [('first', 'elected'), ('first', 'demoted'), ('second', 'elected')]
+
+
+def test_a_crashed_leader_is_replaced_after_the_ttl(lease_redis):
+    events = []
+    crashed, standby = make_lease(lease_redis, 'crashed', events), make_lease(lease_redis, 'standby', events)
+    crashed.tick()
+    # The leader stops heartbeating without releasing
+    assert not standby.tick()
+    time.sleep(0.35)
+    assert standby.tick()
+
+
+def test_a_leader_that_lost_its_key_steps_down(lease_redis):
+    events = []
+    slow, fast = make_lease(lease_redis, 'slow', events), make_lease(lease_redis, 'fast', events)
+    slow.tick()
+    # The lease expired while the leader was stalled and someone else took it
+    lease_redis.delete(TEST_KEY)
+    fast.tick()
+
+    assert not slow.tick()
+    assert events == [('slow', 'elected'), ('fast', 'elected'), ('slow', 'demoted')]
+    # Releasing must not delete the new leader's key
+    slow.stop()
+    assert lease_redis.get(TEST_KEY) == 'fast'
+
+
+class FlakyRedis(FakeRedis):
+    def __init__(self):
+        super().__init__()
+        self.down = False
+
+    def eval(self, *args):
+        if self.down:
+            raise redis.exceptions.ConnectionError('Redis is down')
+        return super().eval(*args)
+
+
+def test_redis_outage_keeps_the_lease_only_until_it_would_expire():
+    events = []
+    client = FlakyRedis()
+    lease = make_lease(client, 'node', events, ttl=0.2)
+    lease.tick()
+    client.down = True
+
+    assert lease.tick()
+    time.sleep(0.25)
+    assert not lease.tick()
+    assert events == [('node', 'elected'), ('node', 'demoted')]
+
+
+def test_heartbeat_thread_renews_the_lease(lease_redis):
+    events = []
+    lease = make_lease(lease_redis, 'node', events, ttl=0.3)
+    other = make_lease(lease_redis, 'other', events, ttl=0.3)
+    lease.start()
+    try:
+        time.sleep(0.8)
+        assert lease.is_leader
+        assert not other.tick()
+    finally:
+        lease.stop()
+    assert other.tick()
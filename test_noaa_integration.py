@@ -102,6 +102,7 @@ def test_task_functions():
             update_extended_forecast_scores_job
         )
         from app.extensions import redis_client
+        from app.columnar import as_rows
         
         # Test NOAA stageflow job
         print("Testing update_noaa_stageflow_job()...")
@@ -138,7 +139,7 @@ def test_task_functions():
         # Check if scores were calculated and stored
         extended_scores_str = redis_client.get('extended_forecast_scores')
         if extended_scores_str:
-            extended_scores = json.loads(extended_scores_str)
+            extended_scores = as_rows(json.loads(extended_scores_str))
             print(f"✓ Extended forecast scores calculated and stored")
             print(f"✓ Extended forecast score points: {len(extended_scores)}")
             
@@ -227,13 +228,14 @@ def test_forecast_integration():
     
     try:
         from app.extensions import redis_client
+        from app.columnar import as_rows
         
         # Get forecast scores and check for NOAA integration
         forecast_scores_str = redis_client.get('forecast_scores')
         extended_scores_str = redis_client.get('extended_forecast_scores')
         
         if forecast_scores_str:
-            forecast_scores = json.loads(forecast_scores_str)
+            forecast_scores = as_rows(json.loads(forecast_scores_str))
             noaa_regular = sum(1 for score in forecast_scores if score.get('noaaDataUsed'))
             print(f"✓ Regular forecast scores: {len(forecast_scores)} total, {noaa_regular} using NOAA data")
         else:
@@ -241,7 +243,7 @@ def test_forecast_integration():
             return False
         
         if extended_scores_str:
-            extended_scores = json.loads(extended_scores_str)
+            extended_scores = as_rows(json.loads(extended_scores_str))
             noaa_extended = sum(1 for score in extended_scores if score.get('noaaDataUsed'))
             print(f"✓ Extended forecast scores: {len(extended_scores)} total, {noaa_extended} using NOAA data")
             
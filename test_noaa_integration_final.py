@@ -80,14 +80,15 @@ def test_timestamp_matching():
     try:
         from app.tasks import update_forecast_scores_job
         from app.extensions import redis_client
+        from app.columnar import as_rows
         
         # Run forecast job to generate scores with NOAA data
         update_forecast_scores_job()
         
         # Check results
-        forecast_scores_str = redis_client.get('forecast_scores_simple')
+        forecast_scores_str = redis_client.get('forecast_scores')
         if forecast_scores_str:
-            forecast_scores = json.loads(forecast_scores_str)
+            forecast_scores = as_rows(json.loads(forecast_scores_str))
             noaa_count = sum(1 for score in forecast_scores if score.get('noaaDataUsed'))
             total_count = len(forecast_scores)
             utilization = (noaa_count / total_count * 100) if total_count > 0 else 0
@@ -114,13 +115,13 @@ def test_redis_data_storage():
     print("💾 Testing Redis Data Storage...")
     try:
         from app.extensions import redis_client
+        from app.columnar import as_rows
         
         # Check all new Redis keys
         keys_to_check = [
             'noaa_stageflow_data',
             'extended_weather_data', 
-            'extended_forecast_scores',
-            'extended_forecast_scores_simple'
+            'extended_forecast_scores'
         ]
         
         results = {}
@@ -128,6 +129,9 @@ def test_redis_data_storage():
             data = redis_client.get(key)
             if data:
                 parsed_data = json.loads(data)
+                if key == 'extended_forecast_scores':
+                    # Scores are stored as columns
+                    parsed_data = as_rows(parsed_data)
                 if isinstance(parsed_data, dict):
                     size = len(parsed_data.get('forecast', []))
                 elif isinstance(parsed_data, list):
@@ -143,7 +147,7 @@ def test_redis_data_storage():
         success_count = sum(1 for v in results.values() if v > 0)
         print(f"   ✓ Data storage success: {success_count}/{len(keys_to_check)} keys populated")
         
-        return success_count >= 3  # At least 3 of 4 keys should have data
+        return success_count >= 3  # All 3 keys should have data
         
     except Exception as e:
         print(f"   ✗ Redis data storage test failed: {e}")
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Parity tests and benchmark for the merge-pass NOAA interpolation engine
+(app/timeseries.py, app.fetchers.fetch_noaa_stageflow_forecast)
+
+    python -m pytest -q test_noaa_interpolation.py
+    python test_noaa_interpolation.py               # old per-hour scan vs merge pass
+"""
+
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import app.fetchers as fetchers
+
+
+def legacy_interpolate(forecast_data, target_time):
+    """The per-hour scan used before the merge-pass engine."""
+    before_point = None
+    after_point = None
+    target_timestamp = target_time.timestamp()
+    for point in forecast_data:
+        point_time = datetime.fromisoformat(point['validTime'].replace('Z', '+00:00')).timestamp()
+        if point_time <= target_timestamp:
+            before_point = point
+        elif point_time > target_timestamp and after_point is None:
+            after_point = point
+            break
+    if not before_point or not after_point:
+        if not before_point and after_point:
+            return {'stage': after_point.get('primary'), 'flow': after_point.get('secondary')}
+        elif before_point and not after_point:
+            return {'stage': before_point.get('primary'), 'flow': before_point.get('secondary')}
+        return None
+    before_timestamp = datetime.fromisoformat(before_point['validTime'].replace('Z', '+00:00')).timestamp()
+    after_timestamp = datetime.fromisoformat(after_point['validTime'].replace('Z', '+00:00')).timestamp()
+    factor = (target_timestamp - before_timestamp) / (after_timestamp - before_timestamp)
+    stage = flow = None
+    if before_point.get('primary') is not None and after_point.get('primary') is not None:
+        stage = before_point['primary'] + factor * (after_point['primary'] - before_point['primary'])
+    if before_point.get('secondary') is not None and after_point.get('secondary') is not None:
+        flow = before_point['secondary'] + factor * (after_point['secondary'] - before_point['secondary'])
+    return {'stage': stage, 'flow': flow}
+
+
+def legacy_hourly(forecast_data):
+    sorted_forecast = sorted(forecast_data, key=lambda x: x.get('validTime', ''))
+    start_time = datetime.fromisoformat(sorted_forecast[0]['validTime'].replace('Z', '+00:00'))
+    end_time = datetime.fromisoformat(sorted_forecast[-1]['validTime'].replace('Z', '+00:00'))
+    current_hour = start_time.replace(minute=0, second=0, microsecond=0)
+    out = []
+    while current_hour <= end_time:
+        values = legacy_interpolate(sorted_forecast, current_hour)
+        out.append({
+            'timestamp': current_hour.isoformat().replace('+00:00', 'Z'),
+            'gaugeHeight': values['stage'],
+            'discharge': values['flow'] * 1000 if values['flow'] else None,
+            'source': 'noaa_nwps_interpolated'
+        })
+        current_hour += timedelta(hours=1)
+    return out
+
+
+def make_forecast(points=40, seed=3, with_gaps=True):
+    """NWPS-style forecast points every 6 hours, starting off the hour."""
+    rng = random.Random(seed)
+    start = datetime(2025, 7, 1, 12, 30, tzinfo=timezone.utc)
+    data = []
+    for i in range(points):
+        stage = round(rng.uniform(2.5, 6.0), 2)
+        flow = round(rng.uniform(1.5, 14.0), 2)
+        if with_gaps and i % 9 == 4:
+            flow = None
+        data.append({
+            'validTime': (start + timedelta(hours=6 * i)).isoformat().replace('+00:00', 'Z'),
+            'primary': stage,
+            'secondary': flow,
+        })
+    rng.shuffle(data)  # NWPS order is not guaranteed; the fetcher sorts
+    return data
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+def fetch_with(monkeypatch, forecast_data, **kwargs):
+    payload = {'observed': {'data': []}, 'forecast': {'data': forecast_data}}
+
+    class Client:
+        def get_conditional(self, url, use_validators=True, **kw):
+            return FakeResponse(payload)
+
+        def remember_validators(self, url, response):
+            pass
+
+    monkeypatch.setattr(fetchers, 'http_client', Client())
+    return fetchers.fetch_noaa_stageflow_forecast(**kwargs)
+
+
+def test_hourly_output_matches_the_legacy_scan(monkeypatch):
+    forecast_data = make_forecast()
+    result = fetch_with(monkeypatch, forecast_data)
+    assert result['forecast'] == legacy_hourly(forecast_data)
+    assert result['forecast'][0]['timestamp'] == '2025-07-01T12:00:00Z'
+
+
+def test_finer_resolutions_cost_nothing_extra_per_point(monkeypatch):
+    forecast_data = make_forecast(points=5, with_gaps=False)
+    hourly = fetch_with(monkeypatch, forecast_data)['forecast']
+    quarter = fetch_with(monkeypatch, forecast_data, resolution_minutes=15)['forecast']
+    five = fetch_with(monkeypatch, forecast_data, resolution_minutes=5)['forecast']
+
+    # Points run 12:30 -> 12:30 the next day; every grid starts on the hour
+    assert len(hourly) == 25
+    assert len(quarter) == 24 * 4 + 3
+    assert len(five) == 24 * 12 + 7
+    # Every hourly value is reproduced exactly on the finer grids
+    by_time = {row['timestamp']: row for row in five}
+    for row in hourly:
+        assert by_time[row['timestamp']] == row
+    assert quarter[1]['timestamp'] == '2025-07-01T12:15:00Z'
+
+
+def test_single_point_wrapper_matches_legacy():
+    forecast_data = sorted(make_forecast(), key=lambda x: x['validTime'])
+    for hours in (-5, 0, 0.5, 7, 100, 400):
+        target = datetime(2025, 7, 1, 12, 30, tzinfo=timezone.utc) + timedelta(hours=hours)
+        assert fetchers.interpolate_forecast_values(forecast_data, target) == legacy_interpolate(forecast_data, target)
+
+
+def benchmark(points=60, iterations=20):
+    forecast_data = make_forecast(points=points)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        legacy_hourly(forecast_data)
+    legacy = (time.perf_counter() - started) / iterations * 1000
+
+    sorted_forecast = sorted(forecast_data, key=lambda x: x['validTime'])
+    started = time.perf_counter()
+    for _ in range(iterations):
+        point_times = [fetchers.to_epoch(p['validTime']) for p in sorted_forecast]
+        targets = fetchers.time_grid(point_times[0], point_times[-1], 3600)
+        fetchers.interpolate_series(point_times, {
+            'stage': [p.get('primary') for p in sorted_forecast],
+            'flow': [p.get('secondary') for p in sorted_forecast],
+        }, targets)
+    merged = (time.perf_counter() - started) / iterations * 1000
+
+    print("=" * 60)
+    print(f" NOAA INTERPOLATION BENCHMARK ({points} points, {len(targets)} hours)")
+    print("=" * 60)
+    print(f"per-hour scan:   {legacy:.3f} ms")
+    print(f"merge pass:      {merged:.3f} ms  ({legacy / merged:.1f}x)")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for the NWS points/alerts caching in app/fetchers.py and app/cache.py
+"""
+
+import app.fetchers as fetchers
+from app.cache import TwoTierCache
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class CountingNWS:
+    """Answers api.weather.gov points/alerts URLs and counts the calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, timeout=None, **kwargs):
+        self.calls.append(url)
+        if '/points/' in url:
+            return FakeResponse({'properties': {
+                'forecastZone': 'https://api.weather.gov/zones/forecast/PAZ071',
+                'county': 'https://api.weather.gov/zones/county/PAC045',
+            }})
+        return FakeResponse({'features': [{'properties': {
+            'event': 'Heat Advisory', 'severity': 'Moderate', 'urgency': 'Expected',
+            'onset': '2025-07-01T12:00:00-04:00', 'expires': '2025-07-01T20:00:00-04:00',
+        }}]})
+
+    def get_conditional(self, url, use_validators=True, timeout=None, **kwargs):
+        return self.get(url, timeout=timeout, **kwargs)
+
+    def remember_validators(self, url, response):
+        pass
+
+
+def test_points_and_alerts_are_fetched_once_per_cycle(monkeypatch, fake_redis):
+    nws = CountingNWS()
+    monkeypatch.setattr(fetchers, 'http_client', nws)
+    monkeypatch.setattr(fetchers, 'nws_cache', TwoTierCache(fake_redis, prefix='nws'))
+
+    first = fetchers.fetch_weather_alerts(39.8682, -75.5916)
+    second = fetchers.fetch_weather_alerts(39.8682, -75.5916)
+
+    assert first == second
+    assert first[0]['type'] == 'Heat Advisory'
+    assert len(nws.calls) == 2  # one points lookup, one zone alert fetch
+    assert fetchers.fetch_nws_point(39.8682, -75.5916) == {'zone': 'PAZ071', 'county': 'PAC045'}
+
+
+def test_other_processes_reuse_the_redis_tier(monkeypatch, fake_redis):
+    nws = CountingNWS()
+    monkeypatch.setattr(fetchers, 'http_client', nws)
+    monkeypatch.setattr(fetchers, 'nws_cache', TwoTierCache(fake_redis, prefix='nws'))
+    fetchers.fetch_weather_alerts(39.8682, -75.5916)
+
+    # A fresh in-process tier (another gunicorn worker) sharing the same Redis
+    monkeypatch.setattr(fetchers, 'nws_cache', TwoTierCache(fake_redis, prefix='nws'))
+    fetchers.fetch_weather_alerts(39.8682, -75.5916)
+
+    assert len(nws.calls) == 2
+    assert fake_redis.pttl('nws:points:39.8682,-75.5916') > 6 * 24 * 3600 * 1000
+
+
+def test_expired_alerts_are_refetched_but_points_are_not(monkeypatch, fake_redis):
+    nws = CountingNWS()
+    cache = TwoTierCache(fake_redis, prefix='nws')
+    monkeypatch.setattr(fetchers, 'http_client', nws)
+    monkeypatch.setattr(fetchers, 'nws_cache', cache)
+    fetchers.fetch_weather_alerts(39.8682, -75.5916)
+
+    cache.invalidate('alerts:PAZ071')
+    fetchers.fetch_weather_alerts(39.8682, -75.5916)
+
+    assert [url.split('/')[3] for url in nws.calls] == ['points', 'alerts', 'alerts']
+
+
+def test_failed_lookups_are_not_cached(monkeypatch, fake_redis):
+    class Down:
+        def get(self, url, timeout=None, **kwargs):
+            raise ConnectionError("api.weather.gov unreachable")
+
+        get_conditional = get
+
+    monkeypatch.setattr(fetchers, 'http_client', Down())
+    monkeypatch.setattr(fetchers, 'nws_cache', TwoTierCache(fake_redis, prefix='nws'))
+
+    assert fetchers.fetch_weather_alerts(39.8682, -75.5916) == []
+    assert fake_redis.keys('nws:*') == []
+
+
+def test_points_without_a_zone_are_not_cached(monkeypatch, fake_redis):
+    nws = CountingNWS()
+    answers = iter([{'properties': {'forecastZone': None}}])
+    real_get = nws.get
+
+    def flaky_get(url, timeout=None, **kwargs):
+        if '/points/' in url:
+            nws.calls.append(url)
+            payload = next(answers, None)
+            if payload is not None:
+                return FakeResponse(payload)
+        return real_get(url, timeout=timeout, **kwargs)
+
+    nws.get = flaky_get
+    monkeypatch.setattr(fetchers, 'http_client', nws)
+    monkeypatch.setattr(fetchers, 'nws_cache', TwoTierCache(fake_redis, prefix='nws'))
+
+    assert fetchers.fetch_weather_alerts(39.8682, -75.5916) == []
+    assert fake_redis.keys('nws:points:*') == []
+    # The next cycle looks the point up again and gets its alerts
+    assert fetchers.fetch_weather_alerts(39.8682, -75.5916)[0]['type'] == 'Heat Advisory'
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests that the 24-hour, 7-day and 15-minute weather views are all sliced
+from a single Open-Meteo request (app.fetchers.fetch_open_meteo_bundle)
+"""
+
+from datetime import datetime, timedelta
+
+import app.fetchers as fetchers
+
+HOURLY_FIELDS = [
+    'temperature_2m', 'apparent_temperature', 'wind_speed_10m', 'wind_direction_10m',
+    'wind_gusts_10m', 'precipitation', 'uv_index', 'visibility',
+    'precipitation_probability', 'lightning_potential',
+]
+MINUTELY_FIELDS = [
+    'temperature_2m', 'apparent_temperature', 'wind_speed_10m', 'wind_direction_10m',
+    'wind_gusts_10m', 'precipitation', 'precipitation_probability', 'visibility',
+]
+
+
+def make_payload(hours=168, intervals=12):
+    start = datetime(2025, 7, 1)
+    hourly = {'time': [(start + timedelta(hours=i)).strftime('%Y-%m-%dT%H:%M') for i in range(hours)]}
+    for n, field in enumerate(HOURLY_FIELDS):
+        hourly[field] = [float(n + i % 24) for i in range(hours)]
+    minutely = {'time': [(start + timedelta(minutes=15 * i)).strftime('%Y-%m-%dT%H:%M') for i in range(intervals)]}
+    for n, field in enumerate(MINUTELY_FIELDS):
+        minutely[field] = [float(n + i) for i in range(intervals)]
+    current = {
+        'time': '2025-07-01T00:00', 'temperature_2m': 75.0, 'apparent_temperature': 77.0,
+        'wind_speed_10m': 4.0, 'wind_direction_10m': 180, 'wind_gusts_10m': 8.0,
+        'precipitation': 0.0, 'uv_index': 3.0, 'visibility': 24140.0,
+    }
+    return {'current': current, 'hourly': hourly, 'minutely_15': minutely}
+
+
+def test_one_request_feeds_every_view(monkeypatch):
+    urls = []
+
+    def fake_get_json(url, **kwargs):
+        urls.append(url)
+        return make_payload()
+
+    monkeypatch.setattr(fetchers, '_get_json', fake_get_json)
+    monkeypatch.setattr(fetchers, 'fetch_weather_alerts', lambda lat, lon: [])
+
+    bundle = fetchers.fetch_open_meteo_bundle()
+
+    assert len(urls) == 1
+    assert 'minutely_15=' in urls[0] and 'hourly=' in urls[0] and 'current=' in urls[0]
+    assert 'forecast_days=7' in urls[0]
+
+    weather, extended, short_term = bundle['weather'], bundle['extended'], bundle['shortTerm']
+    assert len(extended['forecast']) == 168
+    assert weather['forecast'].rows() == extended['forecast'].rows(stop=24)
+    assert weather['current'] == extended['current']
+    assert extended['forecastDays'] == 7
+    assert len(short_term['forecast']) == 12
+    intervals = short_term['forecast'].rows()
+    assert intervals[1]['timestamp'] == '2025-07-01T00:15'
+    assert intervals[0]['uvIndex'] == 0
+
+
+def test_hourly_rows_keep_missing_fields_as_none():
+    payload = make_payload(hours=3)
+    del payload['hourly']['lightning_potential']
+    payload['hourly']['uv_index'] = payload['hourly']['uv_index'][:1]
+
+    rows = fetchers.build_hourly_forecast(payload['hourly'], alerts=[]).rows()
+
+    assert [row['lightningPotential'] for row in rows] == [None, None, None]
+    assert [row['uvIndex'] for row in rows] == [6.0, None, None]
+    assert rows[0]['windDir'] == 'N (3°)'
+
+
+def test_short_term_refresh_requests_only_the_15_minute_view(monkeypatch):
+    urls = []
+
+    def fake_get_json(url, **kwargs):
+        urls.append(url)
+        return make_payload()
+
+    monkeypatch.setattr(fetchers, '_get_json', fake_get_json)
+    monkeypatch.setattr(fetchers, 'fetch_weather_alerts', lambda lat, lon: [])
+
+    short_term = fetchers.fetch_open_meteo_short_term()
+
+    assert 'minutely_15=' in urls[0] and 'hourly=' not in urls[0] and 'current=' not in urls[0]
+    bundled = fetchers.fetch_open_meteo_bundle()['shortTerm']
+    assert short_term['forecast'].rows() == bundled['forecast'].rows()
+    assert {**short_term, 'forecast': None} == {**bundled, 'forecast': None}
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Tests for the pre-encoded response bodies (app.bodies): the jobs store each served document
+as identity/gzip(/brotli) bytes and the routes send them as-is for the client's Accept-Encoding.
+"""
+
+import gzip
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+import app.bodies as bodies
+import app.routes as routes
+import app.tasks as tasks
+from app.columnar import columns_document, columns_key
+
+
+def extended_scores(hours=168):
+    start = datetime(2025, 7, 1, 8)
+    return [{
+        'timestamp': (start + timedelta(hours=i)).strftime('%Y-%m-%dT%H:%M'),
+        'score': round(5 + (i % 11) / 2, 2),
+        'noaaDataUsed': i % 3 == 0,
+        'conditions': {
+            'windSpeed': 3.0 + i % 7, 'windGust': 5.0 + i % 11, 'apparentTemp': 70.0 + i % 13, 'uvIndex': 2.0,
+            'precipitation': 0.0, 'discharge': 3000 + 40 * i, 'waterTemp': 71.5, 'gaugeHeight': 3.1,
+            'visibility': 10.0, 'lightningPotential': None, 'precipitationProbability': 10, 'weatherAlerts': [],
+        },
+    } for i in range(hours)]
+
+
+def test_stored_body_matches_what_jsonify_would_send(client, fake_redis, monkeypatch):
+    scores = extended_scores()
+    fake_redis.set('extended_forecast_scores', bodies.serialize(scores).decode())
+    with monkeypatch.context() as patched:
+        patched.setattr(routes, 'stored_body', lambda key: None)
+        rebuilt = client.get('/api/rowcast/forecast/extended')
+
+    tasks.store_documents({'extended_forecast_scores': scores})
+    stored = client.get('/api/rowcast/forecast/extended', headers={'Accept-Encoding': 'gzip'})
+
+    assert stored.status_code == rebuilt.status_code == 200
+    assert gzip.decompress(stored.data) == rebuilt.data.rstrip(b'\n')
+    assert stored.mimetype == 'application/json'
+    assert 'Accept-Encoding' in stored.headers['Vary']
+
+
+def test_gzip_clients_get_the_stored_gzip_body(client):
+    scores = extended_scores()
+    tasks.store_documents({'forecast_scores': scores})
+
+    response = client.get('/api/rowcast/forecast', headers={'Accept-Encoding': 'gzip, deflate'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.data) == bodies.serialize(scores)
+    assert int(response.headers['Content-Length']) == len(response.data)
+
+
+def test_refused_encodings_are_not_sent(client):
+    tasks.store_documents({'forecast_scores': extended_scores(24)})
+    response = client.get('/api/rowcast/forecast', headers={'Accept-Encoding': 'gzip;q=0, br;q=0'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_json()[0]['timestamp'] == '2025-07-01T08:00'
+
+
+def test_brotli_bodies_when_installed(client, monkeypatch):
+    brotli = pytest.importorskip('brotli')
+    scores = extended_scores()
+    tasks.store_documents({'forecast_scores': scores})
+    response = client.get('/api/rowcast/forecast', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert brotli.decompress(response.data) == bodies.serialize(scores)
+
+
+def test_without_brotli_stale_br_bodies_are_dropped(monkeypatch, fake_redis):
+    fake_redis.set(bodies.body_key('forecast_scores', 'br'), b'old')
+    monkeypatch.setattr(bodies, 'brotli', None)
+    pipe = fake_redis.pipeline()
+    bodies.store_bodies(pipe, 'forecast_scores', [{'score': 5}])
+    pipe.execute()
+    assert fake_redis.get(bodies.body_key('forecast_scores', 'br')) is None
+    assert gzip.decompress(fake_redis.get(bodies.body_key('forecast_scores', 'gzip'))) == b'[{"score":5}]'
+
+
+def test_served_documents_are_their_own_identity_body(client, fake_redis):
+    water = {'current': {'discharge': 3000, 'waterTemp': 71.5}, 'historical': {}}
+    tasks.store_documents({'water_data': water})
+    assert bodies.body_key('water_data', 'identity') == 'water_data'
+    assert fake_redis.get('water_data').encode() == bodies.serialize(water)
+    response = client.get('/api/water')
+    assert response.data == bodies.serialize(water) and 'Content-Encoding' not in response.headers
+
+
+def test_scores_are_stored_once_in_column_form(client, fake_redis):
+    scores = extended_scores(24)
+    tasks.store_documents({'forecast_scores': scores})
+    assert json.loads(fake_redis.get('forecast_scores')) == columns_document(scores)
+    assert [key for key in fake_redis.keys('forecast_scores*') if ':body:' not in key] == ['forecast_scores']
+    # Identity responses are rebuilt from the columns
+    response = client.get('/api/rowcast/forecast')
+    assert response.get_json() == scores and 'Content-Encoding' not in response.headers
+
+
+def test_empty_documents_still_answer_404(client):
+    tasks.store_documents({'short_term_forecast': extended_scores(12)})
+    tasks.store_documents({'short_term_forecast': []})
+    response = client.get('/api/rowcast/forecast/short-term', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 404
+
+
+def test_column_documents_get_no_body(fake_redis, monkeypatch):
+    monkeypatch.setattr(tasks, 'redis_client', fake_redis)
+    tasks.store_documents({columns_key('weather_data'): columns_document([])})
+    assert fake_redis.keys('*:body:*') == []
+
+
+def test_stored_bodies_skip_the_per_request_serialization(client, fake_redis, monkeypatch):
+    scores = extended_scores()
+    fake_redis.set('extended_forecast_scores', bodies.serialize(scores).decode())
+
+    def timed(requests=50):
+        started = time.perf_counter()
+        for _ in range(requests):
+            assert client.get('/api/rowcast/forecast/extended', headers={'Accept-Encoding': 'gzip'}).status_code == 200
+        return time.perf_counter() - started
+
+    with monkeypatch.context() as patched:
+        patched.setattr(routes, 'stored_body', lambda key: None)
+        rebuilt = timed()
+    tasks.store_documents({'extended_forecast_scores': scores})
+    stored = timed()
+    print(f"\n/api/rowcast/forecast/extended x50: jsonify {rebuilt * 1000:.1f} ms, stored body {stored * 1000:.1f} ms")
+    assert stored < rebuilt
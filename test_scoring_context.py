@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for the pipelined scoring inputs (app.scoring.ScoringContext): each scoring job should
+read Redis once, not once per forecast hour.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import app.tasks as tasks
+from app.columnar import select
+from app.scoring import ScoringContext
+from conftest import FakeRedis
+
+
+class CountingRedis(FakeRedis):
+    """FakeRedis that records every command sent to the server (a pipeline counts once)."""
+
+    def __init__(self):
+        super().__init__()
+        self.commands = []
+
+    def get(self, key):
+        self.commands.append('get')
+        return super().get(key)
+
+    def mget(self, keys):
+        self.commands.append('mget')
+        return [FakeRedis.get(self, key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        pipe = super().pipeline(transaction)
+        execute = pipe.execute
+
+        def counted_execute():
+            self.commands.append('pipeline')
+            return execute()
+        pipe.execute = counted_execute
+        return pipe
+
+
+def hourly_forecast(hours):
+    start = datetime(2025, 7, 1, 8)
+    return [{
+        'timestamp': (start + timedelta(hours=i)).strftime('%Y-%m-%dT%H:%M'),
+        'windSpeed': 4.0, 'windGust': 6.0, 'apparentTemp': 75.0, 'uvIndex': 3.0, 'precipitation': 0.0,
+        'visibility': 10.0, 'lightningPotential': None, 'precipitationProbability': 10, 'weatherAlerts': [],
+    } for i in range(hours)]
+
+
+def seed(redis):
+    redis.set('weather_data', json.dumps({'current': {}, 'forecast': hourly_forecast(24)}))
+    redis.set('extended_weather_data', json.dumps({'current': {}, 'forecast': hourly_forecast(168)}))
+    redis.set('short_term_weather_data', json.dumps({'forecast': hourly_forecast(12)}))
+    redis.set('water_data', json.dumps({
+        'current': {'discharge': 3000, 'waterTemp': 70.0, 'gaugeHeight': 3.2},
+        'historical': {'waterTemp': [
+            {'timestamp': '2025-07-01T11:45:00.000-04:00', 'value': 69.8},
+            {'timestamp': '2025-07-01T12:00:00.000-04:00', 'value': 70.0},
+        ]},
+    }))
+    redis.set('noaa_stageflow_data', json.dumps({'forecast': [
+        {'timestamp': '2025-07-01T12:00:00Z', 'discharge': 3100.0, 'gaugeHeight': 3.3},
+    ]}))
+    redis.commands = []
+
+
+def test_extended_job_reads_redis_once(monkeypatch):
+    redis = CountingRedis()
+    seed(redis)
+    monkeypatch.setattr(tasks, 'redis_client', redis)
+
+    tasks.update_extended_forecast_scores_job()
+
+    assert redis.commands == ['mget', 'pipeline']
+    scores = select(json.loads(redis.get('extended_forecast_scores')))
+    assert len(scores) == 168
+    # Water temperature is still extrapolated from the history for every hour
+    assert all(entry['conditions']['waterTemp'] is not None for entry in scores)
+    assert scores[0]['noaaDataUsed'] and scores[0]['conditions']['discharge'] == 3100.0
+    assert not scores[5]['noaaDataUsed'] and scores[5]['conditions']['discharge'] == 3000
+
+
+def test_jobs_reuse_a_shared_context(monkeypatch):
+    redis = CountingRedis()
+    seed(redis)
+    monkeypatch.setattr(tasks, 'redis_client', redis)
+
+    context = ScoringContext.load(redis)
+    tasks.update_forecast_scores_job(context)
+    tasks.update_extended_forecast_scores_job(context)
+    tasks.update_short_term_forecast_job(context)
+
+    assert redis.commands == ['mget', 'pipeline', 'pipeline', 'pipeline']
+    assert len(json.loads(redis.get('forecast_scores'))['times']) == 24
+    assert len(json.loads(redis.get('short_term_forecast'))['times']) == 12
+
+
+def test_missing_and_corrupt_keys_decode_to_none(fake_redis):
+    fake_redis.set('weather_data', '{not json')
+    context = ScoringContext.load(fake_redis, ('weather_data', 'water_data'))
+    assert context.weather is None and context.water is None
+
+
+def test_forecast_job_skips_without_water_data(monkeypatch, capsys):
+    redis = CountingRedis()
+    seed(redis)
+    redis.delete('water_data')
+    monkeypatch.setattr(tasks, 'redis_client', redis)
+
+    tasks.update_forecast_scores_job()
+
+    assert redis.commands == ['mget']
+    assert 'Missing weather or water data' in capsys.readouterr().out
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests and micro-benchmark for the NOAA-to-weather merge join (app.timeseries.nearest_join,
+app.tasks.match_noaa_forecast)
+
+    python -m pytest -q test_timeseries_join.py
+    python test_timeseries_join.py                # old per-hour scan vs merge join, 168 hours
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+
+from app.tasks import match_noaa_forecast
+from app.timeseries import nearest_join, to_epoch
+
+
+def legacy_nearest(left_times, right_times, tolerance):
+    """Brute-force reference: nearest right point per left point, earlier point on ties."""
+    matches = []
+    for target in left_times:
+        best, best_diff = None, float('inf')
+        for index, point in enumerate(right_times):
+            diff = abs(target - point)
+            if diff < best_diff and diff <= tolerance:
+                best, best_diff = index, diff
+        matches.append(best)
+    return matches
+
+
+def noaa_forecast(start_utc, hours, step_minutes=60):
+    return {'forecast': [
+        {'timestamp': (start_utc + timedelta(minutes=step_minutes * i)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+         'discharge': 3000 + i, 'gaugeHeight': 3.0 + i / 100}
+        for i in range(hours * 60 // step_minutes + 1)
+    ]}
+
+
+def weather_hours(start_local, hours):
+    return [{'timestamp': (start_local + timedelta(hours=i)).strftime('%Y-%m-%dT%H:%M')} for i in range(hours)]
+
+
+def hour_times(forecast_hours):
+    return [to_epoch(hour['timestamp']) for hour in forecast_hours]
+
+
+def test_nearest_join_matches_brute_force():
+    rng = random.Random(10)
+    for _ in range(200):
+        left = sorted(rng.uniform(0, 50000) for _ in range(rng.randint(0, 40)))
+        right = sorted({rng.choice([rng.uniform(0, 50000), 3600.0 * rng.randint(0, 13)]) for _ in range(rng.randint(0, 40))})
+        tolerance = rng.choice([0, 900, 3600])
+        assert nearest_join(left, right, tolerance) == legacy_nearest(left, right, tolerance)
+
+
+def test_ties_go_to_the_earlier_point_and_tolerance_is_inclusive():
+    assert nearest_join([1800], [0, 3600], 3600) == [0]
+    assert nearest_join([0, 7200, 10801], [3600], 3600) == [0, 0, None]
+    assert nearest_join([5], [], 3600) == [None]
+
+
+def test_naive_timestamps_are_new_york_local_time():
+    # EDT in summer, EST in winter
+    assert to_epoch('2025-07-01T08:00') == to_epoch('2025-07-01T12:00:00Z')
+    assert to_epoch('2025-01-15T07:00') == to_epoch('2025-01-15T12:00:00Z')
+    assert to_epoch('2025-07-01T12:00:00+00:00') == to_epoch('2025-07-01T12:00:00Z')
+
+
+def test_local_weather_hours_pair_with_the_same_utc_instant():
+    noaa = noaa_forecast(datetime(2025, 7, 1, 12), hours=48)
+    hours = weather_hours(datetime(2025, 7, 1, 8), 24)
+    matches = match_noaa_forecast(hour_times(hours), noaa)
+    # 08:00 EDT is 12:00 UTC, the first NOAA point
+    assert matches[0]['timestamp'] == '2025-07-01T12:00:00Z'
+    assert matches[23]['timestamp'] == '2025-07-02T11:00:00Z'
+
+
+def test_hours_outside_the_noaa_range_get_none():
+    noaa = noaa_forecast(datetime(2025, 7, 1, 12), hours=6, step_minutes=360)
+    hours = weather_hours(datetime(2025, 7, 1, 6), 16)
+    matches = match_noaa_forecast(hour_times(hours), noaa)
+    # 06:00 EDT is 10:00 UTC: two hours before the first point
+    assert matches[0] is None
+    assert matches[1]['timestamp'] == '2025-07-01T12:00:00Z'
+    assert [m['timestamp'] if m else None for m in matches[2:5]] == ['2025-07-01T12:00:00Z', '2025-07-01T12:00:00Z', None]
+    assert match_noaa_forecast(hour_times(hours), None) == [None] * 16
+
+
+def legacy_match(forecast_hours, noaa_stageflow):
+    """The per-hour scan the scoring jobs used (it compared local hours against UTC keys)."""
+    lookup = {}
+    for point in noaa_stageflow['forecast']:
+        noaa_dt = datetime.fromisoformat(point['timestamp'].replace('Z', '+00:00'))
+        lookup[noaa_dt.replace(tzinfo=None).isoformat()] = point
+    matches = []
+    for hour in forecast_hours:
+        weather_dt = datetime.fromisoformat(hour['timestamp'])
+        noaa_data = lookup.get(weather_dt.isoformat())
+        if not noaa_data:
+            closest_diff = float('inf')
+            for key, point in lookup.items():
+                diff = abs((weather_dt - datetime.fromisoformat(key)).total_seconds())
+                if diff < closest_diff and diff <= 3600:
+                    closest_diff, noaa_data = diff, point
+        matches.append(noaa_data)
+    return matches
+
+
+def benchmark(iterations=20):
+    # 15-minute NOAA points offset from the hours, so the old code always fell back to its scan
+    noaa = noaa_forecast(datetime(2025, 7, 1, 4, 7), hours=24 * 7, step_minutes=15)
+    hours = weather_hours(datetime(2025, 7, 1), 168)
+
+    def run(matcher):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            matcher(hours, noaa)
+        return (time.perf_counter() - started) / iterations * 1000
+
+    legacy = run(legacy_match)
+    joined = run(lambda hours, noaa: match_noaa_forecast(hour_times(hours), noaa))
+    print("=" * 60)
+    print(f" NOAA JOIN BENCHMARK (168 hours x {len(noaa['forecast'])} NOAA points)")
+    print("=" * 60)
+    print(f"per-hour fromisoformat scan:  {legacy:.2f} ms")
+    print(f"epoch merge join:             {joined:.2f} ms  ({legacy / joined:.1f}x)")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -12,16 +12,17 @@ def test_timestamp_matching():
     try:
         from app.tasks import update_extended_forecast_scores_job
         from app.extensions import redis_client
+        from app.columnar import as_rows
         
         # Run the extended forecast job which should now use NOAA data
         print("Running extended forecast scores job...")
         update_extended_forecast_scores_job()
         
         # Check the results
-        extended_scores_str = redis_client.get('extended_forecast_scores_simple')
+        extended_scores_str = redis_client.get('extended_forecast_scores')
         if extended_scores_str:
             import json
-            extended_scores = json.loads(extended_scores_str)
+            extended_scores = as_rows(json.loads(extended_scores_str))
             
             noaa_count = sum(1 for score in extended_scores if score.get('noaaDataUsed', False))
             total_count = len(extended_scores)
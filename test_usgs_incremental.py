@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental USGS ingestion into the per-series Redis ring buffers
+(app.fetchers.fetch_water_data_incremental)
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+import app.fetchers as fetchers
+
+EDT = timezone(timedelta(hours=-4))
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self.content = json.dumps(payload).encode()
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class FakeUSGS:
+    """Serves a growing set of 15-minute samples and records each requested URL."""
+
+    def __init__(self, start, count):
+        self.start = start
+        self.count = count
+        self.urls = []
+
+    def sample_times(self):
+        return [self.start + timedelta(minutes=15 * i) for i in range(self.count)]
+
+    def index(self, t):
+        return int((t - self.start) / timedelta(minutes=15))
+
+    def get(self, url, timeout=None, **kwargs):
+        self.urls.append(url)
+        times = self.sample_times()
+        if 'period=PT' in url:
+            minutes = int(url.split('period=PT', 1)[1].split('M', 1)[0])
+            cutoff = times[-1] - timedelta(minutes=minutes)
+            times = [t for t in times if t >= cutoff]
+
+        def series(code, name, value):
+            return {
+                'variable': {'variableCode': [{'value': code}], 'variableName': name},
+                'values': [{'value': [
+                    {'dateTime': t.isoformat(timespec='milliseconds'), 'value': str(value(self.index(t)))}
+                    for t in times
+                ]}],
+            }
+
+        return FakeResponse({'value': {'timeSeries': [
+            series('00010', 'Temperature, water, &#176;C', lambda i: 20.0),
+            series('00065', 'Gage height, ft', lambda i: 3.0 + i / 100),
+            series('00060', 'Streamflow, ft&#179;/s', lambda i: 2500 + i),
+        ]}})
+
+
+def test_bootstrap_then_only_new_samples(monkeypatch, fake_redis):
+    now = datetime.now(EDT).replace(second=0, microsecond=0)
+    usgs = FakeUSGS(start=now - timedelta(minutes=15 * 29), count=30)
+    monkeypatch.setattr(fetchers, 'http_client', usgs)
+    monkeypatch.setattr(fetchers, 'redis_client', fake_redis)
+
+    first = fetchers.fetch_water_data_incremental()
+
+    # Bootstraps with exactly what the buffers hold
+    assert f'period=PT{fetchers.USGS_HISTORY_LENGTH * 15}M' in usgs.urls[0]
+    assert len(first['historical']['discharge']) == fetchers.USGS_HISTORY_LENGTH
+    assert first['current']['discharge'] == 2529
+    assert first['current']['waterTemp'] == 20.0 * 1.8 + 32
+    assert first['historical']['gaugeHeight'][-1]['value'] == 3.29
+
+    # One new sample arrives
+    usgs.count += 1
+    second = fetchers.fetch_water_data_incremental()
+
+    assert 'period=PT' in usgs.urls[1]
+    assert int(usgs.urls[1].split('period=PT', 1)[1].split('M', 1)[0]) < 60
+    discharge = second['historical']['discharge']
+    assert len(discharge) == fetchers.USGS_HISTORY_LENGTH
+    assert discharge[-1]['value'] == 2530
+    assert discharge[-2] == first['historical']['discharge'][-1]
+    assert len({entry['timestamp'] for entry in discharge}) == len(discharge)
+
+
+def test_no_new_samples_keeps_buffers_and_current(monkeypatch, fake_redis):
+    now = datetime.now(EDT).replace(second=0, microsecond=0)
+    usgs = FakeUSGS(start=now - timedelta(hours=1), count=5)
+    monkeypatch.setattr(fetchers, 'http_client', usgs)
+    monkeypatch.setattr(fetchers, 'redis_client', fake_redis)
+
+    first = fetchers.fetch_water_data_incremental()
+    second = fetchers.fetch_water_data_incremental()
+
+    assert second == first
+    assert len(second['historical']['waterTemp']) == 5
+
+
+def test_a_stalled_series_does_not_widen_the_window_past_the_buffers(monkeypatch, fake_redis):
+    now = datetime.now(EDT).replace(second=0, microsecond=0)
+    usgs = FakeUSGS(start=now - timedelta(hours=1), count=5)
+    monkeypatch.setattr(fetchers, 'http_client', usgs)
+    monkeypatch.setattr(fetchers, 'redis_client', fake_redis)
+    fetchers.fetch_water_data_incremental()
+    # The temperature sensor last reported two days ago
+    fake_redis.set('usgs:01474500:00010:last', (now - timedelta(days=2)).isoformat())
+
+    fetchers.fetch_water_data_incremental()
+
+    minutes = int(usgs.urls[1].split('period=PT', 1)[1].split('M', 1)[0])
+    assert minutes == fetchers.USGS_HISTORY_LENGTH * 15
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for the start-up warm-up: jobs stamp every key they write (app.freshness), and
+run_refresh_cycle(skip_fresh=True) only fetches stale sources and only rescores scores
+that are missing or older than their inputs.
+"""
+
+import json
+import time
+
+import pytest
+
+import app.tasks as tasks
+from app.events import EventBus, ScoringPipeline
+from app.freshness import UPDATED_AT_KEY, checked_at, freshness_report, is_fresh, mark_updated, updated_at
+
+
+@pytest.fixture
+def cycle(monkeypatch, fake_redis):
+    """Stubbed fetch jobs and a pipeline that records the scoring jobs it runs."""
+    ran = {'fetched': [], 'scored': []}
+    bus = EventBus(fake_redis)
+    pipeline = ScoringPipeline(None, tasks.SCORING_JOBS)
+    pipeline.attach(bus)
+    monkeypatch.setattr(tasks, 'redis_client', fake_redis)
+    monkeypatch.setattr(tasks, 'event_bus', bus)
+    monkeypatch.setattr(tasks, 'scoring_pipeline', pipeline)
+    monkeypatch.setattr(pipeline, 'run', lambda job_id, context=None: ran['scored'].append(job_id))
+
+    def fetch(name, keys):
+        def job():
+            ran['fetched'].append(name)
+            mark_updated(fake_redis, keys)
+            bus.publish(tasks.DATA_UPDATED, keys=list(keys))
+        return job
+
+    for name, attr in [('weather', 'update_weather_data_job'), ('water', 'update_water_data_job'), ('noaa_stageflow', 'update_noaa_stageflow_job')]:
+        monkeypatch.setattr(tasks, attr, fetch(name, tasks.FETCH_SOURCES[name]))
+    return ran
+
+
+def test_jobs_stamp_the_keys_they_write(monkeypatch, fake_redis):
+    monkeypatch.setattr(tasks, 'redis_client', fake_redis)
+    monkeypatch.setattr(tasks, 'fetch_water_data_incremental', lambda: {'current': {}, 'historical': {}})
+    before = time.time()
+    tasks.update_water_data_job()
+    assert set(updated_at(fake_redis)) == {'water_data'}
+    assert updated_at(fake_redis)['water_data'] >= before
+
+
+def test_unchanged_noaa_forecast_still_counts_as_fresh(monkeypatch, fake_redis):
+    monkeypatch.setattr(tasks, 'redis_client', fake_redis)
+    fake_redis.set('noaa_stageflow_data', json.dumps({'forecast': []}))
+    written = time.time() - 3600
+    mark_updated(fake_redis, ['noaa_stageflow_data'], at=written)
+    mark_updated(fake_redis, tasks.SCORING_OUTPUTS.values(), at=written + 60)
+    monkeypatch.setattr(tasks, 'fetch_noaa_stageflow_forecast', lambda conditional=False: None)
+    tasks.update_noaa_stageflow_job()
+    assert is_fresh(updated_at(fake_redis), ['noaa_stageflow_data'], checked=checked_at(fake_redis))
+    # Unchanged data is not a write: the scores built from it are still up to date
+    assert updated_at(fake_redis)['noaa_stageflow_data'] == written
+    assert tasks.outdated_scoring_jobs(updated_at(fake_redis)) == []
+
+
+def test_warm_up_skips_fresh_sources(cycle, fake_redis):
+    now = time.time()
+    mark_updated(fake_redis, tasks.FETCH_SOURCES['weather'], at=now - 60)
+    mark_updated(fake_redis, ['noaa_stageflow_data'], at=now - 60)
+    mark_updated(fake_redis, ['water_data'], at=now - 3600)
+    mark_updated(fake_redis, tasks.SCORING_OUTPUTS.values(), at=now - 30)
+
+    tasks.run_refresh_cycle(skip_fresh=True)
+
+    assert cycle['fetched'] == ['water']
+    # Water feeds every score
+    assert cycle['scored'] == list(tasks.SCORING_JOBS)
+
+
+def test_warm_up_with_everything_fresh_fetches_and_scores_nothing(cycle, fake_redis):
+    now = time.time()
+    for keys in tasks.FETCH_SOURCES.values():
+        mark_updated(fake_redis, keys, at=now - 60)
+    mark_updated(fake_redis, tasks.SCORING_OUTPUTS.values(), at=now - 30)
+
+    tasks.run_refresh_cycle(skip_fresh=True)
+
+    assert cycle == {'fetched': [], 'scored': []}
+
+
+def test_warm_up_rescores_scores_left_behind_by_a_previous_run(cycle, fake_redis):
+    now = time.time()
+    for keys in tasks.FETCH_SOURCES.values():
+        mark_updated(fake_redis, keys, at=now - 60)
+    # The extended scores were never written and the short-term ones predate the weather
+    mark_updated(fake_redis, ['forecast_scores'], at=now - 30)
+    mark_updated(fake_redis, ['short_term_forecast'], at=now - 90)
+
+    tasks.run_refresh_cycle(skip_fresh=True)
+
+    assert cycle['fetched'] == []
+    # ...and the complete snapshot was never built either
+    assert cycle['scored'] == ['Update Extended Forecast Scores', 'Update Short-term Forecast', tasks.SNAPSHOT_JOB]
+
+
+def test_a_full_cycle_ignores_freshness(cycle, fake_redis):
+    for keys in tasks.FETCH_SOURCES.values():
+        mark_updated(fake_redis, keys)
+    tasks.run_refresh_cycle()
+    assert sorted(cycle['fetched']) == ['noaa_stageflow', 'water', 'weather']
+
+
+def test_freshness_report():
+    now = 1_750_000_000
+    stamps = {'weather_data': now - 120, 'water_data': now - 1000}
+    report = freshness_report(stamps, ['weather_data', 'water_data', 'noaa_stageflow_data'], now=now)
+    assert report['weather_data'] == {'updatedAt': '2025-06-15T15:04:40+00:00', 'ageSeconds': 120, 'stale': False}
+    assert report['water_data']['stale']
+    assert report['noaa_stageflow_data'] == {'updatedAt': None, 'ageSeconds': None, 'stale': True}
+
+
+def test_bad_stamps_are_ignored(fake_redis):
+    fake_redis.hset(UPDATED_AT_KEY, mapping={'weather_data': 'soon', 'water_data': 1.5})
+    assert updated_at(fake_redis) == {'water_data': 1.5}
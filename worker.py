@@ -0,0 +1,27 @@
+# worker.py - runs the fetch and scoring scheduler on its own, without the web tier
+import signal
+import threading
+
+from app import create_app
+from app.extensions import scheduler
+
+
+def main():
+    app = create_app(role='worker')
+    print("RowCast worker running; web processes serve what it stores in Redis.")
+
+    stopping = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stopping.set())
+    stopping.wait()
+
+    print("RowCast worker shutting down...")
+    # Hand the lease over right away instead of letting it expire
+    lease = app.extensions.get('rowcast_leader_lease')
+    if lease is not None:
+        lease.stop()
+    scheduler.shutdown(wait=True)
+
+
+if __name__ == '__main__':
+    main()